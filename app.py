@@ -22,7 +22,7 @@ from core.db_manager import DBManager
 from core.task_manager import TaskManager
 from core.notification_manager import NotificationManager
 from core.ai_analyzer import AIAnalyzer
-from core.error_manager import ErrorManager
+from core.error_manager import get_error_manager
 
 # --- UIモジュールのインポート ---
 from ui.dashboard import render_dashboard
@@ -168,7 +168,7 @@ if 'initialized' not in st.session_state:
     DB_PATH = 'data/logs.db'
     st.session_state.config_manager = ConfigManager(CONFIG_PATH)
     st.session_state.db_manager = DBManager(DB_PATH)
-    st.session_state.error_manager = ErrorManager('data/error_codes.json')
+    st.session_state.error_manager = get_error_manager('data/error_codes.json')
     # TODO: 認証情報を安全に取得する
     DUMMY_USER, DUMMY_PASS = "YOUR_USERNAME", "YOUR_PASSWORD"
     st.session_state.task_manager = TaskManager(st.session_state.config_manager, st.session_state.db_manager, DUMMY_USER, DUMMY_PASS)
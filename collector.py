@@ -0,0 +1,58 @@
+# ==============================================================================
+# 実行結果収集デーモン (collector.py)
+# ==============================================================================
+# 管理対象の全PCを定期的に巡回し、タスクの実行結果を execution_logs に記録します。
+# ダッシュボード(app.py)とは別プロセスで常駐させることで、
+# 画面側はリモート接続なしで実行履歴を表示できます。
+#
+# 起動コマンド:
+# python collector.py          # 常駐して定期収集
+# python collector.py --once   # 全PCを1回だけ収集して終了
+# python collector.py --archive  # 保存期間を過ぎたログを1回だけアーカイブして終了
+# python collector.py --metrics  # 全PCのリソース使用状況を1回だけ記録して終了
+# ==============================================================================
+
+import argparse
+import logging
+import os
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.result_collector import ResultCollector, load_credentials_file
+
+# --- ログ設定 ---
+log_dir = os.path.join(os.path.dirname(__file__), 'logs')
+os.makedirs(log_dir, exist_ok=True)
+log_file = os.path.join(log_dir, 'collector.log')
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(log_file, encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+CONFIG_PATH = 'data/config.json'
+DB_PATH = 'data/logs.db'
+CREDENTIALS_PATH = 'data/credentials.json'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="タスク実行結果の収集デーモン")
+    parser.add_argument('--once', action='store_true', help="全PCを1回だけ収集して終了する")
+    parser.add_argument('--archive', action='store_true', help="保存期間を過ぎたログを1回だけアーカイブして終了する")
+    parser.add_argument('--metrics', action='store_true', help="全PCのリソース使用状況を1回だけ記録して終了する")
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(CONFIG_PATH)
+    db_manager = DBManager(DB_PATH)
+    collector = ResultCollector(config_manager, db_manager, load_credentials_file(CREDENTIALS_PATH))
+
+    if args.archive:
+        collector.retention.run()
+    elif args.metrics:
+        collector.collect_metrics(config_manager.get_config().get('pcs', []))
+    elif args.once:
+        collector.collect(config_manager.get_config().get('pcs', []))
+    else:
+        collector.run_forever()
@@ -0,0 +1,128 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+class AuditWriter:
+    """
+    操作監査ログを非同期にまとめて書き込むクラス。
+    ログはキューに積んで即座に戻り、バックグラウンドスレッドがbatch_size件ごと、
+    またはflush_interval秒ごとに1つのトランザクションで登録する。
+    """
+    def __init__(self, db_manager, batch_size=100, flush_interval=0.2, max_queue_size=10000):
+        """
+        コンストラクタ。
+        :param db_manager: DBManagerインスタンス
+        :param batch_size: 1回のトランザクションで登録する最大件数。
+        :param flush_interval: 最初のログを受け取ってから登録するまでに待つ最大秒数。
+        :param max_queue_size: キューに積めるログの上限。超えた場合は呼び出し元で同期的に登録する。
+        """
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, audit_data):
+        """
+        監査ログを書き込みキューに積む。操作した時刻を残すため、timestampはここで設定する。
+        :param audit_data: add_audit_logと同じ形式の辞書。
+        """
+        audit_data = dict(audit_data)
+        audit_data.setdefault('timestamp', datetime.now().isoformat())
+        if self._closed:
+            self.db_manager.add_audit_logs([audit_data])
+            return
+        try:
+            self._queue.put_nowait(audit_data)
+        except queue.Full:
+            logging.warning("監査ログのキューが一杯のため、同期的に書き込みます")
+            self.db_manager.add_audit_logs([audit_data])
+
+    def flush(self):
+        """キューに積まれた監査ログがすべて登録されるまで待つ。"""
+        self._queue.join()
+
+    def close(self):
+        """残りの監査ログを登録してからバックグラウンドスレッドを停止する。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self, first):
+        """最初のログに続けて、batch_size件またはflush_interval秒に達するまでログを集める。"""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        stop = False
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _write_batch(self, batch):
+        """集めた監査ログを1つのトランザクションで登録する。"""
+        try:
+            self.db_manager.add_audit_logs(batch)
+        except Exception as e:
+            # 登録できなかった監査ログが失われないよう、内容をログファイルに残す
+            logging.error(f"監査ログの書き込みに失敗しました（{len(batch)}件）: {e}")
+            for audit_data in batch:
+                logging.error(f"未登録の監査ログ: {audit_data}")
+
+    def _run(self):
+        """バックグラウンドスレッドで監査ログを登録し続ける。"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                break
+            batch, stop = self._collect_batch(first)
+            self._write_batch(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                break
+
+
+# データベースファイルごとに共有する監査ログの書き込みスレッド
+_shared_writers = {}
+_shared_writers_lock = threading.Lock()
+
+def get_audit_writer(db_manager):
+    """
+    DBManagerのデータベースファイルに対応する共有のAuditWriterを返す。
+    プロセス終了時には残りの監査ログを登録してから停止する。
+    """
+    with _shared_writers_lock:
+        writer = _shared_writers.get(db_manager.db_path)
+        if writer is None:
+            writer = AuditWriter(db_manager)
+            _shared_writers[db_manager.db_path] = writer
+            atexit.register(writer.close)
+        return writer
+
+def close_audit_writer(db_path):
+    """
+    データベースファイルに対応する共有のAuditWriterがあれば、残りの監査ログを登録してから停止し、共有を解除する。
+    次にget_audit_writerを呼び出した場合は新しいAuditWriterを作成する。
+    """
+    with _shared_writers_lock:
+        writer = _shared_writers.pop(db_path, None)
+    if writer is not None:
+        atexit.unregister(writer.close)
+        writer.close()
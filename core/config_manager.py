@@ -37,6 +37,42 @@ class ConfigManager:
                 },
                 "api_keys": {
                     "gemini": "" # Gemini APIキー
+                },
+                "fleet_scan": {
+                    "max_workers": 8, # 同時に接続するPC数の上限
+                    "host_timeout_sec": 120 # 1台あたりの処理時間の上限（秒）
+                },
+                "reachability": {
+                    "enabled": True, # スキャン前にWinRMのポートへの接続を確認し、応答のないPCをスキップする
+                    "port": 5985, # 接続を確認するポート
+                    "timeout_sec": 1.0, # 接続確認の上限（秒）。全PCを同時に確認するため、スキャン全体でもこの程度で済む
+                    "backoff_base_sec": 30, # 接続できなかったPCに再び接続を試みるまでの秒数（失敗が続くたびに2倍）
+                    "backoff_max_sec": 600 # 再び接続を試みるまでの秒数の上限
+                },
+                "task_snapshot": {
+                    "ttl_sec": 60, # この秒数を過ぎたタスク一覧はバックグラウンドで更新する
+                    "max_age_sec": 300 # この秒数を過ぎたタスク一覧は表示前に再取得する
+                },
+                "collector": {
+                    "interval_sec": 300, # 実行結果を収集する間隔（秒）
+                    "jitter_sec": 60 # PCごとの収集時刻に加えるゆらぎ（秒）
+                },
+                "retention": {
+                    "execution_logs_days": 365, # 実行結果ログをlogs.dbに残す日数（0でアーカイブしない）
+                    "audit_logs_days": 730, # 操作監査ログをlogs.dbに残す日数（0でアーカイブしない）
+                    "archive_dir": "data/archive", # 月ごとのアーカイブファイルの保存先
+                    "interval_hours": 24 # アーカイブを実行する間隔（時間）
+                },
+                "pc_info_cache": {
+                    "inventory_ttl_sec": 86400, # OS・メモリ容量などの構成情報を取得し直す間隔（秒）
+                    "metrics_ttl_sec": 60 # オンライン状態・空き容量などの稼働状況を取得し直す間隔（秒）
+                },
+                "metrics": {
+                    "interval_sec": 300, # 収集デーモンがPCリソース（メモリ・ディスク使用率）を記録する間隔（秒）
+                    "raw_days": 2, # 生のサンプルを残す日数
+                    "minute_days": 7, # 1分ごとの集計を残す日数
+                    "hour_days": 90, # 1時間ごとの集計を残す日数
+                    "day_days": 0 # 1日ごとの集計を残す日数（0で削除しない）
                 }
             }
             self.save_config()
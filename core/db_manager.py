@@ -1,23 +1,276 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
 
+from core.audit_writer import close_audit_writer
+from core.error_manager import ErrorManager
+
+# 実行結果の集計テーブル。粒度ごとに (テーブル名, recorded_atの先頭から使う文字数) を持つ。
+# 結果コードがNULLのログは -1 として集計する。
+_ROLLUP_TABLES = {
+    'day': ('execution_rollup_daily', 10),   # YYYY-MM-DD
+    'hour': ('execution_rollup_hourly', 13),  # YYYY-MM-DDTHH
+}
+
+def _rollup_table_sql(table):
+    """集計テーブルを作成するSQLを返す。"""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            period TEXT NOT NULL,
+            pc_name TEXT NOT NULL,
+            task_name TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            result_code INTEGER NOT NULL,
+            run_count INTEGER NOT NULL,
+            PRIMARY KEY (period, pc_name, task_name, success, result_code)
+        ) WITHOUT ROWID
+    """
+
+def _rollup_backfill_sql(table, length):
+    """execution_logsの全件から集計テーブルを作り直すSQLを返す。"""
+    return f"""
+        INSERT INTO {table} (period, pc_name, task_name, success, result_code, run_count)
+        SELECT substr(recorded_at, 1, {length}), pc_name, task_name, IFNULL(result_code, -1) = 0, IFNULL(result_code, -1), COUNT(*)
+        FROM execution_logs
+        GROUP BY 1, 2, 3, 4, 5
+    """
+
+def _rollup_trigger_sql():
+    """ログの登録時に集計テーブルを加算するトリガーのSQLを返す。"""
+    upserts = ''.join(f"""
+            INSERT INTO {table} (period, pc_name, task_name, success, result_code, run_count)
+            VALUES (substr(NEW.recorded_at, 1, {length}), NEW.pc_name, NEW.task_name, IFNULL(NEW.result_code, -1) = 0, IFNULL(NEW.result_code, -1), 1)
+            ON CONFLICT (period, pc_name, task_name, success, result_code) DO UPDATE SET run_count = run_count + 1;"""
+        for table, length in _ROLLUP_TABLES.values())
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_execution_logs_rollup AFTER INSERT ON execution_logs
+        BEGIN{upserts}
+        END
+    """
+
+# PCリソースの時系列データの集計テーブル。粒度ごとに (テーブル名, sampled_atの先頭から使う文字数) を持つ。
+_METRIC_TIERS = {
+    'minute': ('pc_metrics_minutely', 16),  # YYYY-MM-DDTHH:MM
+    'hour': ('pc_metrics_hourly', 13),      # YYYY-MM-DDTHH
+    'day': ('pc_metrics_daily', 10),        # YYYY-MM-DD
+}
+
+def _metric_tier_table_sql(table):
+    """PCリソースの集計テーブルを作成するSQLを返す。同じ指標の期間指定での読み出しが連続した範囲になるよう、指標を先頭にする。"""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            metric TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            pc_name TEXT NOT NULL,
+            sample_count INTEGER NOT NULL,
+            value_sum REAL NOT NULL,
+            value_min REAL NOT NULL,
+            value_max REAL NOT NULL,
+            PRIMARY KEY (metric, bucket, pc_name)
+        ) WITHOUT ROWID
+    """
+
+def _metric_tier_trigger_sql():
+    """サンプルの登録時に各粒度の集計テーブルへ加算するトリガーのSQLを返す。"""
+    upserts = ''.join(f"""
+            INSERT INTO {table} (metric, bucket, pc_name, sample_count, value_sum, value_min, value_max)
+            VALUES (NEW.metric, substr(NEW.sampled_at, 1, {length}), NEW.pc_name, 1, NEW.value, NEW.value, NEW.value)
+            ON CONFLICT (metric, bucket, pc_name) DO UPDATE SET
+                sample_count = sample_count + 1, value_sum = value_sum + excluded.value_sum,
+                value_min = MIN(value_min, excluded.value_min), value_max = MAX(value_max, excluded.value_max);"""
+        for table, length in _METRIC_TIERS.values())
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_pc_metric_samples_rollup AFTER INSERT ON pc_metric_samples
+        BEGIN{upserts}
+        END
+    """
+
+def _fts_sql(fts_table, columns):
+    """
+    execution_logsを参照する外部コンテンツの全文検索テーブル（trigram）と、同期用のトリガーを作成するSQLのリストを返す。
+    :param fts_table: 全文検索テーブルの名前。
+    :param columns: 索引を作成するexecution_logsの列名のリスト。
+    """
+    names = ', '.join(columns)
+    new_values = ', '.join(f"NEW.{column}" for column in columns)
+    old_values = ', '.join(f"OLD.{column}" for column in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {names}, content='execution_logs', content_rowid='log_id', tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert AFTER INSERT ON execution_logs BEGIN
+            INSERT INTO {fts_table} (rowid, {names}) VALUES (NEW.log_id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete AFTER DELETE ON execution_logs BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {names}) VALUES ('delete', OLD.log_id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update AFTER UPDATE OF {names} ON execution_logs BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {names}) VALUES ('delete', OLD.log_id, {old_values});
+            INSERT INTO {fts_table} (rowid, {names}) VALUES (NEW.log_id, {new_values});
+        END
+        """,
+    ]
+
 class DBManager:
     """
     ログデータベース(logs.db)への接続と操作を管理するクラス。
     """
-    def __init__(self, path='logs.db'):
+    # スキーマのマイグレーション。PRAGMA user_versionに適用済みの件数を記録し、未適用のものだけを順に実行する。
+    _MIGRATIONS = [
+        # 1: 収集デーモンの重複排除用に、タスクの最終実行日時(LastRunTime)を記録する
+        [
+            "ALTER TABLE execution_logs ADD COLUMN last_run_at TEXT",
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_last_run ON execution_logs (pc_name, task_path, task_name, last_run_at)",
+        ],
+        # 2: ログ検索（PC名・タスク名での絞り込みと実行日時順の並べ替え）用のインデックス
+        [
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_recorded_at ON execution_logs (recorded_at)",
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_pc_recorded ON execution_logs (pc_name, recorded_at)",
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_task_recorded ON execution_logs (task_name, recorded_at)",
+            "ANALYZE execution_logs",
+        ],
+        # 3: 実行結果（成功・エラー・エラーコード）での絞り込み用のインデックス。
+        #    エラーのみの検索は result_code <> 0 の部分インデックスで、エラー行だけを新しい順に読む。
+        [
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_result_recorded ON execution_logs (result_code, recorded_at)",
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_errors_recorded ON execution_logs (recorded_at) WHERE result_code <> 0",
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_errors_pc_recorded ON execution_logs (pc_name, recorded_at) WHERE result_code <> 0",
+            "ANALYZE execution_logs",
+        ],
+        # 4: レポート用の日別・時間別の集計テーブル。ログの登録時にトリガーで加算する。
+        #    古いログを削除・アーカイブしても過去の集計は残すため、削除時には減算しない。
+        [_rollup_table_sql(table) for table, _ in _ROLLUP_TABLES.values()]
+        + [_rollup_backfill_sql(table, length) for table, length in _ROLLUP_TABLES.values()]
+        + [_rollup_trigger_sql()],
+        # 5: 同じ実行(PC, タスク, LastRunTime)を二重に登録しないよう一意制約にする。
+        #    既存の重複は最も古い1件を残して削除し、集計テーブルも作り直す。
+        [
+            """
+            DELETE FROM execution_logs
+            WHERE last_run_at IS NOT NULL AND log_id NOT IN (
+                SELECT MIN(log_id) FROM execution_logs WHERE last_run_at IS NOT NULL
+                GROUP BY pc_name, task_path, task_name, last_run_at
+            )
+            """,
+            "DROP INDEX IF EXISTS idx_execution_logs_last_run",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_execution_logs_last_run ON execution_logs (pc_name, task_path, task_name, last_run_at) WHERE last_run_at IS NOT NULL",
+        ]
+        + [f"DELETE FROM {table}" for table, _ in _ROLLUP_TABLES.values()]
+        + [_rollup_backfill_sql(table, length) for table, length in _ROLLUP_TABLES.values()],
+        # 6: 結果メッセージとAI分析の全文検索。trigramトークナイザーで日本語も3文字以上の語で検索できる。
+        #    execution_logsを参照する外部コンテンツテーブルとし、トリガーで同期する。
+        _fts_sql('execution_logs_fts', ['result_message', 'ai_analysis'])
+        + ["INSERT INTO execution_logs_fts (execution_logs_fts) VALUES ('rebuild')"],
+        # 7: PC情報画面のキャッシュ。ほとんど変わらない構成情報（OS・メモリ容量・ディスク）と、
+        #    頻繁に変わる稼働状況（オンライン状態・空きメモリ・空き容量）を別々の更新時刻で保持する。
+        [
+            """
+            CREATE TABLE IF NOT EXISTS pc_inventory (
+                pc_name TEXT PRIMARY KEY,
+                pc_ip TEXT,
+                system_info TEXT,
+                disk_info TEXT,
+                updated_at TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS pc_metrics_latest (
+                pc_name TEXT PRIMARY KEY,
+                pc_ip TEXT,
+                status TEXT NOT NULL,
+                last_seen TEXT,
+                memory_info TEXT,
+                disk_info TEXT,
+                tasks_count INTEGER,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            )
+            """,
+        ],
+        # 8: PCリソース（メモリ・ディスク使用率など）の時系列データ。生のサンプルはトリガーで1分・1時間・1日の
+        #    集計テーブルへ加算し、グラフは期間に応じた粒度の集計テーブルから読む。古いデータは粒度ごとに削除する。
+        [
+            """
+            CREATE TABLE IF NOT EXISTS pc_metric_samples (
+                sampled_at TEXT NOT NULL,
+                pc_name TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                value REAL NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_pc_metric_samples_sampled_at ON pc_metric_samples (sampled_at)",
+        ]
+        + [_metric_tier_table_sql(table) for table, _ in _METRIC_TIERS.values()]
+        + [f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table} (bucket)" for table, _ in _METRIC_TIERS.values()]
+        + [_metric_tier_trigger_sql()],
+        # 9: タスク名の部分一致検索。LIKE '%語%' はインデックスを使えないため、trigramの全文検索で候補を絞る。
+        #    execution_logsを参照する外部コンテンツテーブルとし、トリガーで同期する。
+        _fts_sql('execution_logs_task_fts', ['task_name'])
+        + ["INSERT INTO execution_logs_task_fts (execution_logs_task_fts) VALUES ('rebuild')"],
+    ]
+
+    # 実行結果ログとして登録できる列
+    _EXECUTION_LOG_COLUMNS = ['recorded_at', 'pc_name', 'task_path', 'task_name', 'result_code', 'result_message', 'ai_analysis', 'last_run_at']
+    # 操作監査ログとして登録できる列
+    _AUDIT_LOG_COLUMNS = ['timestamp', 'user_identifier', 'action_type', 'target_pc', 'target_task', 'details']
+
+    # アーカイブ対象のテーブルごとの (ID列, 日時列, 登録できる列)
+    _ARCHIVE_TABLES = {
+        'execution_logs': ('log_id', 'recorded_at', _EXECUTION_LOG_COLUMNS),
+        'audit_logs': ('audit_id', 'timestamp', _AUDIT_LOG_COLUMNS),
+    }
+
+    def __init__(self, path='logs.db', journal_mode='WAL'):
         """
         コンストラクタ。データベースファイルのパスを受け取る。
         :param path: logs.dbへのファイルパス。
+        :param journal_mode: ジャーナルモード。WALは共有フォルダ(NAS)上では使えないため、その場合は'DELETE'を指定する。
         """
         self.db_path = path
-        self.conn = None
+        self.journal_mode = journal_mode
+        # 接続はスレッドごとに1本を使い回す（sqlite3の接続はスレッド間で共有できないため）
+        self._local = threading.local()
         self._create_tables_if_not_exists()
 
     def _get_connection(self):
-        """データベースへの接続を確立する。"""
-        return sqlite3.connect(self.db_path)
+        """
+        現在のスレッド用のデータベース接続を返す。初回のみ接続を確立してPRAGMAを設定する。
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 他の接続が書き込み中の場合は最大30秒待つ
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # 古いログを削除したときに空き領域を少しずつ解放できるようにする。
+            # WALへの切り替えやテーブルの作成より前でないと効かない（既存のDBはreclaim_spaceで切り替える）
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # WALモードでは読み取りと書き込みが互いにブロックしない
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-16000")  # 約16MB
+            conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """
+        現在のスレッドの接続を閉じる。
+        このデータベースの監査ログの書き込みスレッドが動いている場合は、キューに残ったログを登録してから停止する
+        （閉じた後にディレクトリが削除されても、書き込みスレッドがDBを作り直さないようにする）。
+        """
+        close_audit_writer(self.db_path)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def _create_tables_if_not_exists(self):
         """
@@ -53,7 +306,29 @@ class DBManager:
             )
         ''')
         conn.commit()
-        conn.close()
+        self._migrate_schema(conn)
+
+    def _migrate_schema(self, conn):
+        """
+        未適用のスキーマのマイグレーションを順に実行する。
+        1件のマイグレーションとuser_versionの更新を1つのトランザクションで行い、途中で失敗した場合は
+        すべてロールバックする（ALTER TABLEだけが適用されて、次回の起動で同じ列を追加し直すことがないようにする）。
+        """
+        while True:
+            # 書き込みロックを取ってから適用済みの件数を読み直し、他のプロセスと同じマイグレーションを重複して実行しない
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version >= len(self._MIGRATIONS):
+                    conn.rollback()
+                    return
+                for statement in self._MIGRATIONS[version]:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
     def add_execution_log(self, log_data):
         """
@@ -70,57 +345,482 @@ class DBManager:
         keys = ', '.join(log_data.keys())
         placeholders = ', '.join(['?'] * len(log_data))
         
-        cursor.execute(f"INSERT INTO execution_logs ({keys}) VALUES ({placeholders})", list(log_data.values()))
+        with conn:
+            cursor.execute(f"INSERT INTO execution_logs ({keys}) VALUES ({placeholders})", list(log_data.values()))
         
-        last_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return last_id
+        return cursor.lastrowid
         
-    def update_ai_analysis(self, log_id, analysis_text):
+    def _insert_many(self, table, id_column, columns, rows, skip_duplicates=False):
         """
-        指定されたログにAI分析結果を追記する。
+        複数の行を1つのトランザクションでまとめて登録する。
+        :param skip_duplicates: Trueの場合、一意制約に違反する行は登録せずに読み飛ばす。
+        :return: 登録された行のIDのリスト。
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        conn = self._get_connection()
+        keys = ', '.join(columns)
+        placeholders = ', '.join(['?'] * len(columns))
+        verb = "INSERT OR IGNORE" if skip_duplicates else "INSERT"
+        with conn:
+            # 書き込みロックを先に取得し、登録前後の間に他の接続の行が混ざらないようにする
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute(f"SELECT IFNULL(MAX({id_column}), 0) FROM {table}").fetchone()[0]
+            conn.executemany(f"{verb} INTO {table} ({keys}) VALUES ({placeholders})", rows)
+            # AUTOINCREMENTのIDは単調増加するため、登録前の最大値より大きいIDが今回の登録分になる
+            inserted = conn.execute(f"SELECT {id_column} FROM {table} WHERE {id_column} > ? ORDER BY {id_column}", (last_id,))
+            return [row[0] for row in inserted.fetchall()]
+
+    def add_execution_logs(self, logs, skip_duplicates=False):
+        """
+        複数の実行結果ログを1つのトランザクションでまとめて追加する。
+        recorded_atが指定されていないログには現在時刻を設定する。
+        :param logs: add_execution_logと同じ形式の辞書のイテラブル。
+        :param skip_duplicates: Trueの場合、登録済みの実行（PC, タスクパス, タスク名, last_run_atが同じもの）を読み飛ばす。
+        :return: 追加されたログのIDのリスト。
+        """
+        now = datetime.now().isoformat()
+        rows = (
+            tuple(log.get(column) or now if column == 'recorded_at' else log.get(column)
+                  for column in self._EXECUTION_LOG_COLUMNS)
+            for log in logs
+        )
+        return self._insert_many('execution_logs', 'log_id', self._EXECUTION_LOG_COLUMNS, rows, skip_duplicates)
+
+    def get_last_run_times(self, pc_name=None):
+        """
+        記録済みの実行結果ログから、タスクごとの最新の最終実行日時を取得する。
+        :param pc_name: 指定した場合はそのPCのタスクのみを対象にする。
+        :return: (pc_name, task_path, task_name) をキー、last_run_atを値とする辞書。
         """
         conn = self._get_connection()
         cursor = conn.cursor()
-        cursor.execute("UPDATE execution_logs SET ai_analysis = ? WHERE log_id = ?", (analysis_text, log_id))
-        conn.commit()
-        conn.close()
+        query = "SELECT pc_name, task_path, task_name, MAX(last_run_at) FROM execution_logs WHERE last_run_at IS NOT NULL"
+        params = []
+        if pc_name:
+            query += " AND pc_name = ?"
+            params.append(pc_name)
+        query += " GROUP BY pc_name, task_path, task_name"
+        cursor.execute(query, params)
+        last_run_times = {(row[0], row[1], row[2]): row[3] for row in cursor.fetchall()}
+        return last_run_times
 
-    def search_execution_logs(self, **kwargs):
+    def update_ai_analysis(self, log_id, analysis_text):
         """
-        指定された条件で実行結果ログを検索する。
-        :param kwargs: pc_name, task_name, start_date, end_dateなどの検索条件。
-        :return: 検索結果のリスト。
+        指定されたログにAI分析結果を追記する。
         """
         conn = self._get_connection()
-        # 結果を辞書形式で受け取れるようにする
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        with conn:
+            cursor.execute("UPDATE execution_logs SET ai_analysis = ? WHERE log_id = ?", (analysis_text, log_id))
 
-        query = "SELECT * FROM execution_logs WHERE 1=1"
+    def _build_search_conditions(self, **kwargs):
+        """
+        ログ検索のWHERE句と引数を組み立てる。
+        PC名は画面のドロップダウンから選ぶため完全一致とし、インデックスを使う。
+        タスク名は自由入力のため、既定では大文字・小文字を区別しない部分一致とする。
+        :return: (WHERE句, 引数のリスト) のタプル。
+        """
+        conditions = ["1=1"]
         params = []
 
         if kwargs.get('pc_name'):
-            query += " AND pc_name LIKE ?"
-            params.append(f"%{kwargs['pc_name']}%")
+            conditions.append("pc_name = ?")
+            params.append(kwargs['pc_name'])
         if kwargs.get('task_name'):
-            query += " AND task_name LIKE ?"
-            params.append(f"%{kwargs['task_name']}%")
+            task_name = kwargs['task_name']
+            if kwargs.get('task_name_match', 'contains') == 'prefix':
+                # 前方一致は範囲条件に変換し、(task_name, recorded_at) のインデックスを使う（大文字・小文字を区別する）
+                conditions.append("task_name >= ? AND task_name < ?")
+                params.extend([task_name, task_name[:-1] + chr(ord(task_name[-1]) + 1)])
+            elif len(task_name) >= 3:
+                # 3文字以上はタスク名のtrigram索引で一致するログを探す（大文字・小文字は区別しない）
+                conditions.append("log_id IN (SELECT rowid FROM execution_logs_task_fts WHERE execution_logs_task_fts MATCH ?)")
+                params.append('"' + task_name.replace('"', '""') + '"')
+            else:
+                # trigramでは3文字未満の語を検索できないため、LIKEで探す
+                escaped = task_name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append("task_name LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+        if kwargs.get('result_code') is not None:
+            conditions.append("result_code = ?")
+            params.append(self._normalize_result_code(kwargs['result_code']))
+        if kwargs.get('result_code_not') is not None:
+            result_code_not = self._normalize_result_code(kwargs['result_code_not'])
+            if result_code_not == 0:
+                # 部分インデックスの条件と一致させるため、エラーのみの検索は定数で書く
+                conditions.append("result_code <> 0")
+            else:
+                conditions.append("result_code <> ?")
+                params.append(result_code_not)
+        if kwargs.get('error_code'):
+            conditions.append("result_code = ?")
+            params.append(self._normalize_result_code(kwargs['error_code']))
         if kwargs.get('start_date'):
-            query += " AND recorded_at >= ?"
-            params.append(kwargs['start_date'])
+            conditions.append("recorded_at >= ?")
+            params.append(str(kwargs['start_date']))
         if kwargs.get('end_date'):
-            query += " AND recorded_at <= ?"
-            params.append(kwargs['end_date'])
-        
-        query += " ORDER BY recorded_at DESC" # 新しい順に並べる
+            conditions.append("recorded_at <= ?")
+            params.append(str(kwargs['end_date']))
+
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def _normalize_result_code(code):
+        """検索条件の結果コードをErrorManagerと同じ規則で整数に変換する。変換できない場合はValueErrorを送出する。"""
+        value = ErrorManager.normalize_code(code)
+        if value is None:
+            raise ValueError(f"無効なエラーコード: {code}")
+        return value
+
+    def _build_search_query(self, **kwargs):
+        """ログ検索のSQLと引数を組み立てる。"""
+        where, params = self._build_search_conditions(**kwargs)
+        # 新しい順に並べる（同時刻のログはlog_idの降順で順序を確定させる）
+        return f"SELECT * FROM execution_logs WHERE {where} ORDER BY recorded_at DESC, log_id DESC", params
+
+    def search_execution_logs(self, **kwargs):
+        """
+        指定された条件で実行結果ログを検索する。
+        :param kwargs: pc_name, task_name, start_date, end_date, result_code, result_code_not, error_codeなどの検索条件。
+                       タスク名は部分一致で検索する。task_name_match='prefix' を指定すると前方一致で検索する。
+                       error_codeは "0x00041306" のような16進数文字列でも指定できる。
+        :return: 検索結果のリスト。
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        # 結果を辞書形式で受け取れるようにする（接続は使い回すため、カーソル単位で設定する）
+        cursor.row_factory = sqlite3.Row
 
+        query, params = self._build_search_query(**kwargs)
         cursor.execute(query, params)
         rows = [dict(row) for row in cursor.fetchall()]
-        conn.close()
         return rows
 
+    def _build_page_query(self, page_size, cursor=None, **kwargs):
+        """ページ単位のログ検索のSQLと引数を組み立てる。"""
+        where, params = self._build_search_conditions(**kwargs)
+        if cursor:
+            # recorded_at <= ? を独立した条件にしておくと、インデックスの範囲検索でカーソル位置から読み始められる
+            where += " AND recorded_at <= ? AND (recorded_at < ? OR log_id < ?)"
+            params.extend([cursor[0], cursor[0], cursor[1]])
+        # 次のページの有無を判定するため1件多く取得する
+        query = f"SELECT * FROM execution_logs WHERE {where} ORDER BY recorded_at DESC, log_id DESC LIMIT ?"
+        return query, params + [page_size + 1]
+
+    @staticmethod
+    def _build_text_query(text):
+        """
+        全文検索の入力をFTS5の検索式に変換する。空白で区切った語はすべてを含むもの（AND）を探す。
+        trigramでは3文字未満の語を検索できないため、それらはLIKEの条件として返す。
+        :return: (FTS5の検索式またはNone, LIKEで絞り込む語のリスト) のタプル。
+        """
+        terms = text.split()
+        phrases = ['"' + term.replace('"', '""') + '"' for term in terms if len(term) >= 3]
+        short_terms = [term for term in terms if len(term) < 3]
+        return (' '.join(phrases) or None), short_terms
+
+    def search_execution_logs_text(self, text, limit=100, highlight=('[', ']'), **kwargs):
+        """
+        結果メッセージとAI分析を全文検索し、関連度の高い順に返す。
+        :param text: 検索する文字列。空白で区切った語をすべて含むログを探す。
+        :param limit: 取得する最大件数。
+        :param highlight: 一致した箇所を囲む (開始, 終了) の文字列。
+        :param kwargs: search_execution_logsと同じ検索条件。
+        :return: ログの辞書に 'rank'（小さいほど関連度が高い）と 'snippet'（一致箇所の抜粋）を加えたもののリスト。
+        """
+        match, short_terms = self._build_text_query(text)
+        where, params = self._build_search_conditions(**kwargs)
+        for term in short_terms:
+            escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where += " AND (e.result_message LIKE ? ESCAPE '\\' OR e.ai_analysis LIKE ? ESCAPE '\\')"
+            params.extend([f"%{escaped}%"] * 2)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        if match:
+            cursor.execute(
+                f"SELECT e.*, bm25(execution_logs_fts) AS rank, "
+                f"snippet(execution_logs_fts, -1, ?, ?, '…', 64) AS snippet "
+                # CROSS JOINで全文検索の索引を先に引かせ、一致したログだけを結合する
+                f"FROM execution_logs_fts CROSS JOIN execution_logs AS e ON e.log_id = execution_logs_fts.rowid "
+                f"WHERE execution_logs_fts MATCH ? AND {where} ORDER BY rank LIMIT ?",
+                [highlight[0], highlight[1], match] + params + [limit],
+            )
+        else:
+            # 3文字以上の語がない場合は索引を使えないため、新しい順にLIKEで探す
+            cursor.execute(
+                f"SELECT e.*, 0 AS rank, IFNULL(e.result_message, e.ai_analysis) AS snippet "
+                f"FROM execution_logs AS e WHERE {where} ORDER BY e.recorded_at DESC LIMIT ?",
+                params + [limit],
+            )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def search_execution_logs_page(self, page_size=50, cursor=None, **kwargs):
+        """
+        指定された条件で実行結果ログを1ページ分だけ検索する。
+        OFFSETではなく (recorded_at, log_id) のキーセットで続きを取得するため、後ろのページでも読み取り量は変わらない。
+        :param page_size: 1ページの件数。
+        :param cursor: 前のページの最後の行を示す (recorded_at, log_id) のタプル。Noneの場合は先頭ページ。
+        :param kwargs: search_execution_logsと同じ検索条件。
+        :return: (ログのリスト, 次のページのカーソル) のタプル。次のページがない場合のカーソルはNone。
+        """
+        query, params = self._build_page_query(page_size, cursor, **kwargs)
+        conn = self._get_connection()
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute(query, params)
+        rows = [dict(row) for row in cur.fetchall()]
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, (rows[-1]['recorded_at'], rows[-1]['log_id'])
+
+    def summarize_execution_logs(self, **kwargs):
+        """
+        指定された条件に一致する実行結果ログの件数を集計する。
+        :param kwargs: search_execution_logsと同じ検索条件。
+        :return: total, success, error, pc_countを含む辞書。
+        """
+        where, params = self._build_search_conditions(**kwargs)
+        conn = self._get_connection()
+        total, success, pc_count = conn.execute(
+            f"SELECT COUNT(*), SUM(result_code = 0), COUNT(DISTINCT pc_name) FROM execution_logs WHERE {where}",
+            params,
+        ).fetchone()
+        success = success or 0
+        return {'total': total, 'success': success, 'error': total - success, 'pc_count': pc_count}
+
+    def rebuild_rollups(self):
+        """
+        集計テーブルをexecution_logsの現在の内容から作り直す。
+        ログを直接編集した場合など、集計とログが一致しなくなったときに使う。
+        """
+        conn = self._get_connection()
+        with conn:
+            for table, length in _ROLLUP_TABLES.values():
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(_rollup_backfill_sql(table, length))
+
+    def get_rollup_summary(self, granularity='day', start=None, end=None, pc_name=None, task_name=None):
+        """
+        集計テーブルから期間ごとの成功・失敗件数を取得する。
+        :param granularity: 'day'（日別）または 'hour'（時間別）。
+        :param start: 集計を始める期間（'YYYY-MM-DD' や 'YYYY-MM-DDTHH'）。
+        :param end: 集計を終える期間（この期間を含む）。
+        :param pc_name: 指定した場合はそのPCのみを集計する。
+        :param task_name: 指定した場合はそのタスクのみを集計する。
+        :return: period, success, errorを含む辞書のリスト（期間の昇順）。
+        """
+        table, length = _ROLLUP_TABLES[granularity]
+        query = f"SELECT period, SUM(CASE WHEN success THEN run_count ELSE 0 END), SUM(CASE WHEN success THEN 0 ELSE run_count END) FROM {table} WHERE 1=1"
+        params = []
+        if start:
+            query += " AND period >= ?"
+            params.append(str(start)[:length])
+        if end:
+            query += " AND period <= ?"
+            params.append(str(end)[:length])
+        if pc_name:
+            query += " AND pc_name = ?"
+            params.append(pc_name)
+        if task_name:
+            query += " AND task_name = ?"
+            params.append(task_name)
+        query += " GROUP BY period ORDER BY period"
+        cursor = self._get_connection().execute(query, params)
+        return [{'period': row[0], 'success': row[1], 'error': row[2]} for row in cursor.fetchall()]
+
+    def get_months_before(self, table, before):
+        """
+        指定した日時より古い行が存在する月の一覧を返す。
+        :param table: 'execution_logs' または 'audit_logs'。
+        :param before: この日時（ISO 8601形式）より古い行を対象にする。
+        :return: 'YYYY-MM' 形式の文字列のリスト（古い順）。
+        """
+        _, time_column, _ = self._ARCHIVE_TABLES[table]
+        cursor = self._get_connection().execute(
+            f"SELECT DISTINCT substr({time_column}, 1, 7) FROM {table} WHERE {time_column} < ? ORDER BY 1", (before,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def archive_rows(self, table, start, end, archive_path):
+        """
+        指定した期間の行をアーカイブ用のデータベースファイルへ移動する。
+        アーカイブ側にはIDを保ったまま登録するため、途中で中断して再実行しても重複しない。
+        :param table: 'execution_logs' または 'audit_logs'。
+        :param start: 期間の開始（この日時を含む）。
+        :param end: 期間の終了（この日時を含まない）。
+        :param archive_path: アーカイブ先のデータベースファイルのパス。存在しない場合は作成する。
+        :return: 移動した行数。
+        """
+        id_column, time_column, columns = self._ARCHIVE_TABLES[table]
+        keys = ', '.join([id_column] + columns)
+        # アーカイブ先には移動するテーブルだけを作成する
+        ArchiveDBManager(archive_path, tables=(table,)).close()
+
+        conn = self._get_connection()
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive.{table} ({keys}) "
+                    f"SELECT {keys} FROM main.{table} WHERE {time_column} >= ? AND {time_column} < ?",
+                    (start, end),
+                )
+                moved = conn.execute(
+                    f"DELETE FROM main.{table} WHERE {time_column} >= ? AND {time_column} < ?", (start, end)
+                ).rowcount
+        finally:
+            conn.execute("DETACH DATABASE archive")
+        return moved
+
+    def reclaim_space(self):
+        """
+        削除で空いた領域をファイルから解放する。
+        auto_vacuumがINCREMENTALでない既存のデータベースは、初回のみVACUUMで切り替える。
+        """
+        conn = self._get_connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def save_pc_inventory(self, pc_name, pc_ip, system_info, disk_info):
+        """
+        PCの構成情報（OS・メモリ容量・ディスク構成）をキャッシュに保存する。
+        :param system_info: WindowsProductName, WindowsVersion, TotalPhysicalMemory を含む辞書。
+        :param disk_info: DeviceID, Size, FreeSpace を含む辞書のリスト。
+        """
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pc_inventory (pc_name, pc_ip, system_info, disk_info, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (pc_name, pc_ip, json.dumps(system_info, ensure_ascii=False), json.dumps(disk_info, ensure_ascii=False),
+                 datetime.now().isoformat()),
+            )
+
+    def save_pc_metrics(self, pc_name, pc_ip, status, last_seen=None, memory_info=None, disk_info=None, tasks_count=None, error=None):
+        """
+        PCの稼働状況（オンライン状態・空きメモリ・ディスクの空き容量・タスク数）をキャッシュに保存する。
+        :param status: 'Online', 'Offline' などの状態。
+        """
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pc_metrics_latest "
+                "(pc_name, pc_ip, status, last_seen, memory_info, disk_info, tasks_count, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (pc_name, pc_ip, status, last_seen, json.dumps(memory_info, ensure_ascii=False),
+                 json.dumps(disk_info, ensure_ascii=False), tasks_count, error, datetime.now().isoformat()),
+            )
+
+    def get_pc_cache(self, pc_name):
+        """
+        キャッシュしたPCの構成情報と稼働状況を取得する。
+        :return: {'inventory': 辞書またはNone, 'metrics': 辞書またはNone}。各辞書は updated_at を含む。
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        inventory = cursor.execute("SELECT * FROM pc_inventory WHERE pc_name = ?", (pc_name,)).fetchone()
+        metrics = cursor.execute("SELECT * FROM pc_metrics_latest WHERE pc_name = ?", (pc_name,)).fetchone()
+        cache = {'inventory': None, 'metrics': None}
+        if inventory is not None:
+            cache['inventory'] = dict(inventory)
+            for key in ('system_info', 'disk_info'):
+                cache['inventory'][key] = json.loads(inventory[key]) if inventory[key] else None
+        if metrics is not None:
+            cache['metrics'] = dict(metrics)
+            for key in ('memory_info', 'disk_info'):
+                cache['metrics'][key] = json.loads(metrics[key]) if metrics[key] else None
+        return cache
+
+    def add_pc_metric_samples(self, samples):
+        """
+        PCリソースのサンプルをまとめて登録する。1分・1時間・1日の集計テーブルはトリガーで更新される。
+        :param samples: (sampled_at, pc_name, metric, value) のタプルのイテラブル。
+        :return: 登録した件数。
+        """
+        samples = list(samples)
+        conn = self._get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO pc_metric_samples (sampled_at, pc_name, metric, value) VALUES (?, ?, ?, ?)", samples
+            )
+        return len(samples)
+
+    @staticmethod
+    def choose_metric_granularity(start, end):
+        """
+        期間の長さから、グラフに使う集計テーブルの粒度を選ぶ。
+        6時間以内は1分、7日以内は1時間、それより長い期間は1日ごとの値を使う。
+        :param start: 期間の開始（datetime）。
+        :param end: 期間の終了（datetime）。
+        """
+        hours = (end - start).total_seconds() / 3600
+        if hours <= 6:
+            return 'minute'
+        if hours <= 24 * 7:
+            return 'hour'
+        return 'day'
+
+    def get_pc_metric_series(self, metric, start, end=None, pc_names=None, granularity=None):
+        """
+        PCリソースの時系列データを、集計済みの粒度ごとの値として取得する。
+        :param metric: 指標名（例: 'memory_used_pct', 'disk_used_pct:C:'）。
+        :param start: 期間の開始（datetime）。
+        :param end: 期間の終了（datetime）。省略した場合は現在時刻。
+        :param pc_names: 指定した場合はそのPCのみを取得する。
+        :param granularity: 'minute', 'hour', 'day' のいずれか。省略した場合は期間の長さから選ぶ。
+        :return: bucket, pc_name, avg, min, max を含む辞書のリスト（bucketの昇順）。
+        """
+        end = end or datetime.now()
+        granularity = granularity or self.choose_metric_granularity(start, end)
+        table, length = _METRIC_TIERS[granularity]
+        query = (
+            f"SELECT bucket, pc_name, value_sum / sample_count, value_min, value_max FROM {table} "
+            "WHERE metric = ? AND bucket >= ? AND bucket <= ?"
+        )
+        params = [metric, start.isoformat()[:length], end.isoformat()[:length]]
+        if pc_names:
+            query += f" AND pc_name IN ({', '.join(['?'] * len(pc_names))})"
+            params.extend(pc_names)
+        query += " ORDER BY bucket, pc_name"
+        cursor = self._get_connection().execute(query, params)
+        return [
+            {'bucket': row[0], 'pc_name': row[1], 'avg': row[2], 'min': row[3], 'max': row[4]}
+            for row in cursor.fetchall()
+        ]
+
+    def get_pc_metric_names(self):
+        """記録されている指標名の一覧を返す（日別の集計テーブルから求める）。"""
+        table, _ = _METRIC_TIERS['day']
+        cursor = self._get_connection().execute(f"SELECT DISTINCT metric FROM {table} ORDER BY metric")
+        return [row[0] for row in cursor.fetchall()]
+
+    def prune_pc_metrics(self, before):
+        """
+        保存期間を過ぎたPCリソースの時系列データを削除する。
+        :param before: 粒度ごとの削除基準の日時（ISO 8601形式）。'raw' は生のサンプルを表す。
+            例: {'raw': '2024-03-03', 'minute': '2024-03-03', 'hour': '2023-12-11'}。含まれない粒度は削除しない。
+        :return: 削除した行数の合計。
+        """
+        deleted = 0
+        conn = self._get_connection()
+        with conn:
+            if before.get('raw'):
+                deleted += conn.execute("DELETE FROM pc_metric_samples WHERE sampled_at < ?", (before['raw'],)).rowcount
+            for granularity, (table, length) in _METRIC_TIERS.items():
+                if before.get(granularity):
+                    deleted += conn.execute(
+                        f"DELETE FROM {table} WHERE bucket < ?", (str(before[granularity])[:length],)
+                    ).rowcount
+        return deleted
+
     def add_audit_log(self, audit_data):
         """
         操作監査ログを1件追加する。
@@ -133,6 +833,79 @@ class DBManager:
         keys = ', '.join(audit_data.keys())
         placeholders = ', '.join(['?'] * len(audit_data))
 
-        cursor.execute(f"INSERT INTO audit_logs ({keys}) VALUES ({placeholders})", list(audit_data.values()))
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor.execute(f"INSERT INTO audit_logs ({keys}) VALUES ({placeholders})", list(audit_data.values()))
+
+    def add_audit_logs(self, audit_logs):
+        """
+        複数の操作監査ログを1つのトランザクションでまとめて追加する。
+        timestampが指定されていないログには現在時刻を設定する（操作した時刻を残すため、指定がある場合はそれを使う）。
+        :param audit_logs: add_audit_logと同じ形式の辞書のイテラブル。
+        :return: 追加された監査ログのIDのリスト。
+        """
+        now = datetime.now().isoformat()
+        rows = (
+            tuple(audit.get(column) or now if column == 'timestamp' else audit.get(column)
+                  for column in self._AUDIT_LOG_COLUMNS)
+            for audit in audit_logs
+        )
+        return self._insert_many('audit_logs', 'audit_id', self._AUDIT_LOG_COLUMNS, rows)
+
+class ArchiveDBManager(DBManager):
+    """
+    月ごとのアーカイブファイル(logs_YYYYMM.db)への接続を管理するクラス。
+    アーカイブしたテーブルと、ログ検索で使う全文検索の索引だけを作成し、集計テーブルやPC情報のテーブルは作らない。
+    書き込みの少ないファイルなので、ジャーナルモードはWALではなくDELETEにする。
+    """
+    # テーブルごとにアーカイブファイルへ作成するSQL
+    _ARCHIVE_SCHEMA = {
+        'execution_logs': [
+            """
+            CREATE TABLE IF NOT EXISTS execution_logs (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recorded_at TEXT NOT NULL,
+                pc_name TEXT NOT NULL,
+                task_path TEXT NOT NULL,
+                task_name TEXT NOT NULL,
+                result_code INTEGER,
+                result_message TEXT,
+                ai_analysis TEXT,
+                last_run_at TEXT
+            )
+            """,
+        ]
+        + _fts_sql('execution_logs_fts', ['result_message', 'ai_analysis'])
+        + _fts_sql('execution_logs_task_fts', ['task_name']),
+        'audit_logs': [
+            """
+            CREATE TABLE IF NOT EXISTS audit_logs (
+                audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                user_identifier TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                target_pc TEXT,
+                target_task TEXT,
+                details TEXT
+            )
+            """,
+        ],
+    }
+
+    def __init__(self, path, tables=('execution_logs',)):
+        """
+        コンストラクタ。
+        :param path: アーカイブファイルのパス。存在しない場合は作成する。
+        :param tables: 作成するテーブル名のタプル。ログ検索で開く場合はexecution_logsだけでよい。
+        """
+        self.tables = tables
+        super().__init__(path, journal_mode='DELETE')
+
+    def _create_tables_if_not_exists(self):
+        """
+        指定されたテーブルが存在しない場合、作成する。
+        """
+        conn = self._get_connection()
+        with conn:
+            for table in self.tables:
+                for statement in self._ARCHIVE_SCHEMA[table]:
+                    conn.execute(statement)
@@ -1,6 +1,8 @@
 import json
 import os
 import logging
+import threading
+import time
 
 class ErrorManager:
     """エラーコードとメッセージを管理するクラス"""
@@ -8,64 +10,95 @@ class ErrorManager:
     def __init__(self, error_codes_path='data/error_codes.json'):
         self.error_codes_path = error_codes_path
         self.error_codes = {}
-        self.timeout_error_codes = []
+        self.timeout_error_codes = set()
         self.timeout_solutions = {}
+        # 読み込んだ時点の設定ファイルの更新時刻（ファイルの変更を検知するために使う）
+        self.loaded_mtime = None
         self.load_error_codes()
     
+    @staticmethod
+    def normalize_code(code):
+        """
+        エラーコードを整数に変換する。
+        "0x00041306" のような16進数文字列、10進数文字列、数値のいずれも受け付け、
+        負の値（符号付き32ビットのHRESULT）はタスクスケジューラが返す符号なしの値に揃える。
+        :return: 変換後の整数。変換できない場合はNone。
+        """
+        if isinstance(code, bool):
+            return None
+        if isinstance(code, (int, float)):
+            value = int(code)
+        else:
+            text = str(code).strip()
+            try:
+                value = int(text, 16) if text.lower().startswith('0x') else int(text)
+            except ValueError:
+                return None
+        if -0x80000000 <= value < 0:
+            value += 0x100000000
+        return value
+    
+    def _get_file_mtime(self):
+        """設定ファイルの更新時刻を返す。ファイルがない場合はNone。"""
+        try:
+            return os.path.getmtime(self.error_codes_path)
+        except OSError:
+            return None
+    
+    def is_stale(self):
+        """読み込んだ後に設定ファイルが変更されたかどうかを返す"""
+        return self._get_file_mtime() != self.loaded_mtime
+    
     def load_error_codes(self):
-        """エラーコード設定ファイルを読み込む"""
+        """
+        エラーコード設定ファイルを読み込む。
+        共有インスタンスを読み込み中に参照されても途中の状態が見えないよう、読み込み終えてから差し替える。
+        """
         try:
             if os.path.exists(self.error_codes_path):
+                mtime = self._get_file_mtime()
                 with open(self.error_codes_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     
                 # エラーコード辞書を統合
-                self.error_codes = {}
+                error_codes = {}
                 if 'error_codes' in data:
                     for category, codes in data['error_codes'].items():
                         for code, message in codes.items():
                             # 16進数コードを10進数に変換
-                            if code.startswith('0x'):
-                                try:
-                                    decimal_code = int(code, 16)
-                                    self.error_codes[decimal_code] = message
-                                except ValueError:
-                                    logging.warning(f"無効な16進数コード: {code}")
+                            decimal_code = self.normalize_code(code)
+                            if decimal_code is None:
+                                logging.warning(f"無効なエラーコード: {code}")
                             else:
-                                try:
-                                    decimal_code = int(code)
-                                    self.error_codes[decimal_code] = message
-                                except ValueError:
-                                    logging.warning(f"無効なエラーコード: {code}")
+                                error_codes[decimal_code] = message
                 
                 # タイムアウトエラーコードを設定
+                timeout_error_codes = self.timeout_error_codes
                 if 'timeout_error_codes' in data:
-                    self.timeout_error_codes = []
+                    timeout_error_codes = set()
                     for code in data['timeout_error_codes']:
-                        if code.startswith('0x'):
-                            try:
-                                decimal_code = int(code, 16)
-                                self.timeout_error_codes.append(decimal_code)
-                            except ValueError:
-                                logging.warning(f"無効なタイムアウトエラーコード: {code}")
+                        decimal_code = self.normalize_code(code)
+                        if decimal_code is None:
+                            logging.warning(f"無効なタイムアウトエラーコード: {code}")
                         else:
-                            try:
-                                decimal_code = int(code)
-                                self.timeout_error_codes.append(decimal_code)
-                            except ValueError:
-                                logging.warning(f"無効なタイムアウトエラーコード: {code}")
+                            timeout_error_codes.add(decimal_code)
                 
+                self.error_codes = error_codes
+                self.timeout_error_codes = timeout_error_codes
                 # タイムアウト対処法を設定
                 if 'timeout_solutions' in data:
                     self.timeout_solutions = data['timeout_solutions']
+                self.loaded_mtime = mtime
                 
                 logging.info(f"エラーコード設定を読み込みました: {len(self.error_codes)}件")
             else:
                 logging.warning(f"エラーコード設定ファイルが見つかりません: {self.error_codes_path}")
                 self._create_default_error_codes()
+                self.loaded_mtime = None
         except Exception as e:
             logging.error(f"エラーコード設定の読み込みに失敗しました: {e}")
             self._create_default_error_codes()
+            self.loaded_mtime = self._get_file_mtime()
     
     def _create_default_error_codes(self):
         """デフォルトのエラーコードを設定"""
@@ -92,14 +125,14 @@ class ErrorManager:
             0x00041326: 'タスクが無効になっています'
         }
         
-        self.timeout_error_codes = [
+        self.timeout_error_codes = {
             0x00041306,
             0x00041324,
             124,
             258,
             1460,
             1461
-        ]
+        }
         
         self.timeout_solutions = {
             "title": "タイムアウトエラーの対処法",
@@ -153,18 +186,23 @@ class ErrorManager:
     
     def add_error_code(self, code, message):
         """新しいエラーコードを追加"""
-        if isinstance(code, str) and code.startswith('0x'):
-            try:
-                decimal_code = int(code, 16)
-                self.error_codes[decimal_code] = message
-            except ValueError:
-                logging.error(f"無効な16進数コード: {code}")
+        decimal_code = self.normalize_code(code)
+        if decimal_code is None:
+            logging.error(f"無効なエラーコード: {code}")
         else:
-            try:
-                decimal_code = int(code)
-                self.error_codes[decimal_code] = message
-            except ValueError:
-                logging.error(f"無効なエラーコード: {code}")
+            self.error_codes[decimal_code] = message
+    
+    def add_timeout_error_code(self, code):
+        """
+        タイムアウトエラーとして扱うコードを追加する。
+        :return: 追加できた場合はTrue、コードが不正な場合はFalse。
+        """
+        decimal_code = self.normalize_code(code)
+        if decimal_code is None:
+            logging.error(f"無効なタイムアウトエラーコード: {code}")
+            return False
+        self.timeout_error_codes = self.timeout_error_codes | {decimal_code}
+        return True
     
     def save_error_codes(self):
         """エラーコード設定をファイルに保存"""
@@ -187,7 +225,7 @@ class ErrorManager:
                     data["error_codes"]["general"][str(code)] = message
             
             # タイムアウトエラーコードを保存
-            for code in self.timeout_error_codes:
+            for code in sorted(self.timeout_error_codes):
                 if code >= 0x80041300:
                     data["timeout_error_codes"].append(f"0x{code:08X}")
                 else:
@@ -198,6 +236,41 @@ class ErrorManager:
             with open(self.error_codes_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             
+            self.loaded_mtime = self._get_file_mtime()
             logging.info("エラーコード設定を保存しました")
         except Exception as e:
-            logging.error(f"エラーコード設定の保存に失敗しました: {e}") 
\ No newline at end of file
+            logging.error(f"エラーコード設定の保存に失敗しました: {e}") 
+
+
+# 設定ファイルごとに共有するErrorManager
+_shared_error_managers = {}
+_shared_error_managers_lock = threading.Lock()
+# 設定ファイルの変更を確認する間隔（秒）。表示する行ごとにファイルを確認しないようにする。
+_STALE_CHECK_INTERVAL = 1.0
+
+def get_error_manager(error_codes_path='data/error_codes.json'):
+    """
+    プロセス全体で共有されるErrorManagerを返す。
+    設定ファイルが外部で変更されていた場合は、同じインスタンスのまま読み込み直す。
+    """
+    with _shared_error_managers_lock:
+        entry = _shared_error_managers.get(error_codes_path)
+        if entry is None:
+            entry = {'manager': ErrorManager(error_codes_path), 'checked_at': time.monotonic()}
+            _shared_error_managers[error_codes_path] = entry
+        elif time.monotonic() - entry['checked_at'] >= _STALE_CHECK_INTERVAL:
+            entry['checked_at'] = time.monotonic()
+            if entry['manager'].is_stale():
+                entry['manager'].reload_error_codes()
+        return entry['manager']
+
+def invalidate_error_manager(error_codes_path='data/error_codes.json'):
+    """
+    共有ErrorManagerを設定ファイルから読み込み直す。
+    管理画面での変更後に呼び出し、保存に失敗した場合でもファイルの内容と一致させる。
+    """
+    with _shared_error_managers_lock:
+        entry = _shared_error_managers.get(error_codes_path)
+        if entry is not None:
+            entry['manager'].reload_error_codes()
+            entry['checked_at'] = time.monotonic()
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from core.reachability import get_reachability_checker
+from core.task_manager import TaskManager
+
+# プロセス全体で共有するスレッドプール（同時接続数ごと）
+_shared_executors = {}
+_shared_executors_lock = threading.Lock()
+
+def get_scan_executor(max_workers):
+    """
+    スキャンに使うスレッドプールを返す。
+    スキャンのたびに作り直すと、打ち切ったPCのスレッドが作り直すごとに残って増えていくため、
+    同じ同時接続数のスキャンでは1つのプールを使い回し、スレッド数を同時接続数までに抑える。
+    """
+    with _shared_executors_lock:
+        executor = _shared_executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fleet-scan')
+            _shared_executors[max_workers] = executor
+        return executor
+
+class FleetScanner:
+    """複数PCへのリモート処理（タスク取得など）をスレッドプールで並列実行するクラス。"""
+    def __init__(self, config_manager, db_manager, max_workers=None, host_timeout=None):
+        """
+        コンストラクタ。
+        :param config_manager: ConfigManagerインスタンス
+        :param db_manager: DBManagerインスタンス
+        :param max_workers: 同時に接続するPC数の上限。未指定の場合は設定ファイルの値を使う。
+        :param host_timeout: 1台あたりの処理時間の上限（秒）。未指定の場合は設定ファイルの値を使う。
+        """
+        self.config_manager = config_manager
+        self.db_manager = db_manager
+        scan_config = config_manager.get_config().get('fleet_scan', {})
+        self.max_workers = max_workers or scan_config.get('max_workers', 8)
+        self.host_timeout = host_timeout or scan_config.get('host_timeout_sec', 120)
+        self.precheck = config_manager.get_config().get('reachability', {}).get('enabled', True)
+
+    @staticmethod
+    def _fetch_tasks(task_manager, pc):
+        """デフォルトの処理: PCから手動作成タスクを差分取得する。"""
+        return task_manager.get_tasks_from_pc(pc['ip'], delta=True)
+
+    def _run_one(self, pc, username, password, fetch, started):
+        """
+        ワーカースレッドで1台分の処理を実行する。
+        1台あたりの期限をWinRMの呼び出しにも渡し、打ち切ったPCのスレッドが期限を過ぎても残り続けないようにする。
+        """
+        started[pc['name']] = time.monotonic()
+        task_manager = TaskManager(self.config_manager, self.db_manager, username, password,
+                                   deadline=started[pc['name']] + self.host_timeout)
+        return fetch(task_manager, pc)
+
+    def scan(self, pcs, credentials, fetch=None):
+        """
+        指定されたPCに並列で処理を実行し、完了したPCから順に結果を返すジェネレータ。
+        :param pcs: 設定ファイルのPC情報（name, ipを含む辞書）のリスト。
+        :param credentials: PC名をキーとする認証情報の辞書（credentials.jsonの内容）。
+        :param fetch: (TaskManager, pc) を受け取り結果を返す関数。未指定の場合はタスク一覧を取得する。
+        :return: {'pc', 'result', 'error', 'elapsed'} を含む辞書を完了順にyieldする。
+        """
+        fetch = fetch or self._fetch_tasks
+        credentials = credentials or {}
+        started = {}
+        scan_start = time.monotonic()
+
+        logging.info(f"=== フリートスキャン開始: {len(pcs)}台 (同時接続数: {self.max_workers}) ===")
+        # WinRMで接続する前に全PCのポートへの接続だけを並列に確認し、応答のないPCのタイムアウトを待たないようにする
+        reachable = {}
+        if self.precheck:
+            reachable = get_reachability_checker(self.config_manager).check([pc['ip'] for pc in pcs])
+        executor = get_scan_executor(self.max_workers)
+        futures = {}
+        try:
+            for pc in pcs:
+                pc_creds = credentials.get(pc['name']) or {}
+                username, password = pc_creds.get('username'), pc_creds.get('password')
+                if not username or not password:
+                    logging.warning(f"{pc['name']}の認証情報が見つかりません。スキップします。")
+                    yield {'pc': pc, 'result': None, 'error': f"認証情報が見つかりません: {pc['name']}", 'elapsed': 0.0}
+                    continue
+                if reachable.get(pc['ip']) is False:
+                    logging.warning(f"{pc['name']}に接続できないため、スキップします。")
+                    yield {'pc': pc, 'result': None, 'error': f"応答がありません: {pc['name']} ({pc['ip']})", 'elapsed': 0.0}
+                    continue
+                future = executor.submit(self._run_one, pc, username, password, fetch, started)
+                futures[future] = pc
+
+            pending = set(futures)
+            while pending:
+                # 実行中のPCのうち、最も早く期限を迎えるものまで待つ
+                now = time.monotonic()
+                deadlines = [started[futures[f]['name']] + self.host_timeout
+                             for f in pending if futures[f]['name'] in started]
+                timeout = max(0.0, min(deadlines) - now) if deadlines else self.host_timeout
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    pc = futures[future]
+                    elapsed = time.monotonic() - started.get(pc['name'], scan_start)
+                    try:
+                        yield {'pc': pc, 'result': future.result(), 'error': None, 'elapsed': elapsed}
+                    except Exception as e:
+                        logging.error(f"{pc['name']}の処理中にエラーが発生しました: {e}")
+                        yield {'pc': pc, 'result': None, 'error': str(e), 'elapsed': elapsed}
+
+                # 期限を超えたPCは結果を待たずに打ち切る
+                now = time.monotonic()
+                for future in list(pending):
+                    pc = futures[future]
+                    pc_started = started.get(pc['name'])
+                    if pc_started is not None and now - pc_started >= self.host_timeout:
+                        pending.discard(future)
+                        future.cancel()
+                        logging.warning(f"{pc['name']}の処理が{self.host_timeout}秒以内に完了しなかったため打ち切りました。")
+                        yield {'pc': pc, 'result': None, 'error': f"タイムアウト ({self.host_timeout}秒)", 'elapsed': now - pc_started}
+        finally:
+            # 打ち切ったPCのスレッドは待たずに戻り、まだ始まっていないPCは取り消す
+            for future in futures:
+                future.cancel()
+            logging.info(f"=== フリートスキャン完了: {time.monotonic() - scan_start:.1f}秒 ===")
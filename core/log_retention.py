@@ -0,0 +1,101 @@
+import glob
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from core.db_manager import ArchiveDBManager
+
+# アーカイブファイル名（logs_YYYYMM.db）
+ARCHIVE_FILE_PATTERN = re.compile(r'^logs_(\d{4})(\d{2})\.db$')
+
+class LogRetention:
+    """
+    保存期間を過ぎたログを月ごとのアーカイブファイルへ移し、logs.dbを小さく保つクラス。
+    アーカイブファイルは移動したテーブルと全文検索の索引だけを持つSQLiteファイルで、ArchiveDBManagerで検索できる。
+    """
+    def __init__(self, config_manager, db_manager):
+        """
+        コンストラクタ。
+        :param config_manager: ConfigManagerインスタンス
+        :param db_manager: DBManagerインスタンス（保存期間を適用するデータベース）
+        """
+        self.config_manager = config_manager
+        self.db_manager = db_manager
+        self.last_run = None
+
+    def _settings(self):
+        """保存期間の設定を返す。日数が0または未設定のテーブルはアーカイブしない。"""
+        retention = self.config_manager.get_config().get('retention', {})
+        return {
+            'days': {
+                'execution_logs': retention.get('execution_logs_days', 365),
+                'audit_logs': retention.get('audit_logs_days', 730),
+            },
+            'archive_dir': retention.get('archive_dir', 'data/archive'),
+            'interval_hours': retention.get('interval_hours', 24),
+        }
+
+    def archive_path(self, month):
+        """'YYYY-MM' 形式の月に対応するアーカイブファイルのパスを返す。"""
+        return os.path.join(self._settings()['archive_dir'], f"logs_{month.replace('-', '')}.db")
+
+    @staticmethod
+    def _next_month(month):
+        """'YYYY-MM' の翌月を返す。"""
+        year, mon = int(month[:4]), int(month[5:7])
+        return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+    def run(self, now=None):
+        """
+        保存期間を過ぎたログをアーカイブし、空いた領域を解放する。
+        :param now: 基準日時。省略した場合は現在時刻。
+        :return: テーブル名をキー、アーカイブした行数を値とする辞書。
+        """
+        now = now or datetime.now()
+        settings = self._settings()
+        os.makedirs(settings['archive_dir'], exist_ok=True)
+
+        archived = {}
+        for table, days in settings['days'].items():
+            archived[table] = 0
+            if not days:
+                continue
+            cutoff = (now - timedelta(days=days)).isoformat()
+            for month in self.db_manager.get_months_before(table, cutoff):
+                end = min(self._next_month(month), cutoff)
+                archived[table] += self.db_manager.archive_rows(table, month, end, self.archive_path(month))
+
+        if any(archived.values()):
+            self.db_manager.reclaim_space()
+        logging.info(f"保存期間を過ぎたログをアーカイブしました: {archived}")
+        self.last_run = time.time()
+        return archived
+
+    def run_if_due(self):
+        """前回の実行から設定された間隔が過ぎていればアーカイブを実行する。"""
+        interval = self._settings()['interval_hours'] * 3600
+        if self.last_run is None or time.time() - self.last_run >= interval:
+            try:
+                return self.run()
+            except Exception as e:
+                logging.error(f"ログのアーカイブに失敗しました: {e}")
+                self.last_run = time.time()
+        return None
+
+    def list_archives(self):
+        """
+        アーカイブファイルの一覧を返す。
+        :return: ('YYYY-MM', ファイルパス) のタプルのリスト（新しい順）。
+        """
+        archives = []
+        for path in glob.glob(os.path.join(self._settings()['archive_dir'], 'logs_*.db')):
+            match = ARCHIVE_FILE_PATTERN.match(os.path.basename(path))
+            if match:
+                archives.append((f"{match.group(1)}-{match.group(2)}", path))
+        return sorted(archives, reverse=True)
+
+    def open_archive(self, month):
+        """指定した月のアーカイブファイルを検索用のArchiveDBManagerとして開く。"""
+        return ArchiveDBManager(self.archive_path(month))
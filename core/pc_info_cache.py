@@ -0,0 +1,139 @@
+import logging
+import time
+from datetime import datetime
+
+# 時系列データとして記録する指標名と表示名。ディスクの指標は「指標名:ドライブ」の形式で記録する。
+METRIC_LABELS = {
+    'memory_used_pct': 'メモリ使用率 (%)',
+    'disk_used_pct': 'ディスク使用率 (%)',
+    'disk_free_gb': 'ディスク空き容量 (GB)',
+}
+
+def build_metric_samples(info, sampled_at):
+    """
+    get_pc_infoと同じ形式のPC情報から、時系列データとして記録するサンプルを作成する。
+    :param info: PC情報の辞書（オンラインでない場合はサンプルを作成しない）。
+    :param sampled_at: サンプルの日時（ISO 8601形式）。
+    :return: (sampled_at, pc_name, metric, value) のタプルのリスト。
+    """
+    if info.get('status') != 'Online':
+        return []
+    samples = []
+    memory = info.get('memory_info') or {}
+    total_memory = memory.get('TotalVisibleMemorySize') or 0
+    if total_memory and memory.get('FreePhysicalMemory') is not None:
+        used = (total_memory - memory['FreePhysicalMemory']) / total_memory * 100
+        samples.append((sampled_at, info['name'], 'memory_used_pct', round(used, 2)))
+    for disk in info.get('disk_info') or []:
+        if not disk.get('Size') or disk.get('FreeSpace') is None:
+            continue
+        device = disk.get('DeviceID', 'Unknown')
+        used = (disk['Size'] - disk['FreeSpace']) / disk['Size'] * 100
+        samples.append((sampled_at, info['name'], f"disk_used_pct:{device}", round(used, 2)))
+        samples.append((sampled_at, info['name'], f"disk_free_gb:{device}", round(disk['FreeSpace'] / 1024 ** 3, 2)))
+    return samples
+
+class PcInfoCache:
+    """
+    PC情報画面に表示するPCの構成情報と稼働状況を、logs.dbにキャッシュして返すクラス。
+    OS・メモリ容量などの構成情報は長いTTLで、オンライン状態・空きメモリ・空き容量などの稼働状況は短いTTLで更新する。
+    """
+    def __init__(self, config_manager, db_manager):
+        """
+        コンストラクタ。
+        :param config_manager: ConfigManagerインスタンス
+        :param db_manager: DBManagerインスタンス（キャッシュを保存するデータベース）
+        """
+        self.config_manager = config_manager
+        self.db_manager = db_manager
+
+    def _settings(self):
+        """キャッシュのTTL（秒）を返す。"""
+        cache_config = self.config_manager.get_config().get('pc_info_cache', {})
+        return {
+            'inventory_ttl': cache_config.get('inventory_ttl_sec', 86400),
+            'metrics_ttl': cache_config.get('metrics_ttl_sec', 60),
+        }
+
+    @staticmethod
+    def _age(entry, now):
+        """キャッシュの経過秒数を返す。キャッシュがない場合はNone。"""
+        if not entry:
+            return None
+        return now - datetime.fromisoformat(entry['updated_at']).timestamp()
+
+    @staticmethod
+    def _build_info(pc_name, pc_ip, cache):
+        """キャッシュの内容をget_pc_infoと同じ形式の辞書にまとめる。"""
+        inventory = cache['inventory'] or {}
+        metrics = cache['metrics'] or {}
+        info = {
+            'name': pc_name,
+            'ip': pc_ip,
+            'status': metrics.get('status', 'Unknown'),
+            'system_info': inventory.get('system_info') or {},
+            # ディスクは空き容量を含む稼働状況のものを優先する
+            'disk_info': metrics.get('disk_info') or inventory.get('disk_info') or [],
+            'memory_info': metrics.get('memory_info') or {},
+            'tasks_count': metrics.get('tasks_count') or 0,
+            'cached_at': metrics.get('updated_at'),
+        }
+        if metrics.get('last_seen'):
+            info['last_seen'] = metrics['last_seen']
+        if metrics.get('error'):
+            info['error'] = metrics['error']
+        return info
+
+    def get_cached(self, pc_name, pc_ip):
+        """
+        リモート呼び出しを行わずに、キャッシュからPC情報を返す。
+        :return: get_pc_infoと同じ形式の辞書。キャッシュがない場合はNone。
+        """
+        cache = self.db_manager.get_pc_cache(pc_name)
+        if cache['inventory'] is None and cache['metrics'] is None:
+            return None
+        return self._build_info(pc_name, pc_ip, cache)
+
+    def get_info(self, task_manager, pc_name, pc_ip, force=False):
+        """
+        PC情報を返す。TTL内のキャッシュはそのまま使い、期限切れの部分だけをリモートから取得する。
+        構成情報が有効な間は、稼働状況のみを取得する軽いスクリプトを使う。
+        :param task_manager: リモート呼び出しに使うTaskManager。
+        :param force: Trueの場合、稼働状況のTTLを無視して取得し直す（構成情報はTTLに従う）。
+        :return: get_pc_infoと同じ形式の辞書。
+        """
+        settings = self._settings()
+        now = time.time()
+        cache = self.db_manager.get_pc_cache(pc_name)
+        inventory_age = self._age(cache['inventory'], now)
+        metrics_age = self._age(cache['metrics'], now)
+        needs_inventory = inventory_age is None or inventory_age > settings['inventory_ttl']
+        needs_metrics = force or metrics_age is None or metrics_age > settings['metrics_ttl']
+
+        if needs_inventory or needs_metrics:
+            success, health = task_manager.get_pc_health(pc_ip, include_inventory=needs_inventory)
+            if success:
+                if needs_inventory and health.get('System'):
+                    self.db_manager.save_pc_inventory(pc_name, pc_ip, health['System'], health['Disks'])
+                self.db_manager.save_pc_metrics(
+                    pc_name, pc_ip, 'Online',
+                    last_seen=health.get('LastSeen'),
+                    memory_info=health.get('Memory'),
+                    disk_info=health['Disks'],
+                    tasks_count=health.get('TasksCount'),
+                )
+            else:
+                logging.warning(f"PC情報の取得に失敗しました: {pc_name} ({pc_ip}): {health}")
+                # 前回の値は残し、状態とエラーだけを更新する
+                previous = cache['metrics'] or {}
+                self.db_manager.save_pc_metrics(
+                    pc_name, pc_ip, 'Offline',
+                    last_seen=previous.get('last_seen'),
+                    memory_info=previous.get('memory_info'),
+                    disk_info=previous.get('disk_info'),
+                    tasks_count=previous.get('tasks_count'),
+                    error=health,
+                )
+            cache = self.db_manager.get_pc_cache(pc_name)
+
+        return self._build_info(pc_name, pc_ip, cache)
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+import time
+
+class HostBreaker:
+    """1台分の到達確認の状態（連続失敗回数と、接続を試みない期限）を保持するクラス。"""
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+class ReachabilityChecker:
+    """
+    WinRMのポートへのTCP接続だけで、PCに到達できるかを並列に確認するクラス。
+    応答のなかったPCはホストごとのサーキットブレーカーで記録し、失敗が続くほど長い間（指数バックオフ）
+    接続を試みずに即座にオフラインとして扱う。これにより、電源の入っていないPCでWinRMのタイムアウトを待たずに済む。
+    """
+    def __init__(self, port=5985, timeout=1.0, backoff_base=30, backoff_max=600):
+        """
+        コンストラクタ。
+        :param port: 接続を確認するポート（WinRM HTTPは5985）。
+        :param timeout: 1台あたりの接続確認の上限（秒）。
+        :param backoff_base: 1回目の失敗後に接続を試みない秒数。失敗が続くたびに2倍にする。
+        :param backoff_max: 接続を試みない秒数の上限。
+        """
+        self.port = port
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, host):
+        """ホストのブレーカーが開いている（接続を試みない期間中）かどうかを返す。"""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            return breaker is not None and time.monotonic() < breaker.open_until
+
+    def record_success(self, host):
+        """接続に成功したホストのブレーカーを閉じる。"""
+        with self._lock:
+            if self._breakers.pop(host, None) is not None:
+                logging.info(f"{host}への接続が回復しました")
+
+    def reset(self, host=None):
+        """
+        ブレーカーを閉じ、次の確認で接続を試みるようにする（利用者が最新の情報を求めた場合など）。
+        hostを省略した場合は全ホスト分を閉じる。
+        """
+        with self._lock:
+            if host is None:
+                self._breakers.clear()
+            else:
+                self._breakers.pop(host, None)
+
+    def record_failure(self, host):
+        """
+        接続に失敗したホストのブレーカーを開く。
+        :return: 次に接続を試みるまでの秒数。
+        """
+        with self._lock:
+            breaker = self._breakers.setdefault(host, HostBreaker())
+            breaker.failures += 1
+            backoff = min(self.backoff_base * 2 ** (breaker.failures - 1), self.backoff_max)
+            breaker.open_until = time.monotonic() + backoff
+            failures = breaker.failures
+        logging.warning(f"{host}に接続できません。{backoff:.0f}秒間は接続を試みません（連続{failures}回目）")
+        return backoff
+
+    async def _probe(self, host):
+        """ホストのポートにTCP接続できるかを確認する。"""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _probe_all(self, hosts):
+        """複数のホストを同時に確認する。"""
+        results = await asyncio.gather(*(self._probe(host) for host in hosts))
+        return dict(zip(hosts, results))
+
+    def check(self, hosts):
+        """
+        ホストに到達できるかを並列に確認する。ブレーカーが開いているホストは確認せずに到達できないものとする。
+        全体の所要時間は、ホスト数に関係なくおおむねtimeout以内に収まる。
+        :param hosts: ホスト名またはIPアドレスのリスト。
+        :return: ホストをキー、到達できるかどうかを値とする辞書。
+        """
+        results = {host: False for host in hosts if self.is_open(host)}
+        targets = list(dict.fromkeys(host for host in hosts if host not in results))
+        if targets:
+            for host, reachable in asyncio.run(self._probe_all(targets)).items():
+                if reachable:
+                    self.record_success(host)
+                else:
+                    self.record_failure(host)
+                results[host] = reachable
+        return results
+
+
+# プロセス全体で共有する到達確認（ブレーカーの状態を画面・収集デーモンの全処理で共有する）
+_shared_checker = None
+_shared_checker_lock = threading.Lock()
+
+def get_reachability_checker(config_manager=None):
+    """
+    共有のReachabilityCheckerを返す。
+    config_managerを指定した場合は、設定ファイルの reachability セクションの値を反映する。
+    """
+    global _shared_checker
+    with _shared_checker_lock:
+        if _shared_checker is None:
+            _shared_checker = ReachabilityChecker()
+        if config_manager is not None:
+            reachability_config = config_manager.get_config().get('reachability', {})
+            _shared_checker.port = reachability_config.get('port', 5985)
+            _shared_checker.timeout = reachability_config.get('timeout_sec', 1.0)
+            _shared_checker.backoff_base = reachability_config.get('backoff_base_sec', 30)
+            _shared_checker.backoff_max = reachability_config.get('backoff_max_sec', 600)
+        return _shared_checker
@@ -0,0 +1,202 @@
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from core.error_manager import get_error_manager
+from core.fleet_scanner import FleetScanner
+from core.log_retention import LogRetention
+from core.pc_info_cache import PcInfoCache, build_metric_samples
+from core.winrm_session_pool import get_session_pool
+
+# 実行結果として記録しないLastTaskResult（まだ結果が確定していない状態）
+PENDING_RESULT_CODES = {
+    0x00041301,  # タスクは現在実行中です
+    0x00041303,  # タスクはまだ実行されていません
+    0x00041325,  # タスクが実行キューに入っています
+}
+
+class ResultCollector:
+    """
+    全PCのタスク実行結果を定期的に収集し、execution_logsに記録するクラス。
+    (PC, タスク, LastRunTime) の組み合わせで重複を排除し、新しい実行分だけをまとめて登録する。
+    """
+    def __init__(self, config_manager, db_manager, credentials, error_manager=None):
+        """
+        コンストラクタ。
+        :param config_manager: ConfigManagerインスタンス
+        :param db_manager: DBManagerインスタンス
+        :param credentials: PC名をキーとする認証情報の辞書（credentials.jsonの内容）。
+        :param error_manager: 結果メッセージの生成に使うErrorManagerインスタンス。
+        """
+        self.config_manager = config_manager
+        self.db_manager = db_manager
+        self.credentials = credentials
+        self.error_manager = error_manager or get_error_manager('data/error_codes.json')
+        self.scanner = FleetScanner(config_manager, db_manager)
+        self.retention = LogRetention(config_manager, db_manager)
+        collector_config = config_manager.get_config().get('collector', {})
+        self.interval = collector_config.get('interval_sec', 300)
+        self.jitter = collector_config.get('jitter_sec', 60)
+        # (pc_name, task_path, task_name) -> 記録済みの最新LastRunTime
+        self.last_seen = db_manager.get_last_run_times()
+        self.next_due = {}
+        # PCリソースの時系列データ（PC情報画面のキャッシュも同時に更新する）
+        self.pc_info_cache = PcInfoCache(config_manager, db_manager)
+        self.metrics_last_run = None
+
+    def _build_log(self, pc, task):
+        """タスク情報から実行結果ログの辞書を組み立てる。記録対象外の場合はNoneを返す。"""
+        last_run = task.get('LastRunTime')
+        result_code = task.get('LastTaskResult')
+        if not last_run or result_code is None:
+            return None
+        try:
+            result_code = int(result_code)
+        except (ValueError, TypeError):
+            return None
+        if result_code in PENDING_RESULT_CODES:
+            return None
+
+        last_run_at = last_run.isoformat() if hasattr(last_run, 'isoformat') else str(last_run)
+        key = (pc['name'], task.get('TaskPath') or '\\', task.get('TaskName'))
+        if self.last_seen.get(key) is not None and self.last_seen[key] >= last_run_at:
+            return None
+
+        return {
+            'recorded_at': last_run_at,
+            'pc_name': key[0],
+            'task_path': key[1],
+            'task_name': key[2],
+            'result_code': result_code,
+            'result_message': '正常終了' if result_code == 0 else self.error_manager.get_error_message(result_code),
+            'last_run_at': last_run_at,
+        }
+
+    def collect(self, pcs):
+        """
+        指定されたPCからタスク情報を取得し、新しい実行結果をまとめて登録する。
+        :return: 登録した件数。
+        """
+        logs = []
+        for scan_result in self.scanner.scan(pcs, self.credentials):
+            pc = scan_result['pc']
+            if scan_result['error']:
+                logging.warning(f"{pc['name']}の実行結果を収集できませんでした: {scan_result['error']}")
+                continue
+            for task in scan_result['result'] or []:
+                log = self._build_log(pc, task)
+                if log:
+                    logs.append(log)
+        # 別プロセスの収集と重なった場合でも同じ実行は二重に登録しない
+        inserted = len(self.db_manager.add_execution_logs(logs, skip_duplicates=True))
+        # 登録が完了した（例外が発生しなかった）場合だけ記録済みとして扱う。
+        # 一意制約で読み飛ばしたログも、別のプロセスがすでに登録しているため記録済みに含める
+        for log in logs:
+            self.last_seen[(log['pc_name'], log['task_path'], log['task_name'])] = log['last_run_at']
+        logging.info(f"実行結果を{inserted}件記録しました（対象PC: {len(pcs)}台）")
+        return inserted
+
+    def _metrics_settings(self):
+        """PCリソースの収集間隔と、粒度ごとの保存日数を返す。日数が0の粒度は削除しない。"""
+        metrics_config = self.config_manager.get_config().get('metrics', {})
+        return {
+            'interval': metrics_config.get('interval_sec', 300),
+            'days': {
+                'raw': metrics_config.get('raw_days', 2),
+                'minute': metrics_config.get('minute_days', 7),
+                'hour': metrics_config.get('hour_days', 90),
+                'day': metrics_config.get('day_days', 0),
+            },
+        }
+
+    def collect_metrics(self, pcs, now=None):
+        """
+        指定されたPCの稼働状況を取得し、PCリソースのサンプルとして記録する。
+        保存期間を過ぎた時系列データもあわせて削除する。
+        :return: 記録したサンプル数。
+        """
+        now = now or datetime.now()
+        sampled_at = now.isoformat(timespec='seconds')
+        fetch = lambda task_manager, pc: self.pc_info_cache.get_info(task_manager, pc['name'], pc['ip'], force=True)
+        samples = []
+        for scan_result in self.scanner.scan(pcs, self.credentials, fetch=fetch):
+            if scan_result['error']:
+                logging.warning(f"{scan_result['pc']['name']}のリソース情報を収集できませんでした: {scan_result['error']}")
+                continue
+            samples.extend(build_metric_samples(scan_result['result'], sampled_at))
+        recorded = self.db_manager.add_pc_metric_samples(samples)
+
+        before = {
+            granularity: (now - timedelta(days=days)).isoformat()
+            for granularity, days in self._metrics_settings()['days'].items() if days
+        }
+        self.db_manager.prune_pc_metrics(before)
+        logging.info(f"PCリソースのサンプルを{recorded}件記録しました（対象PC: {len(pcs)}台）")
+        return recorded
+
+    def collect_metrics_if_due(self, pcs):
+        """前回のリソース収集から設定された間隔が過ぎていれば収集する。"""
+        interval = self._metrics_settings()['interval']
+        if self.metrics_last_run is not None and time.time() - self.metrics_last_run < interval:
+            return None
+        self.metrics_last_run = time.time()
+        try:
+            return self.collect_metrics(pcs)
+        except Exception as e:
+            logging.error(f"PCリソースの収集中にエラーが発生しました: {e}")
+            return None
+
+    def _schedule(self, pc_name, now, initial=False):
+        """次回の収集時刻を決める。全PCへの接続が同時に集中しないよう、ばらつきを加える。"""
+        if initial:
+            self.next_due[pc_name] = now + random.uniform(0, min(self.interval, self.jitter))
+        else:
+            self.next_due[pc_name] = now + self.interval + random.uniform(-self.jitter, self.jitter)
+
+    def run_forever(self):
+        """設定されたPCを間隔ごとに巡回して収集を続ける。"""
+        logging.info(f"=== 実行結果の収集を開始します（間隔: {self.interval}秒, ゆらぎ: ±{self.jitter}秒） ===")
+        while True:
+            # 管理画面でのPCの追加・削除を反映する
+            self.config_manager.load_config()
+            pcs = self.config_manager.get_config().get('pcs', [])
+            now = time.time()
+            for pc in pcs:
+                if pc['name'] not in self.next_due:
+                    self._schedule(pc['name'], now, initial=True)
+
+            due = [pc for pc in pcs if self.next_due[pc['name']] <= now]
+            if due:
+                try:
+                    self.collect(due)
+                except Exception as e:
+                    logging.error(f"実行結果の収集中にエラーが発生しました: {e}")
+                now = time.time()
+                for pc in due:
+                    self._schedule(pc['name'], now)
+
+            # PCリソースの時系列データの収集（設定された間隔ごと）
+            self.collect_metrics_if_due(pcs)
+
+            # 保存期間を過ぎたログのアーカイブ（設定された間隔ごと）
+            self.retention.run_if_due()
+
+            # 次の収集まで使わないWinRMセッションのうち、期限切れのものの接続を閉じる
+            get_session_pool().evict_idle()
+
+            # 次に収集するPCの時刻まで待つ（設定変更を拾うため最大でも60秒）
+            upcoming = [self.next_due[pc['name']] for pc in pcs]
+            wait = min(upcoming) - time.time() if upcoming else 60
+            time.sleep(min(max(wait, 1), 60))
+
+
+def load_credentials_file(path='data/credentials.json'):
+    """UIに依存せずに認証情報ファイルを読み込む。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.error(f"認証情報ファイルが見つかりません: {path}")
+        return {}
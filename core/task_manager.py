@@ -1,8 +1,18 @@
+import csv
+import io
 import json
 import logging
-import winrm
+import re
+import threading
 from datetime import datetime
 
+import requests
+
+from core.audit_writer import get_audit_writer
+from core.reachability import get_reachability_checker
+from core.task_trigger import TriggerSummary
+from core.winrm_session_pool import get_session_pool
+
 # ログ設定
 import os
 log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
@@ -17,377 +27,503 @@ logging.basicConfig(
     ]
 )
 
+# 差分取得のトークン（リモートPCが返すハッシュの先頭16桁）
+TOKEN_PATTERN = re.compile(r'^[0-9A-F]{16}$')
+
+# schtasks /query /fo csv /v の列の位置。ヘッダー名はOSの表示言語で変わるため、位置で読み取る。
+SCHTASKS_COLUMNS = {
+    'TaskName': 1,
+    'NextRunTime': 2,
+    'Status': 3,
+    'LastRunTime': 5,
+    'LastResult': 6,
+    'Author': 7,
+    'Comment': 10,
+    'ScheduleType': 18,
+}
+# schtasksの状態の表示名（英語・日本語）からGet-ScheduledTaskのState値への対応
+SCHTASKS_STATES = {
+    'disabled': 1, '無効': 1,
+    'queued': 2, 'キューに登録済み': 2,
+    'ready': 3, '準備完了': 3,
+    'running': 4, '実行中': 4,
+}
+# schtasksの日時の表記（OSの地域設定の短い日付＋長い時刻）。日本語環境の表記を先に試す。
+SCHTASKS_DATETIME_FORMATS = [
+    '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M:%S',
+]
+# 一度も実行されていないタスクのLast Run Time
+SCHTASKS_NEVER_RUN_YEAR = 1999
+
+def is_manual_task_author(author):
+    """
+    タスク一覧スクリプトと同じ条件で、作成者が利用者（ドメイン\\ユーザー）の手動作成タスクかどうかを判定する。
+    代替手段（schtasks・WMI）で取得したタスクの絞り込みに使う。
+    """
+    if not author or '\\' not in author:
+        return False
+    author = author.lower()
+    return 'nt authority' not in author and '$(@%systemroot%' not in author
+
 class TaskManager:
     """リモートPCのタスクスケジューラを操作するクラス。"""
-    def __init__(self, config_manager, db_manager, user, password):
+    # 差分取得用のPCごとのスナップショット（全インスタンスで共有）
+    _task_snapshots = {}
+    _snapshot_lock = threading.Lock()
+
+    def __init__(self, config_manager, db_manager, user, password, deadline=None):
         """
         コンストラクタ。
         :param config_manager: ConfigManagerインスタンス
         :param db_manager: DBManagerインスタンス
         :param user: リモート接続に使用するユーザー名。
         :param password: リモート接続に使用するパスワード。
+        :param deadline: リモート実行の完了を待つ期限（time.monotonicの値）。Noneの場合は完了するまで待つ。
         """
         self.config_manager = config_manager
         self.db_manager = db_manager
         self.user = user
         self.password = password
+        self.deadline = deadline
+        # 監査ログは書き込みキュー経由で非同期に登録し、操作の応答を待たせない
+        self.audit_writer = get_audit_writer(db_manager)
 
-    def _execute_ps_command(self, pc_ip, command):
+    def _execute_ps_command(self, pc_ip, command, force=False):
         """
         指定されたPCでPowerShellコマンドをリモート実行する。
-        【注意】このサンプルでは実際には実行せず、コマンドをログ出力するのみ。
+        WinRMセッションは共有プールから借り出し、接続と認証を使い回す。
+        直前に接続できなかったPC（ブレーカーが開いているPC）には接続を試みず、すぐに失敗を返す。
+        :param force: Trueの場合、ブレーカーが開いていても接続を試みる（利用者が操作した場合など）。
+            接続できればブレーカーは閉じる。
         """
+        reachability = get_reachability_checker(self.config_manager)
+        if not force and reachability.is_open(pc_ip):
+            return False, f"{pc_ip}に接続できないため、しばらく接続を試みません"
         logging.info(f"Executing on {pc_ip}: {command}")
         try:
-            # 実際のwinrm接続
-            session = winrm.Session(
-                f'http://{pc_ip}:5985/wsman',
-                auth=(self.user, self.password),
-                transport='ntlm',
-                server_cert_validation='ignore')
-            result = session.run_ps(command)
+            result = get_session_pool().run_ps(pc_ip, self.user, self.password, command, self.deadline)
+            reachability.record_success(pc_ip)
             if result.status_code == 0:
                 return True, result.std_out.decode('utf-8')
             else:
                 return False, result.std_err.decode('utf-8')
+        except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout) as e:
+            # 接続できなかった場合のみブレーカーを開く（応答待ちのタイムアウトはPCには到達できているため含めない）
+            reachability.record_failure(pc_ip)
+            logging.error(f"Failed to connect to {pc_ip}: {e}")
+            return False, str(e)
         except Exception as e:
             logging.error(f"Failed to execute command on {pc_ip}: {e}")
             return False, str(e)
 
-    def get_tasks_from_pc(self, pc_ip, folder_path='\\'):
-        """指定されたPCから手動作成タスクを取得する。"""
-        logging.info(f"=== タスク取得開始: {pc_ip} ===")
-        logging.info(f"フォルダパス: {folder_path}")
-        
-        # 段階的コマンド実行
-        logging.info(f"=== 段階的コマンド実行開始: {pc_ip} ===")
-        
-        # ステップ1: 基本的なタスク取得とデバッグ（Author絞り込みなし）
-        step1_command = f"""
-            [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
-            $allTasks = Get-ScheduledTask
-            $rootTasks = $allTasks | Where-Object {{ $_.TaskPath -eq '' }}
-            "全タスク数: $($allTasks.Count)"
-            "ルートタスク数: $($rootTasks.Count)"
-            "ルートタスクの最初の3件:"
-            $rootTasks | Select-Object -First 3 | ForEach-Object {{ "$($_.TaskName) - $($_.TaskPath)" }}
-            "=== デバッグ: 最初の5件のタスクパス ==="
-            $allTasks | Select-Object -First 5 | ForEach-Object {{ 
-                "TaskName: $($_.TaskName), TaskPath: '$($_.TaskPath)', TaskPath長: $($_.TaskPath.Length)" 
-            }}
-            "=== デバッグ: 空文字列条件のテスト ==="
-            $emptyPathCount = ($allTasks | Where-Object {{ $_.TaskPath -eq '' }}).Count
-            $backslashCount = ($allTasks | Where-Object {{ $_.TaskPath -eq '\' }}).Count
-            $nullCount = ($allTasks | Where-Object {{ $_.TaskPath -eq $null }}).Count
-            "空文字列条件: $emptyPathCount件"
-            "バックスラッシュ条件: $backslashCount件"
-            "null条件: $nullCount件"
+    def _build_inventory_command(self, base_token=None):
         """
-        
-        # ステップ1.5: Authorによる絞り込み（手動作成タスクのみ）
-        step1_5_command = f"""
+        手動作成タスクの一覧をコンパクトなJSONのみで返すPowerShellスクリプトを組み立てる。
+        本番の収集処理はこのスクリプト1回のリモート呼び出しで完結させる。
+        :param base_token: 差分取得時に指定する、前回の取得で返されたトークン（初回は空文字列）。
+            指定した場合は全件ではなく、追加・変更されたタスクと削除されたタスクのキーのみを返す。
+            タスクごとのハッシュはリモートPC側にトークン名のファイルで保存しておき、送るのはトークンだけにする
+            （スクリプトの長さがタスク数によらず一定になる）。保存されたハッシュがない場合は全件を返す。
+        """
+        if base_token is None:
+            output_command = "ConvertTo-Json -InputObject @($result) -Compress -Depth 4"
+        else:
+            # トークンはリモートPCが返した16桁の16進数のみを受け付ける
+            if not TOKEN_PATTERN.match(base_token):
+                base_token = ''
+            output_command = f"""
+            # 前回のトークンに対応するハッシュをリモートPC側の保存ファイルから読み込む
+            $stateDir = Join-Path $env:TEMP 'task-dashboard-inventory'
+            New-Item -ItemType Directory -Path $stateDir -Force | Out-Null
+            $baseToken = '{base_token}'
+            $known = @{{}}
+            $full = $true
+            if ($baseToken) {{
+                $basePath = Join-Path $stateDir "$baseToken.json"
+                if (Test-Path $basePath) {{
+                    (Get-Content -Path $basePath -Raw -Encoding UTF8 | ConvertFrom-Json).PSObject.Properties | ForEach-Object {{
+                        $known[$_.Name] = $_.Value
+                    }}
+                    $full = $false
+                }}
+            }}
+            # 各タスクのハッシュを計算し、前回から変化したものだけを返す
+            $sha = [System.Security.Cryptography.SHA1]::Create()
+            $hashes = @{{}}
+            $changed = foreach ($item in @($result)) {{
+                $json = ConvertTo-Json -InputObject $item -Compress -Depth 4
+                $hash = [BitConverter]::ToString($sha.ComputeHash([System.Text.Encoding]::UTF8.GetBytes($json))).Replace('-', '').Substring(0, 16)
+                $key = "$($item.TaskPath)$($item.TaskName)"
+                $hashes[$key] = $hash
+                if ($full -or $known[$key] -ne $hash) {{
+                    $item | Add-Member -NotePropertyName Hash -NotePropertyValue $hash -PassThru
+                }}
+            }}
+            $removed = @()
+            if (-not $full) {{
+                $removed = @($known.Keys | Where-Object {{ -not $hashes.ContainsKey($_) }})
+            }}
+            $tokenSource = (@($hashes.Keys | Sort-Object) | ForEach-Object {{ "$_=$($hashes[$_])" }}) -join '|'
+            $token = [BitConverter]::ToString($sha.ComputeHash([System.Text.Encoding]::UTF8.GetBytes($tokenSource))).Replace('-', '').Substring(0, 16)
+            # 今回のハッシュを次回の比較用に保存し、1日以上使われていない保存ファイルは削除する
+            ConvertTo-Json -InputObject $hashes -Compress | Set-Content -Path (Join-Path $stateDir "$token.json") -Encoding UTF8
+            Get-ChildItem -Path $stateDir -Filter '*.json' | Where-Object {{ $_.LastWriteTime -lt (Get-Date).AddDays(-1) }} |
+                Remove-Item -Force -ErrorAction SilentlyContinue
+            ConvertTo-Json -InputObject ([PSCustomObject]@{{ Token = $token; Full = $full; Changed = @($changed); Removed = $removed }}) -Compress -Depth 5"""
+        return f"""
             [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
-            $manualTasks = Get-ScheduledTask | Where-Object {{ 
+            $manualTasks = @(Get-ScheduledTask | Where-Object {{ 
                 $_.Author -like '*\\*' -and 
                 $_.Author -notlike '*NT AUTHORITY*' -and
                 $_.Author -notlike '*$(@%SystemRoot%*' -and
                 $_.Author -notlike '*$(@%systemroot%*'
-            }}
-            "手動作成タスク数: $($manualTasks.Count)"
-            "手動作成タスクの最初の5件:"
-            $manualTasks | Select-Object -First 5 | ForEach-Object {{ 
-                "TaskName: $($_.TaskName), Author: $($_.Author), TaskPath: '$($_.TaskPath)'" 
+            }})
+            
+            # 実行情報はパイプラインで一括取得し、TaskPath+TaskNameで引けるようにする
+            $infoMap = @{{}}
+            $manualTasks | Get-ScheduledTaskInfo -ErrorAction SilentlyContinue | ForEach-Object {{
+                $infoMap["$($_.TaskPath)$($_.TaskName)"] = $_
             }}
             
-            # 詳細情報を取得
-            $result = @()
-            foreach ($task in $manualTasks) {{
+            # 詳細情報を取得（foreachの出力をそのまま配列として受け取る）
+            $result = foreach ($task in $manualTasks) {{
+                $taskInfo = $infoMap["$($task.TaskPath)$($task.TaskName)"]
                 $nextRun = $null
                 $lastRun = $null
                 $lastTaskResult = $null
-                
-                try {{
-                    $taskInfo = Get-ScheduledTaskInfo -TaskName $task.TaskName -ErrorAction SilentlyContinue
-                    if ($taskInfo) {{
-                        if ($taskInfo.NextRunTime) {{
-                            $nextRun = $taskInfo.NextRunTime.ToString("yyyy-MM-dd HH:mm:ss")
-                        }}
-                        if ($taskInfo.LastRunTime) {{
-                            $lastRun = $taskInfo.LastRunTime.ToString("yyyy-MM-dd HH:mm:ss")
-                        }}
-                        if ($taskInfo.LastTaskResult -ne $null) {{
-                            $lastTaskResult = $taskInfo.LastTaskResult
-                        }}
+                if ($taskInfo) {{
+                    if ($taskInfo.NextRunTime) {{
+                        $nextRun = $taskInfo.NextRunTime.ToString("yyyy-MM-dd HH:mm:ss")
                     }}
-                }} catch {{
-                    if ($task.NextRunTime) {{
-                        $nextRun = $task.NextRunTime.ToString("yyyy-MM-dd HH:mm:ss")
-                    }}
-                    if ($task.LastRunTime) {{
-                        $lastRun = $task.LastRunTime.ToString("yyyy-MM-dd HH:mm:ss")
+                    if ($taskInfo.LastRunTime) {{
+                        $lastRun = $taskInfo.LastRunTime.ToString("yyyy-MM-dd HH:mm:ss")
                     }}
+                    $lastTaskResult = $taskInfo.LastTaskResult
                 }}
                 
-                $taskInfo = [PSCustomObject]@{{
+                [PSCustomObject]@{{
                     TaskName = $task.TaskName
                     State = $task.State
                     NextRunTime = $nextRun
                     LastRunTime = $lastRun
-                    LastTaskResult = if ($lastTaskResult -ne $null) {{ $lastTaskResult }} else {{ $task.LastTaskResult }}
+                    LastTaskResult = $lastTaskResult
                     Description = $task.Description
                     TaskPath = $task.TaskPath
                     Author = $task.Author
-                    Trigger = (($task.Triggers | ForEach-Object {{
-                        "Enabled: $($_.Enabled)`n" +
-                        "StartBoundary: $($_.StartBoundary)`n" +
-                        "EndBoundary: $($_.EndBoundary)`n" +
-                        "ExecutionTimeLimit: $($_.ExecutionTimeLimit)`n" +
-                        "Id: $($_.Id)`n" +
-                        "Repetition: $($_.Repetition)"
-                    }}) -join '; ')
+                    # トリガーは文字列に変換せず、表示や並べ替えに使う項目を構造化して返す
+                    Triggers = @($task.Triggers | ForEach-Object {{
+                        [PSCustomObject]@{{
+                            Type = $_.CimClass.CimClassName -replace '^MSFT_Task', '' -replace 'Trigger$', ''
+                            Enabled = $_.Enabled
+                            StartBoundary = $_.StartBoundary
+                            EndBoundary = $_.EndBoundary
+                            DaysInterval = $_.DaysInterval
+                            WeeksInterval = $_.WeeksInterval
+                            RepetitionInterval = $_.Repetition.Interval
+                            RepetitionDuration = $_.Repetition.Duration
+                            ExecutionTimeLimit = $_.ExecutionTimeLimit
+                        }}
+                    }})
                 }}
-                $result += $taskInfo
             }}
             
-            $result | ConvertTo-Json -Compress -Depth 3
+            {output_command}
         """
-        
-        # 方法2: schtasksコマンドを使用
-        step2_command = f"""
+
+    def _build_schtasks_command(self):
+        """Get-ScheduledTaskが使えない場合の代替として、schtasksのCSV出力を返すスクリプトを組み立てる。"""
+        return """
             [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
-            "=== schtasksコマンドでルートタスクを取得 ==="
-            $schtasksResult = schtasks /query /fo csv /tn "\\" 2>$null
-            if ($LASTEXITCODE -eq 0) {{
-                "schtasks成功: $($schtasksResult.Count)件"
-                $schtasksResult | Select-Object -First 5
-            }} else {{
-                "schtasks失敗: $LASTEXITCODE"
-            }}
-            
-            "=== schtasksで全タスクを取得 ==="
-            $allSchTasks = schtasks /query /fo csv 2>$null
-            if ($LASTEXITCODE -eq 0) {{
-                "全schtasks数: $($allSchTasks.Count)"
-                $allSchTasks | Select-Object -First 5
-            }} else {{
-                "schtasks全取得失敗: $LASTEXITCODE"
-            }}
+            schtasks /query /fo csv /v /nh 2>$null
+            if ($LASTEXITCODE -ne 0) { exit $LASTEXITCODE }
         """
-        
-        # 方法3: WMIを使用
-        step3_command = f"""
+
+    def _build_wmi_command(self):
+        """schtasksも失敗した場合の代替として、CIM(WMI)からタスク一覧をJSONで返すスクリプトを組み立てる。"""
+        return """
             [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
-            "=== WMIでタスクを取得 ==="
-            try {{
-                $wmiTasks = Get-WmiObject -Class MSFT_ScheduledTask -Namespace "root\\Microsoft\\Windows\\TaskScheduler" -ErrorAction Stop
-                "WMIタスク数: $($wmiTasks.Count)"
-                $wmiTasks | Select-Object -First 5 | ForEach-Object {{
-                    "TaskName: $($_.TaskName), TaskPath: '$($_.TaskPath)'"
-                }}
-            }} catch {{
-                "WMIエラー: $($_.Exception.Message)"
-            }}
-            
-            "=== レジストリからタスク情報を取得 ==="
-            try {{
-                $registryTasks = Get-ChildItem "HKLM:\\SOFTWARE\\Microsoft\\Windows NT\\CurrentVersion\\Schedule\\TaskCache\\Tasks" -ErrorAction Stop
-                "レジストリタスク数: $($registryTasks.Count)"
-                $registryTasks | Select-Object -First 5 | ForEach-Object {{
-                    "TaskName: $($_.Name)"
+            $wmiTasks = Get-CimInstance -ClassName MSFT_ScheduledTask -Namespace "root\\Microsoft\\Windows\\TaskScheduler" -ErrorAction Stop
+            $result = @($wmiTasks | Select-Object TaskName, TaskPath, State, Author, Description)
+            ConvertTo-Json -InputObject $result -Compress -Depth 2
+        """
+
+    def _build_health_command(self, include_inventory=True):
+        """
+        PCの稼働状況（OS・メモリ・ディスク・手動作成タスク数）を1つのJSONで返すスクリプトを組み立てる。
+        Get-ComputerInfoは遅いため使わず、軽量なCIMクエリのみで構成する。
+        :param include_inventory: Falseの場合、ほとんど変わらない構成情報（System）は取得せずnullを返す。
+        """
+        if include_inventory:
+            system_command = """
+            $cs = Get-CimInstance -ClassName Win32_ComputerSystem -Property TotalPhysicalMemory
+            $system = [PSCustomObject]@{
+                WindowsProductName = $os.Caption
+                WindowsVersion = $os.Version
+                TotalPhysicalMemory = $cs.TotalPhysicalMemory
+            }"""
+        else:
+            system_command = "$system = $null"
+        return f"""
+            [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+            $os = Get-CimInstance -ClassName Win32_OperatingSystem -Property Caption, Version, TotalVisibleMemorySize, FreePhysicalMemory
+            {system_command}
+            $disks = @(Get-CimInstance -ClassName Win32_LogicalDisk -Filter 'DriveType = 3' -Property DeviceID, Size, FreeSpace |
+                ForEach-Object {{ [PSCustomObject]@{{ DeviceID = $_.DeviceID; Size = $_.Size; FreeSpace = $_.FreeSpace }} }})
+            # タスク数は一覧と同じ条件で数えるだけにし、実行情報は取得しない
+            $tasksCount = @(Get-ScheduledTask | Where-Object {{ 
+                $_.Author -like '*\\*' -and 
+                $_.Author -notlike '*NT AUTHORITY*' -and
+                $_.Author -notlike '*$(@%SystemRoot%*' -and
+                $_.Author -notlike '*$(@%systemroot%*'
+            }}).Count
+            ConvertTo-Json -Compress -Depth 3 -InputObject ([PSCustomObject]@{{
+                LastSeen = (Get-Date -Format 'yyyy/MM/dd HH:mm:ss')
+                System = $system
+                Memory = [PSCustomObject]@{{
+                    TotalVisibleMemorySize = $os.TotalVisibleMemorySize
+                    FreePhysicalMemory = $os.FreePhysicalMemory
                 }}
-            }} catch {{
-                "レジストリエラー: $($_.Exception.Message)"
-            }}
+                Disks = $disks
+                TasksCount = $tasksCount
+            }})
+        """
+
+    def get_pc_health(self, pc_ip, include_inventory=True):
+        """
+        PCの稼働状況を1回のリモート呼び出しで取得する。
+        :param include_inventory: Falseの場合、構成情報（System）を取得しない。
+        :return: (成功したかどうか, 稼働状況の辞書またはエラーメッセージ) のタプル。
+            辞書は LastSeen, System, Memory, Disks, TasksCount を含む。
         """
+        success, result = self._execute_ps_command(pc_ip, self._build_health_command(include_inventory))
+        if not success:
+            return False, result
+        try:
+            health = json.loads(result.strip())
+        except json.JSONDecodeError as e:
+            logging.error(f"Failed to parse health JSON from {pc_ip}: {e}")
+            logging.error(f"Raw result: {result[:500]}...")
+            return False, f"JSON parse failed: {e}"
+        disks = health.get('Disks') or []
+        # ディスクが1台の場合は配列が展開されて返るため、リストに揃える
+        health['Disks'] = [disks] if isinstance(disks, dict) else disks
+        return True, health
+
+    def get_tasks_from_pc(self, pc_ip, folder_path='\\', delta=False):
+        """
+        指定されたPCから手動作成タスクを取得する。
+        通常はJSONのみを返すスクリプトを1回実行するだけで完了し、
+        その呼び出しが失敗した場合に限りschtasks、WMIの順に代替手段を試す。
+        :param delta: Trueの場合、前回のスナップショットとの差分のみを転送してマージする。
+        """
+        logging.info(f"=== タスク取得開始: {pc_ip} ===")
+        logging.info(f"フォルダパス: {folder_path}")
         
-        success, debug_result = self._execute_ps_command(pc_ip, step1_command)
-        if success:
-            logging.info(f"方法1結果: {debug_result}")
+        if delta:
+            tasks = self._get_tasks_delta(pc_ip)
+            if tasks is not None:
+                return tasks
+            logging.warning(f"差分取得に失敗したため全件取得に切り替えます: {pc_ip}")
         
-        # ステップ1.5: Authorによる絞り込みを実行
-        success1_5, debug_result1_5 = self._execute_ps_command(pc_ip, step1_5_command)
-        if success1_5:
-            logging.info(f"方法1.5結果: {debug_result1_5}")
-            # Author絞り込みが成功した場合は、その結果を処理
-            if "手動作成タスク数:" in debug_result1_5:
-                return self._process_tasks_from_result(debug_result1_5, pc_ip)
+        # 方法1: Get-ScheduledTaskによる一括取得（通常はここで完了）
+        success, result = self._execute_ps_command(pc_ip, self._build_inventory_command())
+        if success:
+            tasks = self._parse_task_json(result, pc_ip)
+            if tasks is not None:
+                return tasks
+        logging.warning(f"方法1（Get-ScheduledTask）が失敗したため代替手段を試します: {pc_ip}")
         
-        # 方法2を実行
-        success2, debug_result2 = self._execute_ps_command(pc_ip, step2_command)
-        if success2:
-            logging.info(f"方法2結果: {debug_result2}")
+        # 方法2: schtasksコマンドを使用
+        success2, result2 = self._execute_ps_command(pc_ip, self._build_schtasks_command())
+        if success2 and result2.strip():
+            logging.info("方法2（schtasks）が成功")
+            return self._process_tasks_from_schtasks(result2, pc_ip)
         
-        # 方法3を実行
-        success3, debug_result3 = self._execute_ps_command(pc_ip, step3_command)
+        # 方法3: WMIを使用
+        success3, result3 = self._execute_ps_command(pc_ip, self._build_wmi_command())
         if success3:
-            logging.info(f"方法3結果: {debug_result3}")
-        
-        # 最も効果的な方法を選択（Author絞り込みを優先）
-        if success1_5 and "手動作成タスク数:" in debug_result1_5:
-            logging.info("方法1.5（Author絞り込み）が成功")
-            return self._process_tasks_from_result(debug_result1_5, pc_ip)
-        elif success and "ルートタスク数: 0" not in debug_result:
-            logging.info("方法1（Get-ScheduledTask）が成功")
-            return self._process_tasks_from_result(debug_result, pc_ip)
-        elif success2 and "schtasks成功" in debug_result2:
-            logging.info("方法2（schtasks）が成功")
-            return self._process_tasks_from_schtasks(debug_result2, pc_ip)
-        elif success3 and "WMIタスク数:" in debug_result3:
             logging.info("方法3（WMI）が成功")
-            return self._process_tasks_from_wmi(debug_result3, pc_ip)
-        else:
-            logging.warning("すべての方法が失敗または0件")
-            return []
+            return self._process_tasks_from_wmi(result3, pc_ip)
+        
+        logging.warning("すべての方法が失敗しました")
+        return []
 
-    def _process_tasks_from_result(self, debug_result, pc_ip):
+    def _parse_task_json(self, output, pc_ip):
         """
-        Get-ScheduledTaskの結果からタスク情報を抽出する。
+        タスク一覧のJSON出力を解析し、日時をdatetimeに変換したリストを返す。
+        出力が空の場合は0件として空リストを返し、解析できない場合はNoneを返す。
         """
-        logging.info(f"=== タスク情報抽出開始: {pc_ip} ===")
-        tasks = []
+        output = output.strip()
+        if not output:
+            return []
         try:
-            # 出力からJSON部分のみを抽出
-            lines = debug_result.strip().split('\n')
-            json_start = -1
-            
-            # JSONデータの開始位置を探す
-            for i, line in enumerate(lines):
-                if line.strip().startswith('[') or line.strip().startswith('{'):
-                    json_start = i
-                    break
-            
-            if json_start == -1:
-                logging.error(f"JSONデータが見つかりません: {pc_ip}")
-                logging.error(f"Raw result: {debug_result[:500]}...")
-                return []
-            
-            # JSON部分のみを抽出
-            json_lines = lines[json_start:]
-            json_data = '\n'.join(json_lines)
-            
-            logging.info(f"JSON解析開始: {pc_ip}")
-            tasks = json.loads(json_data)
-            # 単一のタスクの場合、リストに変換
-            if isinstance(tasks, dict):
-                tasks = [tasks]
-            logging.info(f"取得されたタスク数: {len(tasks)}")
-            # 日付文字列をdatetimeオブジェクトに変換
-            for task in tasks:
-                for key in ['NextRunTime', 'LastRunTime']:
-                    if task.get(key):
-                        try:
-                            task[key] = datetime.fromisoformat(task[key].split('.')[0])
-                        except:
-                            task[key] = None
-            return tasks
+            tasks = json.loads(output)
         except json.JSONDecodeError as e:
             logging.error(f"Failed to parse JSON from {pc_ip}: {e}")
-            logging.error(f"Raw result: {debug_result[:500]}...")  # 最初の500文字をログ出力
-            return []
+            logging.error(f"Raw result: {output[:500]}...")  # 最初の500文字をログ出力
+            return None
+        # 単一のタスクの場合、リストに変換
+        if isinstance(tasks, dict):
+            tasks = [tasks]
+        logging.info(f"取得されたタスク数: {len(tasks)}")
+        self._convert_task_datetimes(tasks)
+        self._summarize_task_triggers(tasks)
+        return tasks
+
+    def _convert_task_datetimes(self, tasks):
+        """タスクの日付文字列をdatetimeオブジェクトに変換する。"""
+        for task in tasks:
+            for key in ['NextRunTime', 'LastRunTime']:
+                if task.get(key):
+                    try:
+                        task[key] = datetime.fromisoformat(task[key].split('.')[0])
+                    except:
+                        task[key] = None
+
+    def _summarize_task_triggers(self, tasks):
+        """
+        タスクのトリガーを解析し、表示用の要約（TriggerSummary）を 'TriggerSummary' に設定する。
+        差分取得では変更されたタスクだけを解析するため、描画のたびにトリガーを解析し直す必要がない。
+        """
+        for task in tasks:
+            triggers = task.get('Triggers')
+            if triggers is None:
+                # schtasksなどの代替手段や以前の形式ではトリガー文字列のみを持つ
+                triggers = task.get('Trigger')
+            task['TriggerSummary'] = TriggerSummary.from_value(triggers)
+
+    def _get_tasks_delta(self, pc_ip):
+        """
+        前回のスナップショットとの差分のみを取得し、マージしたタスク一覧を返す。
+        リモート側で各タスクの定義と実行情報のハッシュを計算し、変化したタスクだけを転送する。
+        リモート側に前回のハッシュが残っていない場合は全件が返るため、その場合もこの1回の呼び出しで完結する。
+        スナップショットはPCごとにTaskManagerインスタンス間で共有する。
+        :return: タスクのリスト。取得・解析に失敗した場合はNone。
+        """
+        with TaskManager._snapshot_lock:
+            snapshot = TaskManager._task_snapshots.get(pc_ip, {'token': None, 'tasks': {}})
+
+        success, result = self._execute_ps_command(pc_ip, self._build_inventory_command(snapshot['token'] or ''))
+        if not success:
+            return None
+        try:
+            payload = json.loads(result.strip())
+            token = payload.get('Token')
+            full = bool(payload.get('Full'))
+            changed = payload.get('Changed') or []
+            removed = payload.get('Removed') or []
+            if isinstance(changed, dict):
+                changed = [changed]
+            if isinstance(removed, str):
+                removed = [removed]
+        except (json.JSONDecodeError, AttributeError) as e:
+            logging.error(f"Failed to parse delta JSON from {pc_ip}: {e}")
+            logging.error(f"Raw result: {result[:500]}...")
+            return None
+
+        if not full and token == snapshot['token'] and not changed and not removed:
+            # トークンが同じ場合はタスクに変化がないため、前回のスナップショットをそのまま使う
+            logging.info(f"差分取得完了: {pc_ip} (変更なし, 合計 {len(snapshot['tasks'])}件)")
+            return [dict(entry['task']) for entry in snapshot['tasks'].values()]
+
+        self._convert_task_datetimes(changed)
+        self._summarize_task_triggers(changed)
+        # 全件が返った場合は、前回のスナップショットを使わずに作り直す
+        tasks = {} if full else dict(snapshot['tasks'])
+        for key in removed:
+            tasks.pop(key, None)
+        for task in changed:
+            task_hash = task.pop('Hash', None)
+            tasks[f"{task.get('TaskPath') or ''}{task.get('TaskName')}"] = {'hash': task_hash, 'task': task}
+
+        with TaskManager._snapshot_lock:
+            TaskManager._task_snapshots[pc_ip] = {'token': token, 'tasks': tasks}
+        logging.info(
+            f"差分取得完了: {pc_ip} ({'全件' if full else '差分'}, 変更 {len(changed)}件, 削除 {len(removed)}件, "
+            f"合計 {len(tasks)}件, 転送 {len(result)}バイト)"
+        )
+        # 呼び出し側で列を追加しても共有スナップショットが変わらないようにコピーを返す
+        return [dict(entry['task']) for entry in tasks.values()]
+
+    @classmethod
+    def clear_task_snapshot(cls, pc_ip=None):
+        """差分取得用のスナップショットを破棄する。pc_ipを省略した場合は全PC分を破棄する。"""
+        with cls._snapshot_lock:
+            if pc_ip is None:
+                cls._task_snapshots.clear()
+            else:
+                cls._task_snapshots.pop(pc_ip, None)
 
     def _process_tasks_from_schtasks(self, debug_result, pc_ip):
         """
         schtasksコマンドの結果からタスク情報を抽出する。
+        ヘッダー名や状態の表示名はOSの表示言語で変わるため、列の位置で読み取り、手動作成タスクのみを返す。
         """
         logging.info(f"=== タスク情報抽出開始: {pc_ip} ===")
         tasks = []
+        seen = set()
         try:
-            # schtasksコマンドの結果はCSV形式なので、ヘッダーを含めて解析
-            lines = debug_result.strip().split('\n')
-            header = lines[0].split(',')
-            data_lines = lines[1:]
-
-            for line in data_lines:
-                if not line.strip():
+            for values in csv.reader(io.StringIO(debug_result.strip())):
+                if len(values) <= max(SCHTASKS_COLUMNS.values()):
                     continue
-                values = line.split(',')
-                if len(values) < len(header):
-                    continue
-
-                task_info = {}
-                for i, key in enumerate(header):
-                    task_info[key.strip()] = values[i].strip()
+                task_info = {key: values[index].strip() for key, index in SCHTASKS_COLUMNS.items()}
 
-                # タスク名とパスを抽出
-                task_name = task_info.get('TaskName')
-                task_path = task_info.get('TaskPath')
-
-                if not task_name or not task_path:
+                # タスク名はフォルダを含むフルパス（\で始まらない行はヘッダー行）。
+                # トリガーが複数あるタスクはトリガーごとに行が出力されるため、最初の行のみを使う。
+                full_name = task_info['TaskName']
+                if not full_name.startswith('\\') or full_name in seen:
+                    continue
+                seen.add(full_name)
+                if not is_manual_task_author(task_info['Author']):
                     continue
+                task_path, _, task_name = full_name.rpartition('\\')
 
-                # タスク情報をPSCustomObjectに変換
-                task_ps_object = {
+                last_result = task_info['LastResult']
+                tasks.append({
                     'TaskName': task_name,
-                    'State': task_info.get('State'),
-                    'NextRunTime': task_info.get('NextRunTime'),
-                    'LastRunTime': task_info.get('LastRunTime'),
-                    'LastTaskResult': task_info.get('LastTaskResult'),
-                    'Description': task_info.get('Description'),
-                    'TaskPath': task_path,
-                    'Author': task_info.get('Author'),
-                    'Trigger': task_info.get('Trigger') # schtasksではTriggerがない場合が多い
-                }
-
-                # 日付文字列をdatetimeオブジェクトに変換
-                for key in ['NextRunTime', 'LastRunTime']:
-                    if task_ps_object.get(key):
-                        try:
-                            task_ps_object[key] = datetime.fromisoformat(task_ps_object[key].split('.')[0])
-                        except:
-                            task_ps_object[key] = None
-
-                tasks.append(task_ps_object)
+                    'State': SCHTASKS_STATES.get(task_info['Status'].lower(), 0),
+                    'NextRunTime': self._parse_schtasks_datetime(task_info['NextRunTime']),
+                    'LastRunTime': self._parse_schtasks_datetime(task_info['LastRunTime']),
+                    'LastTaskResult': int(last_result) if re.fullmatch(r'-?\d+', last_result) else None,
+                    'Description': task_info['Comment'] if task_info['Comment'] not in ('', 'N/A') else None,
+                    'TaskPath': task_path + '\\',
+                    'Author': task_info['Author'],
+                    'Trigger': task_info['ScheduleType'] # schtasksではTriggerの詳細は取得できない
+                })
+            logging.info(f"取得されたタスク数: {len(tasks)}")
+            self._summarize_task_triggers(tasks)
             return tasks
         except Exception as e:
             logging.error(f"Failed to process schtasks result from {pc_ip}: {e}")
-            logging.error(f"Raw result: {debug_result}")
+            logging.error(f"Raw result: {debug_result[:500]}...")
             return []
 
+    @staticmethod
+    def _parse_schtasks_datetime(value):
+        """
+        schtasksの日時の文字列をdatetimeに変換する。
+        予定がない（N/Aなど）場合や一度も実行されていない場合、解析できない場合はNoneを返す。
+        """
+        for date_format in SCHTASKS_DATETIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            return None if parsed.year <= SCHTASKS_NEVER_RUN_YEAR else parsed
+        return None
+
     def _process_tasks_from_wmi(self, debug_result, pc_ip):
         """
-        WMIの結果からタスク情報を抽出する。
+        WMIの結果からタスク情報を抽出し、手動作成タスクのみを返す。
         """
         logging.info(f"=== タスク情報抽出開始: {pc_ip} ===")
-        tasks = []
-        try:
-            # 出力からJSON部分のみを抽出
-            lines = debug_result.strip().split('\n')
-            json_start = -1
-            
-            # JSONデータの開始位置を探す
-            for i, line in enumerate(lines):
-                if line.strip().startswith('[') or line.strip().startswith('{'):
-                    json_start = i
-                    break
-            
-            if json_start == -1:
-                logging.error(f"JSONデータが見つかりません: {pc_ip}")
-                logging.error(f"Raw result: {debug_result[:500]}...")
-                return []
-            
-            # JSON部分のみを抽出
-            json_lines = lines[json_start:]
-            json_data = '\n'.join(json_lines)
-            
-            logging.info(f"JSON解析開始: {pc_ip}")
-            tasks = json.loads(json_data)
-            # 単一のタスクの場合、リストに変換
-            if isinstance(tasks, dict):
-                tasks = [tasks]
-            logging.info(f"取得されたタスク数: {len(tasks)}")
-            # 日付文字列をdatetimeオブジェクトに変換
-            for task in tasks:
-                for key in ['NextRunTime', 'LastRunTime']:
-                    if task.get(key):
-                        try:
-                            task[key] = datetime.fromisoformat(task[key].split('.')[0])
-                        except:
-                            task[key] = None
-            return tasks
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse JSON from {pc_ip}: {e}")
-            logging.error(f"Raw result: {debug_result[:500]}...")  # 最初の500文字をログ出力
+        tasks = self._parse_task_json(debug_result, pc_ip)
+        if tasks is None:
             return []
+        return [task for task in tasks if is_manual_task_author(task.get('Author'))]
 
     def get_task_author(self, pc_ip, task_name):
         """指定されたタスクの作成者情報を取得する。"""
@@ -397,7 +533,7 @@ class TaskManager:
         Select-Object -Property TaskName, Author, @{{Name='TaskPath';Expression={{$_.TaskPath}}}} |
         ConvertTo-Json -Compress
         """
-        success, result = self._execute_ps_command(pc_ip, command)
+        success, result = self._execute_ps_command(pc_ip, command, force=True)
         if success and result:
             try:
                 cleaned_result = result.strip().replace('\r', '').replace('\n', '')
@@ -410,10 +546,10 @@ class TaskManager:
     def delete_task(self, pc_ip, task_name, user_identifier='system'):
         """指定されたタスクを削除する。"""
         command = f"Unregister-ScheduledTask -TaskName '{task_name}' -Confirm:$false"
-        success, message = self._execute_ps_command(pc_ip, command)
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
         if success:
             # 監査ログを記録
-            self.db_manager.add_audit_log({
+            self.audit_writer.write({
                 "user_identifier": user_identifier,
                 "action_type": "DELETE_TASK",
                 "target_pc": pc_ip,
@@ -454,9 +590,9 @@ class TaskManager:
         # 最終的なコマンド
         command = f"$action = {action}; $trigger = {trigger}; $principal = {principal}; Register-ScheduledTask -TaskName '{task_details['task_name']}' -Description '{task_details.get('description', '')}' -Action $action -Trigger $trigger -Principal $principal"
         
-        success, message = self._execute_ps_command(pc_ip, command)
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
         if success:
-            self.db_manager.add_audit_log({
+            self.audit_writer.write({
                 "user_identifier": user_identifier, "action_type": "CREATE_TASK",
                 "target_pc": pc_ip, "target_task": task_details['task_name'],
                 "details": json.dumps(task_details)
@@ -466,9 +602,9 @@ class TaskManager:
     def run_task_now(self, pc_ip, task_name, user_identifier='system'):
         """指定されたタスクを即時実行する。"""
         command = f"Start-ScheduledTask -TaskName '{task_name}'"
-        success, message = self._execute_ps_command(pc_ip, command)
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
         if success:
-            self.db_manager.add_audit_log({
+            self.audit_writer.write({
                 "user_identifier": user_identifier,
                 "action_type": "RUN_TASK",
                 "target_pc": pc_ip,
@@ -480,9 +616,9 @@ class TaskManager:
     def enable_task(self, pc_ip, task_name, user_identifier='system'):
         """指定されたタスクを有効化する。"""
         command = f"Enable-ScheduledTask -TaskName '{task_name}'"
-        success, message = self._execute_ps_command(pc_ip, command)
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
         if success:
-            self.db_manager.add_audit_log({
+            self.audit_writer.write({
                 "user_identifier": user_identifier,
                 "action_type": "ENABLE_TASK",
                 "target_pc": pc_ip,
@@ -494,9 +630,9 @@ class TaskManager:
     def disable_task(self, pc_ip, task_name, user_identifier='system'):
         """指定されたタスクを無効化する。"""
         command = f"Disable-ScheduledTask -TaskName '{task_name}'"
-        success, message = self._execute_ps_command(pc_ip, command)
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
         if success:
-            self.db_manager.add_audit_log({
+            self.audit_writer.write({
                 "user_identifier": user_identifier,
                 "action_type": "DISABLE_TASK",
                 "target_pc": pc_ip,
@@ -504,3 +640,28 @@ class TaskManager:
                 "details": "Task disabled"
             })
         return success, message
+
+    def update_task(self, pc_ip, task_name, update_details, user_identifier='system'):
+        """
+        タスクの状態または説明を更新する。
+        :param update_details: {"State": "Ready" または "Disabled"} または {"Description": "新しい説明"}。
+        """
+        if 'State' in update_details:
+            if update_details['State'] == 'Disabled':
+                return self.disable_task(pc_ip, task_name, user_identifier)
+            return self.enable_task(pc_ip, task_name, user_identifier)
+        if 'Description' not in update_details:
+            return False, "更新する項目が指定されていません"
+
+        description = str(update_details['Description'] or '').replace("'", "''")
+        command = f"$task = Get-ScheduledTask -TaskName '{task_name}'; $task.Description = '{description}'; Set-ScheduledTask -InputObject $task | Out-Null"
+        success, message = self._execute_ps_command(pc_ip, command, force=True)
+        if success:
+            self.audit_writer.write({
+                "user_identifier": user_identifier,
+                "action_type": "UPDATE_TASK",
+                "target_pc": pc_ip,
+                "target_task": task_name,
+                "details": json.dumps(update_details, ensure_ascii=False)
+            })
+        return success, message
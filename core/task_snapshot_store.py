@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskSnapshotStore:
+    """
+    PCごとのタスク一覧をプロセス内メモリに保持するスナップショットストア。
+    TTLを過ぎたスナップショットは古いデータを返しつつバックグラウンドで更新し
+    （stale-while-revalidate）、max_ageを過ぎたものだけをその場で再取得する。
+    """
+    def __init__(self, ttl=60, max_age=300, max_workers=2):
+        """
+        コンストラクタ。
+        :param ttl: スナップショットを新しいとみなす秒数。過ぎるとバックグラウンド更新の対象になる。
+        :param max_age: 古いデータを返してよい上限の秒数。過ぎたスナップショットは同期的に再取得する。
+        :param max_workers: バックグラウンド更新に使うスレッド数。
+        """
+        self.ttl = ttl
+        self.max_age = max_age
+        self._entries = {}
+        self._refreshing = set()
+        # PCごとの世代。invalidateで進め、取得開始時より古い世代の結果は保存しない
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='snapshot-refresh')
+
+    def get(self, pc_name):
+        """PCのスナップショット（tasks, error, fetched_at）を返す。存在しない場合はNone。"""
+        with self._lock:
+            return self._entries.get(pc_name)
+
+    def generation(self, pc_name):
+        """PCのスナップショットの現在の世代を返す。取得を始める前に控えておき、putに渡す。"""
+        with self._lock:
+            return self._epoch, self._generations.get(pc_name, 0)
+
+    def put(self, pc_name, tasks, error=None, generation=None):
+        """
+        PCのスナップショットを保存する。
+        取得に失敗した場合でも、以前のタスク一覧があればそれを残してエラーだけを記録する。
+        :param generation: 取得を始めたときの世代。その後invalidateされていた場合は結果を保存しない。
+        :return: 保存した場合はTrue。
+        """
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(pc_name, 0)):
+                logging.info(f"破棄後に開始前の取得結果が届いたため保存しません: {pc_name}")
+                return False
+            previous = self._entries.get(pc_name)
+            if error and previous and previous['tasks']:
+                tasks = previous['tasks']
+            self._entries[pc_name] = {'tasks': tasks or [], 'error': error, 'fetched_at': time.time()}
+            return True
+
+    def invalidate(self, pc_name=None):
+        """
+        スナップショットを破棄する。pc_nameを省略した場合は全PC分を破棄する。
+        世代を進めるため、破棄する前に始まっていた取得の結果（削除・作成前のタスク一覧）は保存されない。
+        """
+        with self._lock:
+            if pc_name is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(pc_name, None)
+                self._generations[pc_name] = self._generations.get(pc_name, 0) + 1
+
+    def _store_scan_result(self, scan_result, generations):
+        """FleetScannerの結果を、取得開始時の世代のままであればスナップショットとして保存する。"""
+        pc_name = scan_result['pc']['name']
+        return self.put(pc_name, scan_result['result'], scan_result['error'], generation=generations[pc_name])
+
+    def _refresh(self, pcs, credentials, scanner, generations):
+        """バックグラウンドスレッドでスナップショットを更新する。"""
+        try:
+            for scan_result in scanner.scan(pcs, credentials):
+                self._store_scan_result(scan_result, generations)
+        except Exception as e:
+            logging.error(f"スナップショットのバックグラウンド更新に失敗しました: {e}")
+        finally:
+            with self._lock:
+                for pc in pcs:
+                    self._refreshing.discard(pc['name'])
+
+    def _refresh_in_background(self, pcs, credentials, scanner):
+        """更新中でないPCだけをバックグラウンド更新に回す。"""
+        with self._lock:
+            targets = [pc for pc in pcs if pc['name'] not in self._refreshing]
+            self._refreshing.update(pc['name'] for pc in targets)
+            generations = {pc['name']: (self._epoch, self._generations.get(pc['name'], 0)) for pc in targets}
+        if targets:
+            logging.info(f"スナップショットをバックグラウンドで更新します: {[pc['name'] for pc in targets]}")
+            self._executor.submit(self._refresh, targets, credentials, scanner, generations)
+
+    def load(self, pcs, credentials, scanner):
+        """
+        指定されたPCのタスク一覧をスナップショットから返すジェネレータ。
+        新しいスナップショットはそのまま返し、TTLを過ぎたものは返した上でバックグラウンド更新し、
+        存在しないものやmax_ageを過ぎたものはFleetScannerで取得してから返す。
+        :return: FleetScanner.scanと同じ形式の辞書に 'fetched_at' と 'cached' を加えたものをyieldする。
+        """
+        now = time.time()
+        stale = []
+        missing = []
+        for pc in pcs:
+            entry = self.get(pc['name'])
+            if entry is None or now - entry['fetched_at'] > self.max_age:
+                missing.append(pc)
+                continue
+            if now - entry['fetched_at'] > self.ttl:
+                stale.append(pc)
+            yield {
+                'pc': pc,
+                # 呼び出し側で列を追加しても共有スナップショットが変わらないようにコピーを返す
+                'result': [dict(task) for task in entry['tasks']],
+                'error': entry['error'],
+                'elapsed': 0.0,
+                'fetched_at': entry['fetched_at'],
+                'cached': True,
+            }
+
+        if stale:
+            self._refresh_in_background(stale, credentials, scanner)
+
+        if missing:
+            generations = {pc['name']: self.generation(pc['name']) for pc in missing}
+            for scan_result in scanner.scan(missing, credentials):
+                self._store_scan_result(scan_result, generations)
+                entry = self.get(scan_result['pc']['name'])
+                if entry is None:
+                    # 取得中に破棄された場合は、保存せずに今回の結果だけを返す
+                    entry = {'tasks': scan_result['result'] or [], 'fetched_at': time.time()}
+                scan_result['result'] = [dict(task) for task in entry['tasks']]
+                scan_result['fetched_at'] = entry['fetched_at']
+                scan_result['cached'] = False
+                yield scan_result
+
+
+# プロセス全体で共有するスナップショットストア
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_task_snapshot_store(config_manager):
+    """
+    全セッションで共有されるタスクスナップショットストアを返す。
+    TTLは設定ファイルの task_snapshot.ttl_sec / max_age_sec で変更できる。
+    """
+    global _shared_store
+    snapshot_config = config_manager.get_config().get('task_snapshot', {})
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = TaskSnapshotStore()
+        _shared_store.ttl = snapshot_config.get('ttl_sec', 60)
+        _shared_store.max_age = snapshot_config.get('max_age_sec', 300)
+        return _shared_store
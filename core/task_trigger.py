@@ -0,0 +1,203 @@
+import re
+
+# ISO 8601 の期間表記（例: P1D, PT1H30M）
+DURATION_PATTERN = re.compile(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+# 開始日時（例: 2024-03-09T06:00:00）から時:分を取り出す
+START_TIME_PATTERN = re.compile(r'T(\d{1,2}):(\d{2})')
+
+def parse_duration(value):
+    """
+    ISO 8601 の期間表記を (日, 時間, 分) のタプルに変換する。
+    :return: 解析できない場合や空の場合はNone。
+    """
+    if not value:
+        return None
+    match = DURATION_PATTERN.match(str(value).strip())
+    if not match:
+        return None
+    days, hours, minutes, _ = (int(part) if part else 0 for part in match.groups())
+    return days, hours, minutes
+
+class TaskTrigger:
+    """
+    タスクスケジューラのトリガー1件を表すクラス。
+    タスク一覧スクリプトが返す構造化されたトリガー（Triggers配列の要素）から作成する。
+    """
+    def __init__(self, trigger_type=None, enabled=True, start_boundary=None, end_boundary=None,
+                 days_interval=None, weeks_interval=None, repetition_interval=None,
+                 repetition_duration=None, execution_time_limit=None):
+        """
+        コンストラクタ。
+        :param trigger_type: トリガーの種類（Daily, Weekly, Time, Logon など）。
+        :param enabled: トリガーが有効かどうか。
+        :param start_boundary: 開始日時の文字列（例: 2024-03-09T06:00:00）。
+        :param end_boundary: 終了日時の文字列。
+        :param days_interval: 日単位の実行間隔（Dailyトリガー）。
+        :param weeks_interval: 週単位の実行間隔（Weeklyトリガー）。
+        :param repetition_interval: 繰り返し間隔（ISO 8601 の期間表記）。
+        :param repetition_duration: 繰り返しを続ける期間（ISO 8601 の期間表記）。
+        :param execution_time_limit: 実行時間の上限（ISO 8601 の期間表記）。
+        """
+        self.trigger_type = trigger_type
+        self.enabled = enabled
+        self.start_boundary = start_boundary
+        self.end_boundary = end_boundary
+        self.days_interval = days_interval
+        self.weeks_interval = weeks_interval
+        self.repetition_interval = repetition_interval
+        self.repetition_duration = repetition_duration
+        self.execution_time_limit = execution_time_limit
+
+    @classmethod
+    def from_dict(cls, data):
+        """タスク一覧スクリプトが返すトリガーの辞書から作成する。"""
+        enabled = data.get('Enabled')
+        return cls(
+            trigger_type=data.get('Type'),
+            enabled=enabled is None or enabled is True or str(enabled).lower() == 'true',
+            start_boundary=data.get('StartBoundary') or None,
+            end_boundary=data.get('EndBoundary') or None,
+            days_interval=data.get('DaysInterval') or None,
+            weeks_interval=data.get('WeeksInterval') or None,
+            repetition_interval=data.get('RepetitionInterval') or None,
+            repetition_duration=data.get('RepetitionDuration') or None,
+            execution_time_limit=data.get('ExecutionTimeLimit') or None,
+        )
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        以前のタスク一覧スクリプトが返していた「キー: 値」形式のトリガー文字列から作成する。
+        同じキーが複数ある場合は最後の値を使う（従来の format_trigger_info と同じ扱い）。
+        """
+        values = {}
+        for line in text.split('\n'):
+            line = line.strip()
+            for key in ('StartBoundary', 'DaysInterval', 'HoursInterval', 'MinutesInterval'):
+                if key in line and ':' in line:
+                    values[key] = line.split(':', 1)[1].strip()
+                    break
+        hours = values.get('HoursInterval') or '0'
+        minutes = values.get('MinutesInterval') or '0'
+        repetition = None
+        if hours.isdigit() and minutes.isdigit() and (int(hours) or int(minutes)):
+            repetition = f"PT{int(hours)}H{int(minutes)}M"
+        days = values.get('DaysInterval')
+        return cls(
+            start_boundary=values.get('StartBoundary') or None,
+            days_interval=days if days and days != '0' else None,
+            repetition_interval=repetition,
+        )
+
+    @property
+    def start_time(self):
+        """開始時刻を「時:分」で返す。時刻を取り出せない場合は開始日時の文字列をそのまま返す。"""
+        if not self.start_boundary:
+            return None
+        match = START_TIME_PATTERN.search(self.start_boundary)
+        if match:
+            return f"{match.group(1)}:{match.group(2)}"
+        return self.start_boundary
+
+    @property
+    def start_minutes(self):
+        """並べ替え用に、開始時刻を0時からの分数で返す。時刻がない場合はNone。"""
+        match = START_TIME_PATTERN.search(self.start_boundary or '')
+        if not match:
+            return None
+        return int(match.group(1)) * 60 + int(match.group(2))
+
+    @property
+    def repeats(self):
+        """日・週の間隔または繰り返し間隔が設定されているかどうか。"""
+        return bool(self.interval_parts())
+
+    def interval_parts(self):
+        """実行間隔を「1日」「30分」などの表記のリストで返す（0の間隔は含めない）。"""
+        parts = []
+        if self.weeks_interval and str(self.weeks_interval) != '0':
+            parts.append(f"{self.weeks_interval}週")
+        if self.days_interval and str(self.days_interval) != '0':
+            parts.append(f"{self.days_interval}日")
+        duration = parse_duration(self.repetition_interval)
+        if duration:
+            days, hours, minutes = duration
+            if days:
+                parts.append(f"{days}日")
+            if hours:
+                parts.append(f"{hours}時間")
+            if minutes:
+                parts.append(f"{minutes}分")
+        elif self.repetition_interval:
+            parts.append(str(self.repetition_interval))
+        return parts
+
+    def format(self):
+        """「06:00 | 1日」の形式で表示用の文字列を返す。"""
+        time_str = self.start_time or "未設定"
+        parts = self.interval_parts()
+        if parts:
+            return f"{time_str} | {' | '.join(parts)}"
+        return time_str
+
+    def to_dict(self):
+        """タスク一覧スクリプトと同じキーの辞書に変換する。"""
+        return {
+            'Type': self.trigger_type,
+            'Enabled': self.enabled,
+            'StartBoundary': self.start_boundary,
+            'EndBoundary': self.end_boundary,
+            'DaysInterval': self.days_interval,
+            'WeeksInterval': self.weeks_interval,
+            'RepetitionInterval': self.repetition_interval,
+            'RepetitionDuration': self.repetition_duration,
+            'ExecutionTimeLimit': self.execution_time_limit,
+        }
+
+def parse_triggers(value):
+    """
+    タスクのトリガー情報をTaskTriggerのリストに変換する。
+    :param value: Triggers配列（辞書のリスト）、辞書1件、以前の形式のトリガー文字列のいずれか。
+    :return: TaskTriggerのリスト。トリガーがない場合は空リスト。
+    """
+    if isinstance(value, TaskTrigger):
+        return [value]
+    if isinstance(value, dict):
+        return [TaskTrigger.from_dict(value)]
+    if isinstance(value, (list, tuple)):
+        return [trigger for item in value for trigger in parse_triggers(item)]
+    if isinstance(value, str) and value and value != 'null':
+        return [TaskTrigger.from_text(value)]
+    return []
+
+class TriggerSummary:
+    """
+    タスクのトリガー一覧から、表示・並べ替え・絞り込みに使う値をまとめて計算しておくクラス。
+    タスク一覧の取得時に1回だけ作成し、描画のたびにトリガーを解析し直さないようにする。
+    """
+    def __init__(self, triggers):
+        """
+        コンストラクタ。
+        :param triggers: TaskTriggerのリスト。
+        """
+        self.triggers = triggers
+        # 有効なトリガーがない場合は、無効なトリガーの内容を表示する
+        active = [trigger for trigger in triggers if trigger.enabled] or triggers
+        start_minutes = [trigger.start_minutes for trigger in active if trigger.start_minutes is not None]
+        self.start_minutes = min(start_minutes) if start_minutes else None
+        self.repeats = any(trigger.repeats for trigger in active)
+        self.enabled = any(trigger.enabled for trigger in triggers)
+        if not active:
+            self.text = "未設定"
+        elif len(active) == 1:
+            self.text = active[0].format()
+        else:
+            self.text = f"{active[0].format()} 他{len(active) - 1}件"
+
+    @classmethod
+    def from_value(cls, value):
+        """parse_triggers と同じ形式の値から作成する。"""
+        return cls(parse_triggers(value))
+
+    def __str__(self):
+        return self.text
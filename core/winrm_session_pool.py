@@ -0,0 +1,260 @@
+import base64
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+import winrm
+from winrm.exceptions import WinRMOperationTimeoutError
+
+
+class PooledSession:
+    """プールで管理されるWinRMセッション1本分の情報を保持するクラス。"""
+    def __init__(self, key, password, session):
+        """
+        コンストラクタ。
+        :param key: (ホスト, ユーザー名) のタプル。
+        :param password: セッション作成時のパスワード。
+        :param session: winrm.Sessionインスタンス。
+        """
+        self.key = key
+        self.password = password
+        self.session = session
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.use_count = 0
+        # 直前のrun_psでコマンドをホストに送信したかどうか（失敗時に再試行してよいかの判定に使う）
+        self.command_sent = False
+
+    def run_ps(self, script, deadline=None):
+        """
+        PowerShellスクリプトを実行する。winrm.Session.run_psと同じ手順を、シェルを開く段階とコマンドを送る段階に分けて行う。
+        :param deadline: 完了を待つ期限（time.monotonicの値）。過ぎた場合はホスト側のコマンドを停止してTimeoutErrorを送出する。
+            Noneの場合はコマンドが完了するまで待つ。
+        :return: winrm.Response
+        """
+        self.command_sent = False
+        protocol = self.session.protocol
+        shell_id = protocol.open_shell()
+        # ここから先で失敗した場合は、コマンドがホストで実行された可能性がある
+        self.command_sent = True
+        encoded_script = base64.b64encode(script.encode('utf_16_le')).decode('ascii')
+        command_id = protocol.run_command(shell_id, f'powershell -encodedcommand {encoded_script}')
+        # winrm.Protocol.get_command_outputと同じく出力を繰り返し受け取るが、期限を過ぎたら待つのをやめる
+        std_out, std_err = [], []
+        command_done = False
+        while not command_done:
+            if deadline is not None and time.monotonic() >= deadline:
+                self._terminate(shell_id, command_id)
+                raise TimeoutError(f"コマンドが期限までに完了しませんでした: {self.key[0]}")
+            try:
+                out, err, status_code, command_done = protocol.get_command_output_raw(shell_id, command_id)
+                std_out.append(out)
+                std_err.append(err)
+            except WinRMOperationTimeoutError:
+                # 実行に時間のかかるコマンドでは想定どおりの応答なので、受け取りを続ける
+                pass
+        response = winrm.Response((b''.join(std_out), b''.join(std_err), status_code))
+        protocol.cleanup_command(shell_id, command_id)
+        protocol.close_shell(shell_id)
+        if response.std_err:
+            # CLIXML形式のエラー出力を読める形に整える
+            response.std_err = self.session._clean_error_msg(response.std_err)
+        return response
+
+    def _terminate(self, shell_id, command_id):
+        """期限を過ぎたコマンドをホスト側で停止し、シェルを閉じる。停止できなくても呼び出し元には戻る。"""
+        try:
+            self.session.protocol.cleanup_command(shell_id, command_id)
+            self.session.protocol.close_shell(shell_id)
+        except Exception as e:
+            logging.debug(f"期限を過ぎたコマンドの停止に失敗しました: {self.key[0]}: {e}")
+
+    def close(self):
+        """保持しているHTTP接続（keep-alive）を閉じる。"""
+        try:
+            http_session = getattr(self.session.protocol.transport, 'session', None)
+            if http_session is not None:
+                http_session.close()
+        except Exception as e:
+            logging.debug(f"WinRMセッションのクローズに失敗しました: {self.key[0]}: {e}")
+
+
+class WinRMSessionPool:
+    """
+    (ホスト, ユーザー) ごとにWinRMセッションを再利用するプール。
+    winrm.Sessionは内部でrequests.Sessionを保持しているため、セッションを使い回すことで
+    HTTPのkeep-alive接続とNTLM認証済みの接続が再利用され、呼び出しごとのハンドシェイクが不要になる。
+    """
+    def __init__(self, max_size=64, idle_timeout=300, max_uses=500, evict_interval=60):
+        """
+        コンストラクタ。
+        :param max_size: プールに保持するアイドルセッションの最大数。
+        :param idle_timeout: アイドル状態のセッションを破棄するまでの秒数。
+        :param max_uses: 1セッションを再利用する最大回数（超えたら作り直す）。
+        :param evict_interval: 借り出しの際に、他のホストも含めて期限切れのセッションを破棄する間隔（秒）。
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.evict_interval = evict_interval
+        self._last_evicted_at = time.monotonic()
+        # key -> [PooledSession, ...]（最近使われたキーほど末尾）
+        self._idle = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    def _create_session(self, host, user, password):
+        """新しいWinRMセッションを作成する。"""
+        logging.info(f"WinRMセッションを新規作成します: {host} ({user})")
+        session = winrm.Session(
+            f'http://{host}:5985/wsman',
+            auth=(user, password),
+            transport='ntlm',
+            server_cert_validation='ignore')
+        return PooledSession((host, user), password, session)
+
+    def _is_reusable(self, pooled, password, now):
+        """
+        アイドルセッションを再利用してよいかを、パスワード・アイドル時間・使用回数から判定する。
+        接続が生きているかは確認しない（切れていた場合はrun_psでシェルを開く段階で失敗し、作り直して再試行する）。
+        """
+        if pooled.password != password:
+            return False
+        if now - pooled.last_used_at > self.idle_timeout:
+            return False
+        if pooled.use_count >= self.max_uses:
+            return False
+        return True
+
+    def acquire(self, host, user, password):
+        """
+        セッションを借り出す。再利用可能なアイドルセッションがなければ新規作成する。
+        借り出したセッションは他スレッドと共有されないため、スレッドセーフに使用できる。
+        """
+        key = (host, user)
+        now = time.monotonic()
+        discarded = []
+        pooled = None
+        with self._lock:
+            # 呼び出されなくなったホストのセッションが接続を保持し続けないよう、一定間隔で破棄する
+            evict_due = now - self._last_evicted_at >= self.evict_interval
+            if evict_due:
+                self._last_evicted_at = now
+            sessions = self._idle.get(key, [])
+            while sessions:
+                candidate = sessions.pop()
+                self._idle_count -= 1
+                if self._is_reusable(candidate, password, now):
+                    pooled = candidate
+                    break
+                discarded.append(candidate)
+            if not sessions:
+                self._idle.pop(key, None)
+        for stale in discarded:
+            stale.close()
+        if evict_due:
+            self.evict_idle()
+        if pooled is None:
+            pooled = self._create_session(host, user, password)
+        return pooled
+
+    def release(self, pooled, healthy=True):
+        """
+        借り出したセッションをプールに返却する。
+        :param healthy: Falseの場合はセッションを破棄する（通信エラー発生時など）。
+        """
+        pooled.last_used_at = time.monotonic()
+        if not healthy or pooled.use_count >= self.max_uses:
+            pooled.close()
+            return
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(pooled.key, []).append(pooled)
+            self._idle.move_to_end(pooled.key)
+            self._idle_count += 1
+            # 上限を超えた場合は最も長く使われていないキーから破棄する
+            while self._idle_count > self.max_size:
+                oldest_key = next(iter(self._idle))
+                sessions = self._idle[oldest_key]
+                evicted.append(sessions.pop(0))
+                self._idle_count -= 1
+                if not sessions:
+                    del self._idle[oldest_key]
+        for old in evicted:
+            old.close()
+
+    def run_ps(self, host, user, password, command, deadline=None):
+        """
+        プールのセッションを使ってPowerShellコマンドを実行する。
+        再利用したセッションの接続がシェルを開く段階で切れていた場合に限り、新しいセッションで1回だけ再試行する。
+        コマンドを送信した後の失敗は、タスクの実行などを二重に行わないよう再試行せずにそのまま送出する。
+        :param deadline: 完了を待つ期限（time.monotonicの値）。すでに過ぎている場合は接続せずにTimeoutErrorを送出する。
+        :return: winrm.Response
+        """
+        for attempt in range(2):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"期限を過ぎているため実行しません: {host}")
+            pooled = self.acquire(host, user, password)
+            reused = pooled.use_count > 0
+            pooled.use_count += 1
+            try:
+                result = pooled.run_ps(command, deadline)
+            except Exception as e:
+                self.release(pooled, healthy=False)
+                # タイムアウトはホスト側の問題のため再試行しない
+                stale = (isinstance(e, requests.exceptions.ConnectionError)
+                         and not isinstance(e, requests.exceptions.Timeout)
+                         and not pooled.command_sent)
+                if stale and reused and attempt == 0:
+                    logging.warning(f"再利用したWinRMセッションが無効になっていたため再接続します: {host}: {e}")
+                    continue
+                raise
+            self.release(pooled)
+            return result
+
+    def evict_idle(self):
+        """アイドル時間が上限を超えたセッションをすべて破棄する。"""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for key in list(self._idle):
+                sessions = self._idle[key]
+                alive = [s for s in sessions if now - s.last_used_at <= self.idle_timeout]
+                evicted.extend(s for s in sessions if now - s.last_used_at > self.idle_timeout)
+                self._idle_count -= len(sessions) - len(alive)
+                if alive:
+                    self._idle[key] = alive
+                else:
+                    del self._idle[key]
+        for old in evicted:
+            old.close()
+        return len(evicted)
+
+    def clear(self):
+        """プール内のセッションをすべて破棄する。"""
+        with self._lock:
+            sessions = [s for group in self._idle.values() for s in group]
+            self._idle.clear()
+            self._idle_count = 0
+        for old in sessions:
+            old.close()
+
+    def stats(self):
+        """プールの状態（ホスト数・アイドルセッション数）を返す。"""
+        with self._lock:
+            return {'hosts': len(self._idle), 'idle_sessions': self._idle_count}
+
+
+# プロセス全体で共有するセッションプール
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_session_pool():
+    """TaskManagerインスタンス間で共有されるセッションプールを返す。"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = WinRMSessionPool()
+        return _shared_pool
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+タスク一覧取得スクリプトのベンチマーク
+旧方式（タスクごとにGet-ScheduledTaskInfoを呼び出し、$result += で配列を伸ばす）と
+現行方式（パイプラインで一括取得）の実行時間を、タスク数を変えながら比較します。
+
+計測用のタスクは対象PCの \\TaskDashboardBench\\ フォルダに作成し、終了時に削除します。
+
+使い方:
+python -m tests.benchmark_task_inventory EPS50 --counts 10,50,100,200 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import os
+import time
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.task_manager import TaskManager
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+
+BENCH_FOLDER = '\\TaskDashboardBench\\'
+
+# 旧方式のスクリプト（比較用）。改修前のget_tasks_from_pcが実行していたスクリプト（step1_5_command）を
+# f-stringの波括弧の二重化だけを戻してそのまま写したもので、JSONの前に件数などの確認用の行を出力する
+LEGACY_INVENTORY_COMMAND = """
+            [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+            $manualTasks = Get-ScheduledTask | Where-Object { 
+                $_.Author -like '*\\*' -and 
+                $_.Author -notlike '*NT AUTHORITY*' -and
+                $_.Author -notlike '*$(@%SystemRoot%*' -and
+                $_.Author -notlike '*$(@%systemroot%*'
+            }
+            "手動作成タスク数: $($manualTasks.Count)"
+            "手動作成タスクの最初の5件:"
+            $manualTasks | Select-Object -First 5 | ForEach-Object { 
+                "TaskName: $($_.TaskName), Author: $($_.Author), TaskPath: '$($_.TaskPath)'" 
+            }
+            
+            # 詳細情報を取得
+            $result = @()
+            foreach ($task in $manualTasks) {
+                $nextRun = $null
+                $lastRun = $null
+                $lastTaskResult = $null
+                
+                try {
+                    $taskInfo = Get-ScheduledTaskInfo -TaskName $task.TaskName -ErrorAction SilentlyContinue
+                    if ($taskInfo) {
+                        if ($taskInfo.NextRunTime) {
+                            $nextRun = $taskInfo.NextRunTime.ToString("yyyy-MM-dd HH:mm:ss")
+                        }
+                        if ($taskInfo.LastRunTime) {
+                            $lastRun = $taskInfo.LastRunTime.ToString("yyyy-MM-dd HH:mm:ss")
+                        }
+                        if ($taskInfo.LastTaskResult -ne $null) {
+                            $lastTaskResult = $taskInfo.LastTaskResult
+                        }
+                    }
+                } catch {
+                    if ($task.NextRunTime) {
+                        $nextRun = $task.NextRunTime.ToString("yyyy-MM-dd HH:mm:ss")
+                    }
+                    if ($task.LastRunTime) {
+                        $lastRun = $task.LastRunTime.ToString("yyyy-MM-dd HH:mm:ss")
+                    }
+                }
+                
+                $taskInfo = [PSCustomObject]@{
+                    TaskName = $task.TaskName
+                    State = $task.State
+                    NextRunTime = $nextRun
+                    LastRunTime = $lastRun
+                    LastTaskResult = if ($lastTaskResult -ne $null) { $lastTaskResult } else { $task.LastTaskResult }
+                    Description = $task.Description
+                    TaskPath = $task.TaskPath
+                    Author = $task.Author
+                    Trigger = (($task.Triggers | ForEach-Object {
+                        "Enabled: $($_.Enabled)`n" +
+                        "StartBoundary: $($_.StartBoundary)`n" +
+                        "EndBoundary: $($_.EndBoundary)`n" +
+                        "ExecutionTimeLimit: $($_.ExecutionTimeLimit)`n" +
+                        "Id: $($_.Id)`n" +
+                        "Repetition: $($_.Repetition)"
+                    }) -join '; ')
+                }
+                $result += $taskInfo
+            }
+            
+            $result | ConvertTo-Json -Compress -Depth 3
+        """
+
+def build_setup_command(count):
+    """計測用フォルダのタスクをcount件にそろえるスクリプトを組み立てる。"""
+    return f"""
+        Get-ScheduledTask -TaskPath '{BENCH_FOLDER}' -ErrorAction SilentlyContinue | Unregister-ScheduledTask -Confirm:$false
+        $action = New-ScheduledTaskAction -Execute 'cmd.exe' -Argument '/c exit 0'
+        $trigger = New-ScheduledTaskTrigger -Daily -At 03:00
+        for ($i = 1; $i -le {count}; $i++) {{
+            $task = New-ScheduledTask -Action $action -Trigger $trigger -Description 'TaskDashboard benchmark'
+            $task.Author = 'BENCH\\task-dashboard'
+            Register-ScheduledTask -TaskPath '{BENCH_FOLDER}' -TaskName ("Bench_{{0:D5}}" -f $i) -InputObject $task | Out-Null
+        }}
+    """
+
+def build_cleanup_command():
+    """計測用フォルダのタスクをすべて削除するスクリプトを組み立てる。"""
+    return f"Get-ScheduledTask -TaskPath '{BENCH_FOLDER}' -ErrorAction SilentlyContinue | Unregister-ScheduledTask -Confirm:$false"
+
+def count_tasks(output):
+    """
+    スクリプトの出力からタスクの件数を数える。旧方式はJSONの前に確認用の行を出力するため、
+    改修前の_process_tasks_from_resultと同じく、[ または { で始まる行以降をJSONとして読む。
+    """
+    lines = output.strip().split('\n')
+    json_start = next((i for i, line in enumerate(lines) if line.strip().startswith(('[', '{'))), None)
+    if json_start is None:
+        return 0
+    tasks = json.loads('\n'.join(lines[json_start:]))
+    # 1件の場合は配列ではなくオブジェクトで返る
+    return 1 if isinstance(tasks, dict) else len(tasks)
+
+def measure(task_manager, pc_ip, command, repeat):
+    """スクリプトをrepeat回実行し、(最短秒数, 取得件数) を返す。"""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        success, result = task_manager._execute_ps_command(pc_ip, command)
+        elapsed = time.perf_counter() - start
+        if not success:
+            raise RuntimeError(result)
+        count = count_tasks(result)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+def run_benchmark(pc_name, counts, repeat):
+    """指定PCでタスク数ごとに旧方式と現行方式の実行時間を計測する。"""
+    config_manager = ConfigManager('data/config.json')
+    db_manager = DBManager('data/logs.db')
+
+    pc = next((p for p in config_manager.get_config().get('pcs', []) if p.get('name') == pc_name), None)
+    if not pc:
+        print(f"❌ 設定ファイルにPCが見つかりません: {pc_name}")
+        return
+
+    try:
+        with open('data/credentials.json', 'r', encoding='utf-8') as f:
+            pc_creds = json.load(f).get(pc_name, {})
+    except FileNotFoundError:
+        print("❌ 認証情報ファイルが見つかりません: data/credentials.json")
+        return
+
+    task_manager = TaskManager(config_manager, db_manager, pc_creds.get('username'), pc_creds.get('password'))
+    current_command = task_manager._build_inventory_command()
+
+    print(f"=== タスク一覧取得ベンチマーク: {pc_name} ({pc['ip']}) ===")
+    print(f"{'追加タスク数':>10} {'取得件数':>8} {'旧方式(秒)':>10} {'現行方式(秒)':>12} {'短縮率':>8}")
+    try:
+        for count in counts:
+            success, message = task_manager._execute_ps_command(pc['ip'], build_setup_command(count))
+            if not success:
+                print(f"❌ 計測用タスクの作成に失敗しました: {message}")
+                return
+            legacy_sec, fetched = measure(task_manager, pc['ip'], LEGACY_INVENTORY_COMMAND, repeat)
+            current_sec, _ = measure(task_manager, pc['ip'], current_command, repeat)
+            speedup = legacy_sec / current_sec if current_sec else 0
+            print(f"{count:>10} {fetched:>8} {legacy_sec:>10.2f} {current_sec:>12.2f} {speedup:>7.1f}x")
+    finally:
+        task_manager._execute_ps_command(pc['ip'], build_cleanup_command())
+        print("計測用タスクを削除しました。")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="タスク一覧取得スクリプトのベンチマーク")
+    parser.add_argument('pc_name', help="config.jsonに登録されたPC名")
+    parser.add_argument('--counts', default='10,50,100,200', help="計測するタスク数（カンマ区切り）")
+    parser.add_argument('--repeat', type=int, default=3, help="各計測の繰り返し回数（最短値を採用）")
+    args = parser.parse_args()
+
+    run_benchmark(args.pc_name, [int(c) for c in args.counts.split(',')], args.repeat)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AuditWriterのテストスクリプト
+一時ファイルのデータベースを使い、監査ログがまとめて登録されることと、
+DBManagerを閉じる際に共有の書き込みスレッドが残りのログを登録して停止することを確認します。
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audit_writer import AuditWriter, get_audit_writer
+from core.db_manager import DBManager
+
+class CountingDBManager(DBManager):
+    """add_audit_logsの呼び出し回数を数えるDBManager"""
+    def __init__(self, path):
+        super().__init__(path)
+        self.batch_sizes = []
+        self._batch_lock = threading.Lock()
+
+    def add_audit_logs(self, audit_logs):
+        audit_logs = list(audit_logs)
+        with self._batch_lock:
+            self.batch_sizes.append(len(audit_logs))
+        return super().add_audit_logs(audit_logs)
+
+def count_audit_logs(db_manager):
+    """登録済みの監査ログの件数を返す"""
+    return db_manager._get_connection().execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+
+def test_group_commit():
+    """キューに積んだ監査ログがまとめて登録されることを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = CountingDBManager(os.path.join(directory, 'test_logs.db'))
+        writer = AuditWriter(db_manager, batch_size=50, flush_interval=0.5)
+
+        for i in range(120):
+            writer.write({
+                'user_identifier': 'admin',
+                'action_type': 'RUN_TASK',
+                'target_pc': 'PC-1',
+                'target_task': f"Task{i}",
+                'details': 'Task executed manually',
+            })
+        writer.flush()
+
+        assert count_audit_logs(db_manager) == 120
+        assert sum(db_manager.batch_sizes) == 120
+        assert len(db_manager.batch_sizes) <= 3, db_manager.batch_sizes
+        assert max(db_manager.batch_sizes) <= 50
+
+        writer.close()
+        db_manager.close()
+    print("✅ 監査ログのまとめ書きを確認しました")
+
+def test_close_flushes_queue():
+    """停止時に残りの監査ログが登録され、停止後の書き込みも失われないことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DBManager(os.path.join(directory, 'test_logs.db'))
+        writer = AuditWriter(db_manager, batch_size=1000, flush_interval=10)
+
+        for i in range(10):
+            writer.write({'user_identifier': 'admin', 'action_type': 'DELETE_TASK', 'target_task': f"Task{i}"})
+        writer.close()
+        assert count_audit_logs(db_manager) == 10
+
+        writer.write({'user_identifier': 'admin', 'action_type': 'ENABLE_TASK', 'target_task': 'Task0'})
+        assert count_audit_logs(db_manager) == 11
+
+        timestamps = [row[0] for row in db_manager._get_connection().execute("SELECT timestamp FROM audit_logs")]
+        assert all(timestamps)
+
+        db_manager.close()
+    print("✅ 停止時の書き込みを確認しました")
+
+def test_db_close_stops_shared_writer():
+    """DBManagerを閉じると共有の書き込みスレッドが残りのログを登録して停止し、閉じた後はDBに書き込まないことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'test_logs.db')
+        db_manager = DBManager(path)
+        writer = get_audit_writer(db_manager)
+        assert get_audit_writer(db_manager) is writer
+        writer.flush_interval = 10
+        for i in range(5):
+            writer.write({'user_identifier': 'admin', 'action_type': 'RUN_TASK', 'target_task': f"Task{i}"})
+
+        db_manager.close()
+        assert not writer._thread.is_alive()
+        assert count_audit_logs(db_manager) == 5
+        db_manager.close()
+
+        # 次に借りる場合は新しい書き込みスレッドを作成する
+        renewed = get_audit_writer(db_manager)
+        assert renewed is not writer
+        db_manager.close()
+    # ディレクトリを削除した後に、書き込みスレッドがDBを作り直さない
+    assert not os.path.exists(directory)
+    print("✅ DBManagerを閉じる際の書き込みスレッドの停止を確認しました")
+
+if __name__ == "__main__":
+    print("AuditWriterのテストを開始します...")
+    test_group_commit()
+    test_close_flushes_queue()
+    test_db_close_stops_shared_writer()
+    print("\n--- Test completed successfully! ---")
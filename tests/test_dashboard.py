@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ダッシュボード画面のスモークテストスクリプト
+StreamlitのAppTestで画面を描画し、スナップショットに入れたタスクに対して一括操作・削除・手動実行を行います。
+リモート呼び出しの代わりに、実行するコマンドを記録するTaskManagerを使います。
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+import core.task_manager as task_manager_module
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.task_snapshot_store import get_task_snapshot_store
+
+PCS = [{'name': 'PC-1', 'ip': '192.0.2.1'}, {'name': 'PC-2', 'ip': '192.0.2.2'}]
+TITLE = "全PC (2台)"
+
+class RecordingTaskManager(task_manager_module.TaskManager):
+    """リモート呼び出しを行わず、実行するPowerShellコマンドを記録するTaskManager"""
+    calls = []
+
+    def _execute_ps_command(self, pc_ip, command, force=False):
+        self.calls.append((pc_ip, command))
+        return True, ""
+
+def render_app():
+    """AppTestで実行する画面（ダッシュボードのみを描画する）"""
+    import os
+    from ui.dashboard import render_dashboard
+    # テスト環境では端末がないため、操作ユーザー名を固定する
+    os.getlogin = lambda: 'tester'
+    render_dashboard()
+
+def create_tasks(pc_name, count):
+    """スナップショットに入れるタスク一覧を作成する"""
+    return [{
+        'TaskName': f"{pc_name}-Task{i}",
+        'TaskPath': '\\',
+        'State': 3,
+        'LastTaskResult': 0,
+        'NextRunTime': '2024-03-10T09:00:00',
+        'LastRunTime': '2024-03-09T09:00:00',
+        'Triggers': [{'Type': 'Daily', 'Enabled': True, 'StartBoundary': f"2024-03-09T0{i}:00:00", 'DaysInterval': 1}],
+    } for i in range(count)]
+
+class DashboardFixture:
+    """一時ディレクトリに設定・DB・認証情報を作成し、スナップショットにタスクを入れておく"""
+    def __enter__(self):
+        self._directory = tempfile.TemporaryDirectory()
+        directory = self._directory.name
+        self._cwd = os.getcwd()
+        os.chdir(directory)
+        os.makedirs('data')
+        with open(os.path.join('data', 'credentials.json'), 'w', encoding='utf-8') as f:
+            json.dump({pc['name']: {'username': 'user', 'password': 'pass'} for pc in PCS}, f)
+
+        self.config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+        config = self.config_manager.get_config()
+        config['pcs'] = PCS
+        self.config_manager.update_config(config)
+        self.db_manager = DBManager(os.path.join(directory, 'logs.db'))
+
+        self.snapshot_store = get_task_snapshot_store(self.config_manager)
+        self.snapshot_store.invalidate()
+        for pc in PCS:
+            self.snapshot_store.put(pc['name'], create_tasks(pc['name'], 3))
+
+        self._original_task_manager = task_manager_module.TaskManager
+        task_manager_module.TaskManager = RecordingTaskManager
+        RecordingTaskManager.calls = []
+
+        self.app = AppTest.from_function(render_app, default_timeout=30)
+        self.app.session_state['config_manager'] = self.config_manager
+        self.app.session_state['db_manager'] = self.db_manager
+        return self
+
+    def __exit__(self, *exc_info):
+        task_manager_module.TaskManager = self._original_task_manager
+        self.snapshot_store.invalidate()
+        self.db_manager.close()
+        os.chdir(self._cwd)
+        self._directory.cleanup()
+
+def assert_no_exception(app):
+    """画面の描画中に例外が発生していないことを確認する"""
+    assert not app.exception, [e.value for e in app.exception]
+
+def test_bulk_status_change():
+    """一括ステータス変更で、選択したタスクごとにTaskManagerが呼ばれることを確認する"""
+    with DashboardFixture() as fixture:
+        app = fixture.app
+        app.run()
+        assert_no_exception(app)
+
+        app.radio(key=f"view_mode_{TITLE}").set_value("ボタン付き一覧").run()
+        app.selectbox(key=f"bulk_action_{TITLE}").set_value("選択したタスクを無効にする").run()
+        app.multiselect(key=f"bulk_tasks_{TITLE}").set_value([('PC-2-Task1', 'PC-2')]).run()
+        app.button(key=f"bulk_execute_{TITLE}").click().run()
+        assert_no_exception(app)
+
+        assert RecordingTaskManager.calls == [('192.0.2.2', "Disable-ScheduledTask -TaskName 'PC-2-Task1'")]
+    print("✅ 一括ステータス変更を確認しました")
+
+def test_delete_form():
+    """削除フォームで、選択したPCのタスクが削除されることを確認する"""
+    with DashboardFixture() as fixture:
+        app = fixture.app
+        app.session_state['confirm_delete_task'] = True
+        app.run()
+        assert_no_exception(app)
+
+        app.radio(key=f"view_mode_{TITLE}").set_value("ボタン付き一覧").run()
+        app.selectbox(key=f"delete_pc_{TITLE}").set_value('PC-1')
+        app.selectbox(key=f"delete_task_{TITLE}").set_value('PC-1-Task2')
+        next(button for button in app.button if button.label == "🗑️ 削除").click().run()
+        assert_no_exception(app)
+
+        assert RecordingTaskManager.calls == [('192.0.2.1', "Unregister-ScheduledTask -TaskName 'PC-1-Task2' -Confirm:$false")]
+    print("✅ 削除フォームを確認しました")
+
+def test_run_button_in_rows():
+    """ボタン付き一覧の手動実行ボタンで、その行のタスクが実行されることを確認する"""
+    with DashboardFixture() as fixture:
+        app = fixture.app
+        app.run()
+        app.radio(key=f"view_mode_{TITLE}").set_value("ボタン付き一覧").run()
+        next(button for button in app.button if button.key.startswith(f"run_{TITLE}_")).click().run()
+        assert_no_exception(app)
+
+        assert len(RecordingTaskManager.calls) == 1
+        _, command = RecordingTaskManager.calls[0]
+        assert command.startswith("Start-ScheduledTask -TaskName ")
+        assert any("を実行しました" in success.value for success in app.success)
+    print("✅ ボタン付き一覧の手動実行を確認しました")
+
+def test_table_mode_targets_selected_row():
+    """テーブル表示では、行を選択するまで一括操作・削除の対象を表示せず、全タスクを選択肢にしないことを確認する"""
+    with DashboardFixture() as fixture:
+        app = fixture.app
+        app.run()
+        assert_no_exception(app)
+
+        app.selectbox(key=f"bulk_action_{TITLE}").set_value("選択したタスクを有効にする").run()
+        assert_no_exception(app)
+        assert not [widget for widget in app.multiselect if widget.key == f"bulk_tasks_{TITLE}"]
+        assert not [widget for widget in app.selectbox if widget.key == f"delete_pc_{TITLE}"]
+        assert any("行を選択" in caption.value for caption in app.caption)
+
+        # 行の並びが変わると、以前の選択が別のタスクを指さないよう別のテーブルとして描画する
+        table_id = app.dataframe[0].proto.id
+        app.run()
+        assert app.dataframe[0].proto.id == table_id
+        app.selectbox(key=f"sort_{TITLE}").set_value("開始時刻順").run()
+        app.selectbox(key=f"direction_{TITLE}").set_value("降順").run()
+        assert app.dataframe[0].proto.id != table_id
+
+        # ボタン付き一覧では、現在のページのPCを重複なく選択肢にする
+        app.radio(key=f"view_mode_{TITLE}").set_value("ボタン付き一覧").run()
+        assert sorted(app.selectbox(key=f"delete_pc_{TITLE}").options) == ['PC-1', 'PC-2']
+        assert len(app.multiselect(key=f"bulk_tasks_{TITLE}").options) == 6
+    print("✅ テーブル表示の操作対象を確認しました")
+
+if __name__ == "__main__":
+    print("ダッシュボード画面のテストを開始します...")
+    test_bulk_status_change()
+    test_delete_form()
+    test_run_button_in_rows()
+    test_table_mode_targets_selected_row()
+    print("\n--- Test completed successfully! ---")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DBManagerの複数スレッドからの同時読み書きのテストスクリプト
+一時ファイルのデータベースに、複数のスレッドから監査ログと実行結果ログを書き込みながら
+別のスレッドで検索し、ロック待ちのエラーが起きず、コミット済みの内容だけが読めることを確認します。
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.db_manager import DBManager
+
+BATCH_SIZE = 20
+
+def count_rows(db_manager, table):
+    return db_manager._get_connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_concurrent_writers_and_reader():
+    """複数のスレッドが監査ログと実行結果ログを書き込む間も、別のスレッドが待たされずに読み取れることを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DBManager(os.path.join(directory, 'test_logs.db'))
+        errors = []
+        connections = []
+        writers_done = threading.Event()
+        reads = []
+
+        def run(work):
+            try:
+                connections.append(db_manager._get_connection())
+                work()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db_manager.close()
+
+        def write_audit_logs(writer):
+            for i in range(50):
+                db_manager.add_audit_log({'user_identifier': f'user-{writer}', 'action_type': 'RUN_TASK', 'target_pc': 'PC-1', 'target_task': f'Task{i}', 'details': 'ok'})
+
+        def write_execution_logs(writer):
+            for i in range(25):
+                db_manager.add_execution_logs([
+                    {'recorded_at': f"2024-02-{j % 28 + 1:02d}T00:00:00", 'pc_name': f'PC-{writer}', 'task_path': '\\', 'task_name': f'Concurrent{i}-{j}', 'result_code': 0}
+                    for j in range(BATCH_SIZE)
+                ])
+
+        def read_logs():
+            while not writers_done.is_set():
+                reads.append(len(db_manager.search_execution_logs(task_name='Concurrent')))
+
+        reader = threading.Thread(target=run, args=(read_logs,))
+        writers = [threading.Thread(target=run, args=(lambda w=w: write_audit_logs(w),)) for w in range(3)]
+        writers += [threading.Thread(target=run, args=(lambda w=w: write_execution_logs(w),)) for w in range(3)]
+        reader.start()
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        writers_done.set()
+        reader.join()
+
+        assert not errors, errors
+        # スレッドごとに別の接続を使い、WALモードで読み書きしている
+        assert len(set(map(id, connections))) == 7
+        assert db_manager._get_connection().execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        # 読み取りは書き込みの途中でも、コミット済みのまとまり単位の件数だけを返す
+        assert reads and all(count % BATCH_SIZE == 0 for count in reads)
+        assert count_rows(db_manager, 'execution_logs') == 3 * 25 * BATCH_SIZE
+        assert count_rows(db_manager, 'audit_logs') == 3 * 50
+        db_manager.close()
+    print("✅ 複数スレッドからの同時読み書きを確認しました")
+
+if __name__ == "__main__":
+    print("DBManagerの同時読み書きのテストを開始します...")
+    test_concurrent_writers_and_reader()
+    print("\n--- Test completed successfully! ---")
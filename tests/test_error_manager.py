@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ErrorManagerのテストスクリプト
+一時ファイルのエラーコード設定を使い、共有インスタンスのキャッシュと再読み込みを確認します。
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.error_manager as error_manager_module
+from core.error_manager import ErrorManager, get_error_manager, invalidate_error_manager
+
+def write_error_codes(path, error_codes, timeout_error_codes=()):
+    """エラーコード設定ファイルを書き込む"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'error_codes': {'task_scheduler': error_codes},
+            'timeout_error_codes': list(timeout_error_codes),
+        }, f, ensure_ascii=False)
+
+def test_normalize_code():
+    """16進数・10進数・符号付きのコードが同じ整数になることを確認する"""
+    assert ErrorManager.normalize_code('0x00041306') == 0x00041306
+    assert ErrorManager.normalize_code('267014') == 0x00041306
+    assert ErrorManager.normalize_code(-2147024894) == 0x80070002
+    assert ErrorManager.normalize_code('abc') is None
+    print("✅ エラーコードの正規化を確認しました")
+
+def test_shared_instance_reloads_on_change():
+    """共有インスタンスが使い回され、ファイルの変更と管理画面の保存に追従することを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'error_codes.json')
+        write_error_codes(path, {'0x00041306': 'タイムアウト'}, ['0x00041306'])
+
+        manager = get_error_manager(path)
+        assert get_error_manager(path) is manager
+        assert manager.get_error_message(0x00041306) == 'タイムアウト'
+        assert manager.is_timeout_error(0x00041306)
+
+        # 外部でファイルが書き換えられた場合は、確認間隔の経過後に同じインスタンスへ読み込み直す
+        write_error_codes(path, {'0x00041306': 'タイムアウトで停止'})
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        error_manager_module._shared_error_managers[path]['checked_at'] -= error_manager_module._STALE_CHECK_INTERVAL
+        assert get_error_manager(path) is manager
+        assert manager.get_error_message(0x00041306) == 'タイムアウトで停止'
+
+        # 管理画面と同じ手順で追加・保存すると、ファイルにも共有インスタンスにも反映される
+        manager.add_error_code('0x8007052E', 'ログオンに失敗しました')
+        assert manager.add_timeout_error_code('0x8007052E')
+        assert not manager.add_timeout_error_code('abc')
+        manager.save_error_codes()
+        invalidate_error_manager(path)
+        assert manager.get_error_message(0x8007052E) == 'ログオンに失敗しました'
+        assert manager.is_timeout_error(0x8007052E)
+        assert not manager.is_stale()
+        assert ErrorManager(path).get_error_message(0x8007052E) == 'ログオンに失敗しました'
+    print("✅ 共有ErrorManagerの再読み込みを確認しました")
+
+if __name__ == "__main__":
+    print("ErrorManagerのテストを開始します...")
+    test_normalize_code()
+    test_shared_instance_reloads_on_change()
+    print("\n--- Test completed successfully! ---")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FleetScannerのテストスクリプト
+リモート呼び出しの代わりに待ち時間を指定できる処理（fetch）を使い、
+並列実行・完了順の返却・1台あたりの期限・打ち切ったPCのスレッドの扱い・認証情報のないPCのスキップを確認します。
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.fleet_scanner import FleetScanner
+
+CREDENTIALS = {name: {'username': 'user', 'password': 'pass'} for name in ('PC-1', 'PC-2', 'PC-3')}
+
+def create_scanner(directory, reachability=None, **kwargs):
+    """一時ディレクトリに設定とDBを作成し、FleetScannerを返す（到達確認は指定しない限り無効にする）"""
+    config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+    config = config_manager.get_config()
+    config['reachability'] = reachability or {'enabled': False}
+    config_manager.update_config(config)
+    db_manager = DBManager(os.path.join(directory, 'logs.db'))
+    return FleetScanner(config_manager, db_manager, **kwargs), db_manager
+
+class DelayedFetch:
+    """PCごとに指定した秒数だけ待ってから結果を返し、呼び出されたPCを記録する処理"""
+    def __init__(self, delays):
+        self.delays = delays
+        self.called = []
+        self._lock = threading.Lock()
+
+    def __call__(self, task_manager, pc):
+        with self._lock:
+            self.called.append(pc['name'])
+        time.sleep(self.delays.get(pc['name'], 0))
+        if pc['name'] == 'PC-ERROR':
+            raise RuntimeError("接続エラー")
+        return [{'TaskName': f"{pc['name']}-Task"}]
+
+def test_streams_results_in_completion_order():
+    """完了したPCから順に結果が返り、全体の時間が最も遅いPC程度で済むことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        scanner, db_manager = create_scanner(directory, max_workers=4)
+        pcs = [{'name': 'PC-1', 'ip': '192.0.2.1'}, {'name': 'PC-2', 'ip': '192.0.2.2'}, {'name': 'PC-3', 'ip': '192.0.2.3'}]
+        fetch = DelayedFetch({'PC-1': 0.6, 'PC-2': 0.0, 'PC-3': 0.3})
+
+        started = time.monotonic()
+        results = list(scanner.scan(pcs, CREDENTIALS, fetch=fetch))
+        elapsed = time.monotonic() - started
+
+        assert [r['pc']['name'] for r in results] == ['PC-2', 'PC-3', 'PC-1']
+        assert all(r['error'] is None for r in results)
+        assert results[0]['result'] == [{'TaskName': 'PC-2-Task'}]
+        assert elapsed < 1.2, elapsed
+        db_manager.close()
+    print("✅ 並列実行と完了順の返却を確認しました")
+
+def test_host_timeout_and_errors():
+    """期限を超えたPCは待たずに打ち切り、例外はそのPCのエラーとして返すことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        scanner, db_manager = create_scanner(directory, max_workers=4, host_timeout=0.5)
+        pcs = [{'name': 'PC-1', 'ip': '192.0.2.1'}, {'name': 'PC-ERROR', 'ip': '192.0.2.9'}]
+        credentials = dict(CREDENTIALS, **{'PC-ERROR': {'username': 'user', 'password': 'pass'}})
+        fetch = DelayedFetch({'PC-1': 3.0})
+
+        started = time.monotonic()
+        results = {r['pc']['name']: r for r in scanner.scan(pcs, credentials, fetch=fetch)}
+        elapsed = time.monotonic() - started
+
+        assert results['PC-ERROR']['error'] == "接続エラー"
+        assert results['PC-1']['result'] is None
+        assert results['PC-1']['error'] == "タイムアウト (0.5秒)"
+        assert elapsed < 2.0, elapsed
+        db_manager.close()
+    print("✅ 1台あたりの期限と例外の扱いを確認しました")
+
+class HungFetch:
+    """WinRMの呼び出しが応答しないPCの代わりに、渡された期限の少し後まで待ってから失敗し、実行したスレッドと期限を記録する処理"""
+    def __init__(self):
+        self.threads = set()
+        self.deadlines = []
+        self._lock = threading.Lock()
+
+    def __call__(self, task_manager, pc):
+        with self._lock:
+            self.threads.add(threading.get_ident())
+            self.deadlines.append(task_manager.deadline)
+        time.sleep(max(0.0, task_manager.deadline - time.monotonic()) + 0.1)
+        raise TimeoutError("コマンドが期限までに完了しませんでした")
+
+def test_timed_out_hosts_do_not_pile_up():
+    """打ち切ったPCの処理にも期限が渡り、スキャンを繰り返してもスレッドが同時接続数より増えないことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        scanner, db_manager = create_scanner(directory, max_workers=2, host_timeout=0.3)
+        pcs = [{'name': 'PC-1', 'ip': '192.0.2.1'}, {'name': 'PC-2', 'ip': '192.0.2.2'}]
+        fetch = HungFetch()
+
+        for _ in range(3):
+            started = time.monotonic()
+            results = list(scanner.scan(pcs, CREDENTIALS, fetch=fetch))
+            assert [r['error'] for r in results] == ["タイムアウト (0.3秒)"] * 2
+            assert all(started < deadline <= time.monotonic() for deadline in fetch.deadlines[-2:])
+
+        assert len(fetch.deadlines) == 6
+        assert len(fetch.threads) <= 2, fetch.threads
+        db_manager.close()
+    print("✅ 打ち切ったPCのスレッドが増え続けないことを確認しました")
+
+def test_skips_pcs_without_credentials():
+    """認証情報のないPCは処理を実行せず、すぐにエラーとして返すことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        scanner, db_manager = create_scanner(directory)
+        pcs = [{'name': 'PC-1', 'ip': '192.0.2.1'}, {'name': 'PC-UNKNOWN', 'ip': '192.0.2.99'}]
+        fetch = DelayedFetch({})
+
+        results = list(scanner.scan(pcs, CREDENTIALS, fetch=fetch))
+
+        assert results[0]['pc']['name'] == 'PC-UNKNOWN'
+        assert results[0]['error'] == "認証情報が見つかりません: PC-UNKNOWN"
+        assert results[0]['elapsed'] == 0.0
+        assert fetch.called == ['PC-1']
+        db_manager.close()
+    print("✅ 認証情報のないPCのスキップを確認しました")
+
+def test_skips_unreachable_hosts():
+    """WinRMのポートに接続できないPCは、処理（WinRMの呼び出し）を実行せずにスキップすることを確認する"""
+    from core.reachability import get_reachability_checker
+    with socket.socket() as server, tempfile.TemporaryDirectory() as directory:
+        # 127.0.0.1だけで待ち受け、127.0.0.2の同じポートには接続できない状態にする
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        reachability = {'enabled': True, 'port': server.getsockname()[1], 'timeout_sec': 1.0}
+        scanner, db_manager = create_scanner(directory, reachability=reachability)
+        get_reachability_checker(scanner.config_manager).reset()
+        pcs = [{'name': 'PC-1', 'ip': '127.0.0.1'}, {'name': 'PC-2', 'ip': '127.0.0.2'}]
+        fetch = DelayedFetch({})
+
+        try:
+            results = {r['pc']['name']: r for r in scanner.scan(pcs, CREDENTIALS, fetch=fetch)}
+            assert fetch.called == ['PC-1']
+            assert results['PC-1']['result'] == [{'TaskName': 'PC-1-Task'}]
+            assert results['PC-2']['error'] == "応答がありません: PC-2 (127.0.0.2)"
+
+            # ブレーカーが開いている間は、ポートへの接続も試みずにスキップする
+            assert get_reachability_checker().is_open('127.0.0.2')
+            results = {r['pc']['name']: r for r in scanner.scan(pcs, CREDENTIALS, fetch=fetch)}
+            assert fetch.called == ['PC-1', 'PC-1']
+            assert results['PC-2']['result'] is None
+        finally:
+            get_reachability_checker().reset()
+            db_manager.close()
+    print("✅ 接続できないPCのスキップを確認しました")
+
+if __name__ == "__main__":
+    print("FleetScannerのテストを開始します...")
+    test_streams_results_in_completion_order()
+    test_host_timeout_and_errors()
+    test_timed_out_hosts_do_not_pile_up()
+    test_skips_pcs_without_credentials()
+    test_skips_unreachable_hosts()
+    print("\n--- Test completed successfully! ---")
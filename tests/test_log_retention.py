@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LogRetentionのテストスクリプト
+一時ファイルのデータベースを使い、保存期間を過ぎたログが月ごとのアーカイブへ移ることを確認します。
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.log_retention import LogRetention
+
+def create_retention(directory):
+    """一時ディレクトリに設定とDBを作成し、LogRetentionを返す"""
+    config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+    config = config_manager.get_config()
+    config['retention'] = {
+        'execution_logs_days': 60,
+        'audit_logs_days': 90,
+        'archive_dir': os.path.join(directory, 'archive'),
+        'interval_hours': 24,
+    }
+    config_manager.update_config(config)
+    db_manager = DBManager(os.path.join(directory, 'logs.db'))
+    return LogRetention(config_manager, db_manager)
+
+def test_archive_by_month():
+    """保存期間を過ぎたログだけが月ごとのファイルへ移り、検索できることを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        retention = create_retention(directory)
+        db_manager = retention.db_manager
+        # 2023-11-15 〜 2024-03-09 の毎日1件
+        db_manager.add_execution_logs([
+            {
+                'recorded_at': datetime.fromordinal(datetime(2023, 11, 15).toordinal() + i).isoformat(),
+                'pc_name': 'PC-1',
+                'task_path': '\\',
+                'task_name': 'Backup',
+                'result_code': 0 if i % 4 else 1,
+            }
+            for i in range(116)
+        ])
+        db_manager.add_audit_logs([
+            {'timestamp': '2023-11-20T09:00:00', 'user_identifier': 'admin', 'action_type': 'RUN_TASK'},
+            {'timestamp': '2024-03-01T09:00:00', 'user_identifier': 'admin', 'action_type': 'RUN_TASK'},
+        ])
+        daily_before = db_manager.get_rollup_summary('day')
+        # 新規作成したDBは最初からauto_vacuumがINCREMENTALになっている
+        assert db_manager._get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+        archived = retention.run(now=datetime(2024, 3, 10))
+
+        # 60日前(2024-01-10)より古い実行結果ログと、90日前(2023-12-11)より古い監査ログが移動する
+        assert archived == {'execution_logs': 56, 'audit_logs': 1}, archived
+        remaining = db_manager.search_execution_logs()
+        assert len(remaining) == 60
+        assert min(log['recorded_at'] for log in remaining) >= '2024-01-10'
+
+        assert [month for month, _ in retention.list_archives()] == ['2024-01', '2023-12', '2023-11']
+        january = retention.open_archive('2024-01')
+        assert len(january.search_execution_logs()) == 9
+        november = retention.open_archive('2023-11')
+        assert len(november.search_execution_logs()) == 16
+        assert november._get_connection().execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0] == 1
+        # タスク名の部分一致検索（全文検索の索引）もアーカイブで使える
+        assert len(november.search_execution_logs(task_name='backup')) == 16
+
+        # アーカイブには移動したテーブルと全文検索の索引だけを作成する
+        def table_names(manager):
+            cursor = manager._get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            # 全文検索の内部テーブル（*_fts_data など）は除く
+            return {row[0] for row in cursor.fetchall() if '_fts_' not in row[0]}
+        assert table_names(january) == {'execution_logs', 'execution_logs_fts', 'execution_logs_task_fts', 'sqlite_sequence'}
+        assert table_names(november) == table_names(january) | {'audit_logs'}
+
+        # アーカイブ後もレポート用の集計は残る
+        assert db_manager.get_rollup_summary('day') == daily_before
+
+        # 再実行しても移動済みのログが重複しない
+        assert retention.run(now=datetime(2024, 3, 10)) == {'execution_logs': 0, 'audit_logs': 0}
+        assert len(retention.open_archive('2024-01').search_execution_logs()) == 9
+
+        assert db_manager._get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+        for manager in (db_manager, january, november):
+            manager.close()
+    print("✅ 月ごとのアーカイブを確認しました")
+
+if __name__ == "__main__":
+    print("LogRetentionのテストを開始します...")
+    test_archive_by_month()
+    print("\n--- Test completed successfully! ---")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稼働状況取得（TaskManager.get_pc_health）のテストスクリプト
+リモート呼び出しの代わりに、あらかじめ用意した出力を順に返すTaskManagerを使い、
+稼働状況のJSONの正規化と、取得・解析に失敗した場合の戻り値を確認します。
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.task_manager import TaskManager
+
+PC_IP = '192.0.2.10'
+
+class ScriptedTaskManager(TaskManager):
+    """実行されたスクリプトを記録し、用意した (成功したかどうか, 出力) を順に返すTaskManager"""
+    def __init__(self, config_manager, db_manager, outputs):
+        super().__init__(config_manager, db_manager, 'user', 'pass')
+        self.outputs = list(outputs)
+        self.commands = []
+
+    def _execute_ps_command(self, pc_ip, command, force=False):
+        self.commands.append(command)
+        return self.outputs.pop(0)
+
+def run_with_outputs(outputs, test):
+    """一時ディレクトリの設定とDBでScriptedTaskManagerを作成し、testを実行する"""
+    with tempfile.TemporaryDirectory() as directory:
+        config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+        db_manager = DBManager(os.path.join(directory, 'logs.db'))
+        try:
+            test(ScriptedTaskManager(config_manager, db_manager, outputs))
+        finally:
+            db_manager.close()
+
+def health_output(disks):
+    """稼働状況スクリプトの出力（JSON）を作成する"""
+    return True, json.dumps({
+        'LastSeen': '2024/03/10 09:00:00',
+        'System': {'WindowsProductName': 'Windows 11 Pro', 'WindowsVersion': '10.0.22631', 'TotalPhysicalMemory': 17179869184},
+        'Memory': {'TotalVisibleMemorySize': 16777216, 'FreePhysicalMemory': 4194304},
+        'Disks': disks,
+        'TasksCount': 3,
+    })
+
+def test_pc_health():
+    """稼働状況のJSONの正規化と、取得・解析に失敗した場合の戻り値を確認する"""
+    disk_c = {'DeviceID': 'C:', 'Size': 536870912000, 'FreeSpace': 107374182400}
+    disk_d = {'DeviceID': 'D:', 'Size': 1073741824000, 'FreeSpace': 536870912000}
+
+    def test(task_manager):
+        # ディスクが1台の場合は配列が展開されて辞書で返るため、リストに揃える
+        success, health = task_manager.get_pc_health(PC_IP)
+        assert success
+        assert health['Disks'] == [disk_c]
+        assert health['TasksCount'] == 3 and health['System']['WindowsVersion'] == '10.0.22631'
+        assert 'Win32_ComputerSystem' in task_manager.commands[0]
+
+        success, health = task_manager.get_pc_health(PC_IP, include_inventory=False)
+        assert success and health['Disks'] == [disk_c, disk_d]
+        assert 'Win32_ComputerSystem' not in task_manager.commands[1]
+
+        success, health = task_manager.get_pc_health(PC_IP)
+        assert success and health['Disks'] == []
+
+        # 解析できない出力はエラーメッセージを返す
+        success, message = task_manager.get_pc_health(PC_IP)
+        assert not success and message.startswith("JSON parse failed: ")
+
+        # 取得に失敗した場合はエラーメッセージをそのまま返す
+        assert task_manager.get_pc_health(PC_IP) == (False, "The WinRM client cannot process the request")
+
+    run_with_outputs([
+        health_output(disk_c),
+        health_output([disk_c, disk_d]),
+        health_output(None),
+        (True, "Get-CimInstance : アクセスが拒否されました。"),
+        (False, "The WinRM client cannot process the request"),
+    ], test)
+    print("✅ 稼働状況の取得を確認しました")
+
+if __name__ == "__main__":
+    print("稼働状況取得のテストを開始します...")
+    test_pc_health()
+    print("\n--- Test completed successfully! ---")
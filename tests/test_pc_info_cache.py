@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PcInfoCacheのテストスクリプト
+一時ファイルのデータベースと、リモート呼び出しの代わりに固定の値を返すTaskManagerで、
+構成情報と稼働状況がそれぞれのTTLで更新されることを確認します。
+"""
+
+import os
+import sys
+import tempfile
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.pc_info_cache import PcInfoCache, build_metric_samples
+
+class FakeTaskManager:
+    """get_pc_healthの呼び出しを記録し、固定の稼働状況を返すTaskManagerの代わり"""
+    def __init__(self):
+        self.calls = []
+        self.online = True
+        self.free_memory = 4 * 1024 * 1024
+
+    def get_pc_health(self, pc_ip, include_inventory=True):
+        self.calls.append(include_inventory)
+        if not self.online:
+            return False, "接続できません"
+        return True, {
+            'LastSeen': '2024/03/10 09:00:00',
+            'System': {'WindowsProductName': 'Microsoft Windows 11 Pro', 'WindowsVersion': '10.0.22631', 'TotalPhysicalMemory': 17179869184} if include_inventory else None,
+            'Memory': {'TotalVisibleMemorySize': 16 * 1024 * 1024, 'FreePhysicalMemory': self.free_memory},
+            'Disks': [{'DeviceID': 'C:', 'Size': 500 * 1024 ** 3, 'FreeSpace': 100 * 1024 ** 3}],
+            'TasksCount': 12,
+        }
+
+def test_inventory_and_metrics_ttl():
+    """構成情報は長いTTLで、稼働状況は短いTTLで取得し直すことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+        db_manager = DBManager(os.path.join(directory, 'logs.db'))
+        cache = PcInfoCache(config_manager, db_manager)
+        task_manager = FakeTaskManager()
+
+        assert cache.get_cached('PC-1', '192.168.1.10') is None
+
+        # 初回は構成情報と稼働状況をまとめて取得する
+        info = cache.get_info(task_manager, 'PC-1', '192.168.1.10')
+        assert task_manager.calls == [True]
+        assert info['status'] == 'Online'
+        assert info['system_info']['WindowsProductName'] == 'Microsoft Windows 11 Pro'
+        assert info['tasks_count'] == 12
+
+        # TTL内はリモート呼び出しを行わない
+        assert cache.get_info(task_manager, 'PC-1', '192.168.1.10') == info
+        assert task_manager.calls == [True]
+
+        # 稼働状況だけを取得し直す場合は、構成情報を含まないスクリプトを使い、構成情報はキャッシュを使う
+        task_manager.free_memory = 1024 * 1024
+        info = cache.get_info(task_manager, 'PC-1', '192.168.1.10', force=True)
+        assert task_manager.calls == [True, False]
+        assert info['memory_info']['FreePhysicalMemory'] == 1024 * 1024
+        assert info['system_info']['WindowsVersion'] == '10.0.22631'
+
+        # オフラインになった場合も、前回の構成情報と値を残して状態だけを更新する
+        task_manager.online = False
+        info = cache.get_info(task_manager, 'PC-1', '192.168.1.10', force=True)
+        assert info['status'] == 'Offline'
+        assert info['error'] == "接続できません"
+        assert info['last_seen'] == '2024/03/10 09:00:00'
+        assert info['system_info']['WindowsProductName'] == 'Microsoft Windows 11 Pro'
+        assert cache.get_cached('PC-1', '192.168.1.10')['status'] == 'Offline'
+
+        # 構成情報のTTLを過ぎると、次の取得で構成情報も取得し直す
+        config = config_manager.get_config()
+        config['pc_info_cache'] = {'inventory_ttl_sec': -1, 'metrics_ttl_sec': 60}
+        config_manager.update_config(config)
+        task_manager.online = True
+        cache.get_info(task_manager, 'PC-1', '192.168.1.10')
+        assert task_manager.calls[-1] is True
+
+        db_manager.close()
+    print("✅ 構成情報と稼働状況のキャッシュを確認しました")
+
+def test_build_metric_samples():
+    """PC情報からメモリ・ディスクのサンプルが作成され、オフラインのPCは記録しないことを確認する"""
+    info = {
+        'name': 'PC-1',
+        'status': 'Online',
+        'memory_info': {'TotalVisibleMemorySize': 16 * 1024 * 1024, 'FreePhysicalMemory': 4 * 1024 * 1024},
+        'disk_info': [
+            {'DeviceID': 'C:', 'Size': 500 * 1024 ** 3, 'FreeSpace': 100 * 1024 ** 3},
+            {'DeviceID': 'D:', 'Size': None, 'FreeSpace': None},
+        ],
+    }
+    samples = build_metric_samples(info, '2024-03-10T09:00:00')
+    assert samples == [
+        ('2024-03-10T09:00:00', 'PC-1', 'memory_used_pct', 75.0),
+        ('2024-03-10T09:00:00', 'PC-1', 'disk_used_pct:C:', 80.0),
+        ('2024-03-10T09:00:00', 'PC-1', 'disk_free_gb:C:', 100.0),
+    ]
+    assert build_metric_samples(dict(info, status='Offline'), '2024-03-10T09:00:00') == []
+    print("✅ リソースのサンプルの作成を確認しました")
+
+if __name__ == "__main__":
+    print("PcInfoCacheのテストを開始します...")
+    test_inventory_and_metrics_ttl()
+    test_build_metric_samples()
+    print("\n--- Test completed successfully! ---")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ReachabilityCheckerのテストスクリプト
+ローカルに待ち受けるポートと閉じたポートで、到達確認とホストごとのバックオフを確認します。
+また、例外を発生させるセッションプールで、WinRMの呼び出しとブレーカーの連動を確認します。
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import requests
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.winrm_session_pool as winrm_session_pool
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.reachability import ReachabilityChecker, get_reachability_checker
+from core.task_manager import TaskManager
+from core.winrm_session_pool import WinRMSessionPool
+
+def _closed_port():
+    """使われていないポート番号を返す（一度確保してすぐに閉じる）。"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_check_reachable_and_unreachable():
+    """待ち受けているポートには到達でき、閉じたポートには到達できないことを確認する"""
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        checker = ReachabilityChecker(port=server.getsockname()[1], timeout=1.0)
+        assert checker.check(['127.0.0.1']) == {'127.0.0.1': True}
+        assert not checker.is_open('127.0.0.1')
+
+    checker = ReachabilityChecker(port=_closed_port(), timeout=1.0)
+    started = time.monotonic()
+    assert checker.check(['127.0.0.1', 'localhost']) == {'127.0.0.1': False, 'localhost': False}
+    assert time.monotonic() - started < 2.0
+    assert checker.is_open('127.0.0.1')
+    print("✅ ポートへの到達確認を確認しました")
+
+def test_backoff():
+    """失敗が続くほど接続を試みない時間が長くなり、成功するとブレーカーが閉じることを確認する"""
+    checker = ReachabilityChecker(port=_closed_port(), timeout=1.0, backoff_base=10, backoff_max=30)
+    assert checker.record_failure('pc-1') == 10
+    assert checker.record_failure('pc-1') == 20
+    assert checker.record_failure('pc-1') == 30
+    assert checker.record_failure('pc-1') == 30
+    assert checker.is_open('pc-1')
+
+    # ブレーカーが開いている間は接続を試みずに到達できないものとする
+    checker._breakers['pc-1'].failures = 0
+    assert checker.check(['pc-1']) == {'pc-1': False}
+    assert checker._breakers['pc-1'].failures == 0
+
+    # 期限を過ぎると再び確認し、成功すればブレーカーを閉じる
+    checker._breakers['pc-1'].open_until = 0.0
+    assert not checker.is_open('pc-1')
+    checker.record_success('pc-1')
+    assert 'pc-1' not in checker._breakers
+
+    # 利用者が最新の情報を求めた場合は、期限前でもブレーカーを閉じる
+    checker.record_failure('pc-2')
+    checker.reset('pc-2')
+    assert not checker.is_open('pc-2')
+    print("✅ ホストごとのバックオフを確認しました")
+
+class RaisingSessionPool(WinRMSessionPool):
+    """run_psで指定した例外を発生させ、呼び出し回数を数えるセッションプール"""
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+        self.calls = 0
+
+    def run_ps(self, host, user, password, command, deadline=None):
+        self.calls += 1
+        raise self.error
+
+def run_with_pool(pool, test):
+    """共有のセッションプールとブレーカーを差し替えてtestを実行する"""
+    original_pool = winrm_session_pool._shared_pool
+    winrm_session_pool._shared_pool = pool
+    get_reachability_checker().reset()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+            db_manager = DBManager(os.path.join(directory, 'logs.db'))
+            test(TaskManager(config_manager, db_manager, 'user', 'pass'))
+            db_manager.close()
+    finally:
+        winrm_session_pool._shared_pool = original_pool
+        get_reachability_checker().reset()
+
+def test_execute_ps_command_breaker():
+    """接続できない場合だけブレーカーが開き、利用者の操作ではブレーカーを無視して接続を試みることを確認する"""
+    def connection_refused(task_manager):
+        success, _ = task_manager._execute_ps_command('192.0.2.20', 'Get-Date')
+        assert not success
+        assert get_reachability_checker().is_open('192.0.2.20')
+
+        # ブレーカーが開いている間の取得処理は、接続を試みずにすぐ失敗する
+        success, message = task_manager._execute_ps_command('192.0.2.20', 'Get-Date')
+        assert not success and 'しばらく接続を試みません' in message
+        assert winrm_session_pool._shared_pool.calls == 1
+
+        # 手動実行などの操作はブレーカーを無視して接続を試みる
+        task_manager.run_task_now('192.0.2.20', 'Task1')
+        assert winrm_session_pool._shared_pool.calls == 2
+
+    def read_timeout(task_manager):
+        # 応答待ちのタイムアウトはPCに到達できているため、ブレーカーを開かない
+        success, _ = task_manager._execute_ps_command('192.0.2.21', 'Get-Date')
+        assert not success
+        assert not get_reachability_checker().is_open('192.0.2.21')
+
+    def connect_timeout(task_manager):
+        task_manager._execute_ps_command('192.0.2.22', 'Get-Date')
+        assert get_reachability_checker().is_open('192.0.2.22')
+
+    run_with_pool(RaisingSessionPool(requests.exceptions.ConnectionError("refused")), connection_refused)
+    run_with_pool(RaisingSessionPool(requests.exceptions.ConnectTimeout("connect timeout")), connect_timeout)
+    run_with_pool(RaisingSessionPool(requests.exceptions.ReadTimeout("read timeout")), read_timeout)
+    print("✅ WinRM呼び出しとブレーカーの連動を確認しました")
+
+if __name__ == "__main__":
+    print("ReachabilityCheckerのテストを開始します...")
+    test_check_reachable_and_unreachable()
+    test_backoff()
+    test_execute_ps_command_breaker()
+    print("\n--- Test completed successfully! ---")
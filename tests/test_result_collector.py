@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ResultCollectorのテストスクリプト
+一時ファイルのデータベースと、FleetScannerの代わりに固定のタスク一覧を返すスキャナーを使い、
+実行結果の重複排除・結果が確定していないタスクの除外・収集間隔を確認します。
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.error_manager import ErrorManager
+from core.result_collector import ResultCollector
+
+PC = {'name': 'PC-1', 'ip': '192.0.2.1'}
+
+class FixedScanner:
+    """FleetScanner.scanと同じ形式で、用意したタスク一覧を返すスキャナー"""
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def scan(self, pcs, credentials, fetch=None):
+        for pc in pcs:
+            yield {'pc': pc, 'result': [dict(task) for task in self.tasks], 'error': None, 'elapsed': 0.01}
+
+class CountingCollector(ResultCollector):
+    """collect_metricsの呼び出し回数を数えるResultCollector"""
+    metrics_calls = 0
+
+    def collect_metrics(self, pcs, now=None):
+        self.metrics_calls += 1
+        return 0
+
+def create_collector(directory, cls=ResultCollector):
+    """一時ディレクトリの設定・DBでResultCollectorを作成する"""
+    config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+    db_manager = DBManager(os.path.join(directory, 'logs.db'))
+    error_manager = ErrorManager(os.path.join(directory, 'error_codes.json'))
+    return cls(config_manager, db_manager, {}, error_manager=error_manager), db_manager
+
+def make_task(name, last_run, result):
+    return {'TaskName': name, 'TaskPath': '\\', 'LastRunTime': last_run, 'LastTaskResult': result}
+
+def test_build_log():
+    """記録済みの実行より新しいものだけを記録し、結果が確定していないタスクは記録しないことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        collector, db_manager = create_collector(directory)
+        collector.last_seen[('PC-1', '\\', 'Backup')] = '2024-03-10T09:00:00'
+
+        log = collector._build_log(PC, make_task('Backup', datetime(2024, 3, 10, 10, 0), 1))
+        assert log['recorded_at'] == log['last_run_at'] == '2024-03-10T10:00:00'
+        assert log['result_code'] == 1 and log['result_message'] == collector.error_manager.get_error_message(1)
+        assert collector._build_log(PC, make_task('Report', '2024-03-10T10:00:00', '0'))['result_message'] == '正常終了'
+
+        # 記録済みの実行と同じか古いものは記録しない
+        assert collector._build_log(PC, make_task('Backup', datetime(2024, 3, 10, 9, 0), 0)) is None
+        assert collector._build_log(PC, make_task('Backup', '2024-03-10T08:00:00', 0)) is None
+
+        # 実行中・未実行・キュー待ち、実行日時や結果のないタスクは記録しない
+        for code in (0x00041301, 0x00041303, 0x00041325):
+            assert collector._build_log(PC, make_task('Running', '2024-03-10T10:00:00', code)) is None
+        assert collector._build_log(PC, make_task('Never', None, 0)) is None
+        assert collector._build_log(PC, make_task('NoResult', '2024-03-10T10:00:00', None)) is None
+        assert collector._build_log(PC, make_task('Invalid', '2024-03-10T10:00:00', 'abc')) is None
+        db_manager.close()
+    print("✅ 実行結果ログの組み立てを確認しました")
+
+def test_collect_deduplicates():
+    """同じ実行は再起動後も含めて二重に記録しないことを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        collector, db_manager = create_collector(directory)
+        collector.scanner = FixedScanner([
+            make_task('Backup', datetime(2024, 3, 10, 10, 0), 0),
+            make_task('Running', datetime(2024, 3, 10, 10, 0), 0x00041301),
+        ])
+        assert collector.collect([PC]) == 1
+        assert collector.collect([PC]) == 0
+
+        # 再起動した収集デーモンはDBから記録済みの実行を読み込む
+        restarted, _ = create_collector(directory)
+        assert restarted.last_seen == {('PC-1', '\\', 'Backup'): '2024-03-10T10:00:00'}
+        restarted.scanner = collector.scanner
+        assert restarted.collect([PC]) == 0
+
+        # 新しい実行だけが追加される
+        collector.scanner.tasks[0]['LastRunTime'] = datetime(2024, 3, 10, 11, 0)
+        assert restarted.collect([PC]) == 1
+        assert db_manager._get_connection().execute("SELECT COUNT(*) FROM execution_logs").fetchone()[0] == 2
+
+        # 別のプロセスが先に登録した実行は件数に含めず、記録済みとして扱う
+        collector.scanner.tasks[0]['LastRunTime'] = datetime(2024, 3, 10, 12, 0)
+        db_manager.add_execution_logs([collector._build_log(PC, collector.scanner.tasks[0])])
+        assert restarted.collect([PC]) == 0
+        assert restarted.last_seen[('PC-1', '\\', 'Backup')] == '2024-03-10T12:00:00'
+        assert db_manager._get_connection().execute("SELECT COUNT(*) FROM execution_logs").fetchone()[0] == 3
+        db_manager.close()
+    print("✅ 実行結果の重複排除を確認しました")
+
+def test_collect_intervals():
+    """リソース収集は設定された間隔ごとにのみ行い、各PCの収集時刻はばらつきの範囲内に収まることを確認する"""
+    with tempfile.TemporaryDirectory() as directory:
+        collector, db_manager = create_collector(directory, CountingCollector)
+        collector.collect_metrics_if_due([PC])
+        collector.collect_metrics_if_due([PC])
+        assert collector.metrics_calls == 1
+
+        # 間隔が過ぎると再び収集する
+        collector.metrics_last_run -= collector._metrics_settings()['interval'] + 1
+        collector.collect_metrics_if_due([PC])
+        assert collector.metrics_calls == 2
+
+        # 初回は間隔とばらつきの小さい方の範囲内、以降は間隔±ばらつきの範囲内に次回の収集時刻を決める
+        collector.interval, collector.jitter = 300, 60
+        for _ in range(100):
+            collector._schedule('PC-1', 1000.0, initial=True)
+            assert 1000.0 <= collector.next_due['PC-1'] <= 1060.0
+            collector._schedule('PC-1', 1000.0)
+            assert 1240.0 <= collector.next_due['PC-1'] <= 1360.0
+        db_manager.close()
+    print("✅ 収集間隔を確認しました")
+
+if __name__ == "__main__":
+    print("ResultCollectorのテストを開始します...")
+    test_build_log()
+    test_collect_deduplicates()
+    test_collect_intervals()
+    print("\n--- Test completed successfully! ---")
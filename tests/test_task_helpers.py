@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+タスク関連のヘルパー関数のテストスクリプト
+列単位でまとめて変換するadd_task_display_columnsが、行ごとの変換関数
+（get_task_state_info・get_task_result_info・format_datetime・format_trigger_info）と
+同じ表示になることを、値や型の混在したタスク一覧で確認します。
+"""
+
+import math
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.error_manager import get_error_manager
+from core.task_trigger import TriggerSummary
+from utils.task_helpers import (
+    add_task_display_columns,
+    format_datetime,
+    format_trigger_info,
+    get_task_result_info,
+    get_task_state_info,
+)
+
+DAILY_TRIGGER = [{'Type': 'Daily', 'Enabled': True, 'StartBoundary': '2024-03-09T06:00:00', 'DaysInterval': 1}]
+
+# 取得方法（一括取得・差分取得・schtasks・WMI）や欠損によって値や型が混在したタスク一覧
+MIXED_TASKS = [
+    {'TaskName': 'Ready', 'State': 3, 'LastTaskResult': 0, 'NextRunTime': datetime(2024, 3, 10, 9, 0),
+     'LastRunTime': datetime(2024, 3, 9, 9, 0), 'TriggerSummary': TriggerSummary.from_value(DAILY_TRIGGER)},
+    {'TaskName': 'Disabled', 'State': 1, 'LastTaskResult': 1, 'NextRunTime': None,
+     'LastRunTime': pd.Timestamp('2024-03-08 23:59:59'), 'TriggerSummary': TriggerSummary.from_value(None)},
+    {'TaskName': 'Running', 'State': 4, 'LastTaskResult': 0x00041301, 'NextRunTime': math.nan,
+     'LastRunTime': '2024-03-09 09:00:00', 'TriggerSummary': TriggerSummary.from_value('StartBoundary: 2024-03-09')},
+    {'TaskName': 'NotYetRun', 'State': 2.0, 'LastTaskResult': 0x00041303, 'NextRunTime': pd.NaT,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value([])},
+    {'TaskName': 'UnknownCode', 'State': 99, 'LastTaskResult': 0x7FFF1234, 'NextRunTime': '未設定',
+     'LastRunTime': math.nan, 'TriggerSummary': TriggerSummary.from_value(DAILY_TRIGGER)},
+    {'TaskName': 'NegativeCode', 'State': None, 'LastTaskResult': -2147024894, 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(DAILY_TRIGGER)},
+    {'TaskName': 'StringCodes', 'State': '3', 'LastTaskResult': '0', 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(None)},
+    {'TaskName': 'StringRunning', 'State': 'Ready', 'LastTaskResult': '267009', 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(None)},
+    {'TaskName': 'InvalidResult', 'State': math.nan, 'LastTaskResult': 'abc', 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(None)},
+    {'TaskName': 'NoResult', 'State': 3, 'LastTaskResult': None, 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(None)},
+    {'TaskName': 'NaNResult', 'State': 3, 'LastTaskResult': math.nan, 'NextRunTime': None,
+     'LastRunTime': None, 'TriggerSummary': TriggerSummary.from_value(None)},
+]
+
+def expected_row(task):
+    """行ごとの変換関数で求めた表示用の値"""
+    state_info = get_task_state_info(task['State'])
+    result_info = get_task_result_info(task)
+    return {
+        '状態': state_info['status'],
+        '状態アイコン': state_info['icon'],
+        '実行結果': result_info['status'],
+        '実行結果アイコン': result_info['icon'],
+        '次回実行': format_datetime(task['NextRunTime']),
+        '最終実行': format_datetime(task['LastRunTime']),
+        '開始時刻': format_trigger_info(task['TriggerSummary']),
+    }
+
+def assert_matches_row_helpers(tasks):
+    """add_task_display_columnsの結果が、行ごとの変換関数の結果と一致することを確認する"""
+    df = add_task_display_columns(pd.DataFrame(tasks), get_error_manager('data/error_codes.json'))
+    for task, (_, row) in zip(tasks, df.iterrows()):
+        expected = expected_row(task)
+        actual = {column: row[column] for column in expected}
+        assert actual == expected, (task['TaskName'], actual, expected)
+    return df
+
+def test_matches_row_helpers():
+    """値や型が混在したタスク一覧でも、列単位の変換が行ごとの変換と同じ表示になることを確認する"""
+    df = assert_matches_row_helpers(MIXED_TASKS)
+    by_name = df.set_index('TaskName')
+    assert by_name.loc['Running', '実行結果'] == '実行中'
+    assert by_name.loc['UnknownCode', '状態'] == '不明'
+    assert by_name.loc['InvalidResult', '実行結果'] == '未実行'
+    assert list(df['有効']) == [task['State'] in (3, 4) for task in MIXED_TASKS]
+    print("✅ 値や型の混在したタスク一覧の変換を確認しました")
+
+def test_uniform_columns():
+    """日時だけ・数値だけの列（datetime64やfloat64になる列）でも同じ表示になることを確認する"""
+    tasks = [
+        {'TaskName': 'A', 'State': 3, 'LastTaskResult': 0, 'NextRunTime': datetime(2024, 3, 10, 9, 0),
+         'LastRunTime': datetime(2024, 3, 9, 9, 0), 'TriggerSummary': TriggerSummary.from_value(DAILY_TRIGGER)},
+        {'TaskName': 'B', 'State': 1, 'LastTaskResult': math.nan, 'NextRunTime': None,
+         'LastRunTime': datetime(2024, 3, 8, 0, 5), 'TriggerSummary': TriggerSummary.from_value(None)},
+    ]
+    df = assert_matches_row_helpers(tasks)
+    assert pd.api.types.is_datetime64_any_dtype(pd.DataFrame(tasks)['NextRunTime'])
+    assert list(df['次回実行']) == ['2024/03/10 09:00', '未設定']
+
+    # 列がない場合は未設定・不明として扱う
+    df = add_task_display_columns(pd.DataFrame([{'TaskName': 'C'}]))
+    assert df.loc[0, ['状態', '実行結果', '次回実行', '開始時刻']].tolist() == ['不明', '未実行', '未設定', '未設定']
+    print("✅ 型のそろった列の変換を確認しました")
+
+if __name__ == "__main__":
+    print("タスク関連のヘルパー関数のテストを開始します...")
+    test_matches_row_helpers()
+    test_uniform_columns()
+    print("\n--- Test completed successfully! ---")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+タスク一覧取得（TaskManager.get_tasks_from_pc）のテストスクリプト
+リモート呼び出しの代わりに、あらかじめ用意した出力を順に返すTaskManagerを使い、
+差分取得のマージ・全件取得への切り替え・スクリプトの長さを確認します。
+"""
+
+import base64
+import json
+import os
+import sys
+import tempfile
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.task_manager import TaskManager
+
+PC_IP = '192.0.2.10'
+
+class ScriptedTaskManager(TaskManager):
+    """実行されたスクリプトを記録し、用意した (成功したかどうか, 出力) を順に返すTaskManager"""
+    def __init__(self, config_manager, db_manager, outputs):
+        super().__init__(config_manager, db_manager, 'user', 'pass')
+        self.outputs = list(outputs)
+        self.commands = []
+
+    def _execute_ps_command(self, pc_ip, command, force=False):
+        self.commands.append(command)
+        return self.outputs.pop(0)
+
+def make_task(name, state=3, last_result=0):
+    """タスク一覧スクリプトが返すタスク1件の辞書を作成する"""
+    return {
+        'TaskName': name,
+        'TaskPath': '\\',
+        'State': state,
+        'NextRunTime': '2024-03-10 09:00:00',
+        'LastRunTime': '2024-03-09 09:00:00',
+        'LastTaskResult': last_result,
+        'Triggers': [{'Type': 'Daily', 'Enabled': True, 'StartBoundary': '2024-03-09T09:00:00', 'DaysInterval': 1}],
+    }
+
+def delta_output(token, changed, removed=(), full=False):
+    """差分取得スクリプトの出力（JSON）を作成する"""
+    return True, json.dumps({
+        'Token': token,
+        'Full': full,
+        'Changed': [dict(task, Hash=f"H{task['TaskName']}{task['State']}") for task in changed],
+        'Removed': list(removed),
+    })
+
+def run_with_outputs(outputs, test):
+    """一時ディレクトリの設定とDBでScriptedTaskManagerを作成し、testを実行する"""
+    TaskManager.clear_task_snapshot()
+    with tempfile.TemporaryDirectory() as directory:
+        config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+        db_manager = DBManager(os.path.join(directory, 'logs.db'))
+        try:
+            test(ScriptedTaskManager(config_manager, db_manager, outputs))
+        finally:
+            TaskManager.clear_task_snapshot()
+            db_manager.close()
+
+def task_names(tasks):
+    return sorted(task['TaskName'] for task in tasks)
+
+def test_delta_merge():
+    """初回は全件、以降は変更・削除されたタスクだけがマージされることを確認する"""
+    def test(task_manager):
+        # 初回はトークンがないため、リモート側から全件が返る
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert "$baseToken = ''" in task_manager.commands[0]
+        assert task_names(tasks) == ['A', 'B', 'C']
+        assert tasks[0]['NextRunTime'].year == 2024
+        assert tasks[0]['TriggerSummary'].text == '09:00 | 1日'
+        assert 'Hash' not in tasks[0]
+
+        # 2回目は前回のトークンだけを送り、変更されたBと削除されたCを反映する
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert "$baseToken = '00000000000000A1'" in task_manager.commands[1]
+        by_name = {task['TaskName']: task for task in tasks}
+        assert task_names(tasks) == ['A', 'B']
+        assert by_name['B']['State'] == 1
+
+        # 変化がない場合は前回のスナップショットをそのまま返す
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert task_names(tasks) == ['A', 'B']
+
+        # 返したリストを変更しても共有スナップショットは変わらない
+        tasks[0]['PC名'] = 'PC-1'
+        assert 'PC名' not in task_manager.get_tasks_from_pc(PC_IP, delta=True)[0]
+
+        # リモート側の保存ファイルが消えていた場合は全件が返り、スナップショットを作り直す
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert task_names(tasks) == ['D']
+        assert len(task_manager.commands) == 5
+
+    run_with_outputs([
+        delta_output('00000000000000A1', [make_task('A'), make_task('B'), make_task('C')], full=True),
+        delta_output('00000000000000A2', [make_task('B', state=1)], removed=['\\C']),
+        delta_output('00000000000000A2', []),
+        delta_output('00000000000000A2', []),
+        delta_output('00000000000000A3', [make_task('D')], full=True),
+    ], test)
+    print("✅ 差分取得のマージを確認しました")
+
+def test_delta_fallback():
+    """差分取得に失敗した場合は全件取得に切り替え、不正なトークンはスクリプトに埋め込まないことを確認する"""
+    def test(task_manager):
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert task_names(tasks) == ['A']
+        assert len(task_manager.commands) == 2
+        assert '$baseToken' not in task_manager.commands[1]
+
+        tasks = task_manager.get_tasks_from_pc(PC_IP, delta=True)
+        assert task_names(tasks) == ['B']
+        assert len(task_manager.commands) == 4
+
+        command = task_manager._build_inventory_command("'; Remove-Item C:\\ -Recurse; '")
+        assert "$baseToken = ''" in command
+
+    run_with_outputs([
+        (False, "The WinRM client cannot process the request"),
+        (True, json.dumps([make_task('A')])),
+        (True, "not json"),
+        (True, json.dumps(make_task('B'))),
+    ], test)
+    print("✅ 全件取得への切り替えを確認しました")
+
+def test_delta_command_size():
+    """差分取得のスクリプトの長さがタスク数によらず一定で、コマンドラインの上限より十分小さいことを確認する"""
+    def test(task_manager):
+        first = task_manager._build_inventory_command('')
+        later = task_manager._build_inventory_command('0123456789ABCDEF')
+        # pywinrmはスクリプトをUTF-16LEのbase64に変換して -encodedcommand で送る
+        first_size = len(base64.b64encode(first.encode('utf_16_le')))
+        later_size = len(base64.b64encode(later.encode('utf_16_le')))
+        # 前回のタスク数に関係なく、トークン16文字分しか長くならない
+        assert later_size - first_size <= 44, later_size - first_size
+        assert later_size < 16000, later_size
+
+    run_with_outputs([], test)
+    print("✅ 差分取得のスクリプトの長さを確認しました")
+
+if __name__ == "__main__":
+    print("タスク一覧取得のテストを開始します...")
+    test_delta_merge()
+    test_delta_fallback()
+    test_delta_command_size()
+    print("\n--- Test completed successfully! ---")
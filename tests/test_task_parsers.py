@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+タスク一覧取得（TaskManager.get_tasks_from_pc）の出力解析のテストスクリプト
+リモート呼び出しの代わりに、あらかじめ用意した出力を順に返すTaskManagerを使い、
+記録したリモートPCの出力（JSON・schtasks・WMI）の解析と代替手段への切り替えを確認します。
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.db_manager import DBManager
+from core.task_manager import TaskManager
+from core.task_trigger import TriggerSummary
+
+PC_IP = '192.0.2.10'
+
+# 日本語版Windowsの schtasks /query /fo csv /v /nh の出力。トリガーが2つあるタスクは2行になる。
+SCHTASKS_OUTPUT_JA = '''\
+"PC-01","\\Backup\\夜間バックアップ","2024/03/10 2:00:00","準備完了","対話型/バックグラウンド","2024/03/09 2:00:00","0","CONTOSO\\taro","C:\\scripts\\backup.bat","N/A","夜間のバックアップ","有効","無効","バッテリ モードで開始しない","CONTOSO\\taro","無効","72:00:00","スケジュールのデータはこの形式では利用できません。","毎日 ","2:00:00","2024/01/01","N/A","毎 1 日","N/A","無効","無効","無効","無効"
+"PC-01","\\Backup\\夜間バックアップ","2024/03/10 2:00:00","準備完了","対話型/バックグラウンド","2024/03/09 2:00:00","0","CONTOSO\\taro","C:\\scripts\\backup.bat","N/A","夜間のバックアップ","有効","無効","バッテリ モードで開始しない","CONTOSO\\taro","無効","72:00:00","スケジュールのデータはこの形式では利用できません。","ログオン時","N/A","N/A","N/A","N/A","N/A","無効","無効","無効","無効"
+"PC-01","\\集計","N/A","無効","対話型のみ","1999/11/30 0:00:00","267011","PC-01\\hanako","C:\\scripts\\report.bat","N/A","N/A","無効","無効","無効","PC-01\\hanako","無効","72:00:00","スケジュールのデータはこの形式では利用できません。","1 回 ","9:00:00","2024/03/01","N/A","N/A","N/A","無効","無効","無効","無効"
+"PC-01","\\Microsoft\\Windows\\Defrag\\ScheduledDefrag","N/A","準備完了","バックグラウンドのみ","2024/03/03 1:00:00","0","Microsoft Corporation","%windir%\\system32\\defrag.exe -c -h -o","N/A","N/A","有効","無効","無効","SYSTEM","無効","72:00:00","スケジュールのデータはこの形式では利用できません。","N/A","N/A","N/A","N/A","N/A","N/A","無効","無効","無効","無効"
+"PC-01","\\Microsoft\\Windows\\Diagnosis\\Scheduled","N/A","準備完了","バックグラウンドのみ","N/A","0","$(@%SystemRoot%\\system32\\sdiagschd.dll,-101)","%windir%\\system32\\sdiagschd.dll","N/A","N/A","有効","無効","無効","SYSTEM","無効","72:00:00","スケジュールのデータはこの形式では利用できません。","N/A","N/A","N/A","N/A","N/A","N/A","無効","無効","無効","無効"
+'''
+
+# 英語版Windowsの schtasks /query /fo csv /v の出力（/nh のない以前のスクリプトではヘッダー行を含む）
+SCHTASKS_OUTPUT_EN = '''\
+"HostName","TaskName","Next Run Time","Status","Logon Mode","Last Run Time","Last Result","Author","Task To Run","Start In","Comment","Scheduled Task State","Idle Time","Power Management","Run As User","Delete Task If Not Rescheduled","Stop Task If Runs X Hours and X Mins","Schedule","Schedule Type","Start Time","Start Date","End Date","Days","Months","Repeat: Every","Repeat: Until: Time","Repeat: Until: Duration","Repeat: Stop If Still Running"
+"PC-02","\\Sync","3/10/2024 2:30:00 PM","Running","Interactive/Background","3/10/2024 2:00:00 PM","267009","CONTOSO\\admin","C:\\scripts\\sync.bat","N/A","N/A","Enabled","Disabled","Stop On Battery Mode","CONTOSO\\admin","Disabled","72:00:00","Scheduling data is not available in this format.","Hourly ","2:00:00 PM","3/1/2024","N/A","N/A","N/A","1 Hour(s), 0 Minute(s)","None","Disabled","Disabled"
+'''
+
+# CIM(WMI)の MSFT_ScheduledTask をJSONに変換した出力
+WMI_OUTPUT = json.dumps([
+    {'TaskName': '夜間バックアップ', 'TaskPath': '\\Backup\\', 'State': 3, 'Author': 'CONTOSO\\taro', 'Description': '夜間のバックアップ'},
+    {'TaskName': 'ScheduledDefrag', 'TaskPath': '\\Microsoft\\Windows\\Defrag\\', 'State': 3, 'Author': 'Microsoft Corporation', 'Description': None},
+    {'TaskName': 'Scheduled', 'TaskPath': '\\Microsoft\\Windows\\Diagnosis\\', 'State': 3, 'Author': '$(@%SystemRoot%\\system32\\sdiagschd.dll,-101)', 'Description': None},
+    {'TaskName': 'Cleanup', 'TaskPath': '\\', 'State': 1, 'Author': 'NT AUTHORITY\\SYSTEM', 'Description': None},
+    {'TaskName': '集計', 'TaskPath': '\\', 'State': 1, 'Author': 'PC-01\\hanako', 'Description': None},
+])
+
+class ScriptedTaskManager(TaskManager):
+    """実行されたスクリプトを記録し、用意した (成功したかどうか, 出力) を順に返すTaskManager"""
+    def __init__(self, config_manager, db_manager, outputs):
+        super().__init__(config_manager, db_manager, 'user', 'pass')
+        self.outputs = list(outputs)
+        self.commands = []
+
+    def _execute_ps_command(self, pc_ip, command, force=False):
+        self.commands.append(command)
+        return self.outputs.pop(0)
+
+def make_task(name, state=3, last_result=0):
+    """タスク一覧スクリプトが返すタスク1件の辞書を作成する"""
+    return {
+        'TaskName': name,
+        'TaskPath': '\\',
+        'State': state,
+        'NextRunTime': '2024-03-10 09:00:00',
+        'LastRunTime': '2024-03-09 09:00:00',
+        'LastTaskResult': last_result,
+        'Triggers': [{'Type': 'Daily', 'Enabled': True, 'StartBoundary': '2024-03-09T09:00:00', 'DaysInterval': 1}],
+    }
+
+def run_with_outputs(outputs, test):
+    """一時ディレクトリの設定とDBでScriptedTaskManagerを作成し、testを実行する"""
+    TaskManager.clear_task_snapshot()
+    with tempfile.TemporaryDirectory() as directory:
+        config_manager = ConfigManager(os.path.join(directory, 'config.json'))
+        db_manager = DBManager(os.path.join(directory, 'logs.db'))
+        try:
+            test(ScriptedTaskManager(config_manager, db_manager, outputs))
+        finally:
+            TaskManager.clear_task_snapshot()
+            db_manager.close()
+
+def task_names(tasks):
+    return sorted(task['TaskName'] for task in tasks)
+
+def test_parse_task_json():
+    """タスク一覧スクリプトのJSON出力の解析を確認する"""
+    def test(task_manager):
+        # 1件の場合は配列が展開されて返るため、リストに揃える
+        tasks = task_manager._parse_task_json(json.dumps(make_task('A')), PC_IP)
+        assert task_names(tasks) == ['A']
+        assert tasks[0]['NextRunTime'] == datetime(2024, 3, 10, 9, 0)
+        assert tasks[0]['LastRunTime'] == datetime(2024, 3, 9, 9, 0)
+        assert isinstance(tasks[0]['TriggerSummary'], TriggerSummary)
+
+        task = dict(make_task('B'), NextRunTime=None, LastRunTime='not a date')
+        tasks = task_manager._parse_task_json(json.dumps([task, make_task('C')]), PC_IP)
+        assert task_names(tasks) == ['B', 'C']
+        assert tasks[0]['NextRunTime'] is None and tasks[0]['LastRunTime'] is None
+
+        # 0件は空のリスト、解析できない出力はNone
+        assert task_manager._parse_task_json('  \r\n', PC_IP) == []
+        assert task_manager._parse_task_json('Get-ScheduledTask : アクセスが拒否されました。', PC_IP) is None
+
+    run_with_outputs([], test)
+    print("✅ JSON出力の解析を確認しました")
+
+def test_parse_schtasks_output():
+    """schtasksの出力を表示言語によらず列の位置で解析し、手動作成タスクのみを返すことを確認する"""
+    def test(task_manager):
+        tasks = task_manager._process_tasks_from_schtasks(SCHTASKS_OUTPUT_JA, PC_IP)
+        by_name = {task['TaskName']: task for task in tasks}
+        assert sorted(by_name) == ['夜間バックアップ', '集計']
+
+        backup = by_name['夜間バックアップ']
+        assert backup['TaskPath'] == '\\Backup\\'
+        assert backup['State'] == 3
+        assert backup['NextRunTime'] == datetime(2024, 3, 10, 2, 0)
+        assert backup['LastRunTime'] == datetime(2024, 3, 9, 2, 0)
+        assert backup['LastTaskResult'] == 0
+        assert backup['Description'] == '夜間のバックアップ'
+        assert backup['Author'] == 'CONTOSO\\taro'
+        assert isinstance(backup['TriggerSummary'], TriggerSummary)
+
+        # 予定のないタスク・一度も実行されていないタスクの日時はNone
+        report = by_name['集計']
+        assert report['TaskPath'] == '\\'
+        assert report['State'] == 1
+        assert report['NextRunTime'] is None and report['LastRunTime'] is None
+        assert report['LastTaskResult'] == 0x00041303
+        assert report['Description'] is None
+
+        # 英語版の出力と、ヘッダー行を含む出力
+        tasks = task_manager._process_tasks_from_schtasks(SCHTASKS_OUTPUT_EN, PC_IP)
+        assert [task['TaskName'] for task in tasks] == ['Sync']
+        assert tasks[0]['State'] == 4
+        assert tasks[0]['NextRunTime'] == datetime(2024, 3, 10, 14, 30)
+        assert tasks[0]['LastTaskResult'] == 0x00041301
+
+        assert task_manager._process_tasks_from_schtasks('情報: 指定された条件に一致するタスクはありません。', PC_IP) == []
+
+    run_with_outputs([], test)
+    print("✅ schtasksの出力の解析を確認しました")
+
+def test_parse_wmi_output():
+    """WMIの出力から手動作成タスクのみを返すことを確認する"""
+    def test(task_manager):
+        tasks = task_manager._process_tasks_from_wmi(WMI_OUTPUT, PC_IP)
+        assert task_names(tasks) == ['夜間バックアップ', '集計']
+        assert task_manager._process_tasks_from_wmi('not json', PC_IP) == []
+
+    run_with_outputs([], test)
+    print("✅ WMIの出力の解析を確認しました")
+
+def test_fallbacks():
+    """一括取得に失敗した場合はschtasks、WMIの順に代替手段を試すことを確認する"""
+    def test(task_manager):
+        tasks = task_manager.get_tasks_from_pc(PC_IP)
+        assert task_names(tasks) == ['夜間バックアップ', '集計']
+        assert 'schtasks /query /fo csv /v /nh' in task_manager.commands[1]
+
+        tasks = task_manager.get_tasks_from_pc(PC_IP)
+        assert task_names(tasks) == ['夜間バックアップ', '集計']
+        assert 'MSFT_ScheduledTask' in task_manager.commands[4]
+
+    run_with_outputs([
+        (False, "The WinRM client cannot process the request"),
+        (True, SCHTASKS_OUTPUT_JA),
+        (True, "not json"),
+        (False, "ERROR: Access is denied."),
+        (True, WMI_OUTPUT),
+    ], test)
+    print("✅ 代替手段への切り替えを確認しました")
+
+if __name__ == "__main__":
+    print("タスク一覧の出力解析のテストを開始します...")
+    test_parse_task_json()
+    test_parse_schtasks_output()
+    test_parse_wmi_output()
+    test_fallbacks()
+    print("\n--- Test completed successfully! ---")
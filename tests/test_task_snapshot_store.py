@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TaskSnapshotStoreのテストスクリプト
+FleetScannerの代わりに、用意したタスク一覧を返すスキャナーを使い、
+stale-while-revalidate・取得失敗時の扱い・破棄と更新の競合を確認します。
+"""
+
+import os
+import sys
+import threading
+import time
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.task_snapshot_store import TaskSnapshotStore
+
+PCS = [{'name': 'PC-1', 'ip': '192.0.2.1'}]
+
+class FakeScanner:
+    """FleetScanner.scanと同じ形式で、PCごとに用意したタスク一覧またはエラーを返すスキャナー"""
+    def __init__(self, tasks, error=None):
+        self.tasks = tasks
+        self.error = error
+        self.scanned = []
+        # 設定した場合は、結果を返す前にこのイベントを待つ（バックグラウンド更新を途中で止める）
+        self.started = threading.Event()
+        self.release = None
+
+    def scan(self, pcs, credentials, fetch=None):
+        for pc in pcs:
+            self.scanned.append(pc['name'])
+            # 取得を始めた時点の結果を返す（取得中に変更された内容は含まない）
+            tasks, error = list(self.tasks), self.error
+            self.started.set()
+            if self.release is not None:
+                self.release.wait(5)
+            yield {'pc': pc, 'result': None if error else tasks, 'error': error, 'elapsed': 0.01}
+
+def load(store, scanner):
+    """1台分の読み込み結果を返す"""
+    results = list(store.load(PCS, {}, scanner))
+    assert len(results) == 1
+    return results[0]
+
+def wait_until(condition, timeout=5):
+    """条件が満たされるまで待つ"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "待機がタイムアウトしました"
+        time.sleep(0.01)
+
+def test_stale_while_revalidate():
+    """TTL内はキャッシュを返し、TTL後は古い値を返しつつ更新し、max_age後はその場で取得することを確認する"""
+    store = TaskSnapshotStore(ttl=60, max_age=300)
+    scanner = FakeScanner([{'TaskName': 'A'}])
+
+    result = load(store, scanner)
+    assert not result['cached'] and result['result'] == [{'TaskName': 'A'}]
+    assert load(store, scanner)['cached']
+    assert scanner.scanned == ['PC-1']
+
+    # TTLを過ぎると古い値をすぐに返し、バックグラウンドで更新する
+    scanner.tasks = [{'TaskName': 'B'}]
+    store._entries['PC-1']['fetched_at'] -= 120
+    result = load(store, scanner)
+    assert result['cached'] and result['result'] == [{'TaskName': 'A'}]
+    wait_until(lambda: store.get('PC-1')['tasks'] == [{'TaskName': 'B'}])
+
+    # max_ageを過ぎたものは古い値を返さずに取得し直す
+    scanner.tasks = [{'TaskName': 'C'}]
+    store._entries['PC-1']['fetched_at'] -= 600
+    result = load(store, scanner)
+    assert not result['cached'] and result['result'] == [{'TaskName': 'C'}]
+
+    # 返したタスクを変更しても保存しているスナップショットは変わらない
+    result['result'][0]['PC名'] = 'PC-1'
+    assert store.get('PC-1')['tasks'] == [{'TaskName': 'C'}]
+    print("✅ stale-while-revalidateを確認しました")
+
+def test_error_keeps_previous_tasks():
+    """取得に失敗した場合は、以前のタスク一覧を残してエラーだけを記録することを確認する"""
+    store = TaskSnapshotStore(ttl=60, max_age=300)
+    load(store, FakeScanner([{'TaskName': 'A'}]))
+
+    store._entries['PC-1']['fetched_at'] -= 600
+    result = load(store, FakeScanner([], error="タイムアウト (120秒)"))
+    assert result['error'] == "タイムアウト (120秒)"
+    assert result['result'] == [{'TaskName': 'A'}]
+
+    # 以前のタスク一覧がない場合は空のまま記録する
+    store.put('PC-2', None, error="接続できません")
+    assert store.get('PC-2')['tasks'] == []
+    print("✅ 取得失敗時に以前のタスク一覧を残すことを確認しました")
+
+def test_invalidate_drops_in_flight_refresh():
+    """破棄する前に始まっていたバックグラウンド更新の結果は保存されず、削除したタスクが戻らないことを確認する"""
+    store = TaskSnapshotStore(ttl=60, max_age=300)
+    scanner = FakeScanner([{'TaskName': 'A'}, {'TaskName': 'Deleted'}])
+    load(store, scanner)
+
+    # TTLを過ぎたのでバックグラウンド更新が始まるが、結果を返す前で止めておく
+    scanner.release = threading.Event()
+    store._entries['PC-1']['fetched_at'] -= 120
+    load(store, scanner)
+    assert scanner.started.wait(5)
+
+    # その間にタスクを削除してスナップショットを破棄し、新しい一覧を取得する
+    scanner.tasks = [{'TaskName': 'A'}]
+    store.invalidate('PC-1')
+    scanner.release.set()
+    result = load(store, FakeScanner([{'TaskName': 'A'}]))
+    assert result['result'] == [{'TaskName': 'A'}]
+
+    # 止めていた更新が完了しても、削除前の一覧で上書きされない
+    wait_until(lambda: 'PC-1' not in store._refreshing)
+    assert store.get('PC-1')['tasks'] == [{'TaskName': 'A'}]
+
+    # 全PC分の破棄でも同様に古い世代の結果は保存しない
+    generation = store.generation('PC-1')
+    store.invalidate()
+    assert not store.put('PC-1', [{'TaskName': 'Deleted'}], generation=generation)
+    assert store.get('PC-1') is None
+    print("✅ 破棄と更新の競合を確認しました")
+
+if __name__ == "__main__":
+    print("TaskSnapshotStoreのテストを開始します...")
+    test_stale_while_revalidate()
+    test_error_keeps_previous_tasks()
+    test_invalidate_drops_in_flight_refresh()
+    print("\n--- Test completed successfully! ---")
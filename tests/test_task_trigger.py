@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TaskTrigger / TriggerSummaryのテストスクリプト
+タスク一覧スクリプトが返す構造化トリガーと、以前の形式のトリガー文字列の両方を確認します。
+"""
+
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.task_trigger import TaskTrigger, TriggerSummary, parse_duration
+
+def test_structured_triggers():
+    """構造化トリガーから表示文字列・並べ替えキー・繰り返しの有無が求まることを確認する"""
+    summary = TriggerSummary.from_value([
+        {'Type': 'Daily', 'Enabled': True, 'StartBoundary': '2024-03-09T06:00:00', 'DaysInterval': 1, 'RepetitionInterval': 'PT1H30M'},
+        {'Type': 'Time', 'Enabled': True, 'StartBoundary': '2024-03-09T05:45:00+09:00'},
+        {'Type': 'Logon', 'Enabled': False},
+    ])
+    assert summary.text == '06:00 | 1日 | 1時間 | 30分 他1件', summary.text
+    assert summary.start_minutes == 5 * 60 + 45
+    assert summary.repeats
+    assert summary.enabled
+
+    # 単一のトリガーは辞書1件でも返ってくる（ConvertTo-Jsonは要素1件の配列を展開することがある）
+    single = TriggerSummary.from_value({'Type': 'Time', 'Enabled': 'False', 'StartBoundary': '2024-03-09T23:05:00'})
+    assert single.text == '23:05'
+    assert not single.enabled
+    assert not single.repeats
+
+    assert TriggerSummary.from_value([]).text == '未設定'
+    assert TriggerSummary.from_value(None).start_minutes is None
+    assert parse_duration('P1DT2H') == (1, 2, 0)
+    assert parse_duration('abc') is None
+    print("✅ 構造化トリガーの要約を確認しました")
+
+def test_legacy_trigger_text():
+    """以前の形式のトリガー文字列も従来と同じ表示になることを確認する"""
+    text = "Enabled: True\nStartBoundary: 2024-03-09T06:00:00\nDaysInterval: 1\nHoursInterval: 0\nMinutesInterval: 30"
+    assert TriggerSummary.from_value(text).text == '06:00 | 1日 | 30分'
+    assert TriggerSummary.from_value('StartBoundary: 2024-03-09').text == '2024-03-09'
+    assert TriggerSummary.from_value('null').text == '未設定'
+    assert TriggerSummary.from_value('Daily').text == '未設定'
+
+    trigger = TaskTrigger.from_text(text)
+    assert TaskTrigger.from_dict(trigger.to_dict()).format() == trigger.format()
+    print("✅ 以前の形式のトリガー文字列を確認しました")
+
+if __name__ == "__main__":
+    print("TaskTriggerのテストを開始します...")
+    test_structured_triggers()
+    test_legacy_trigger_text()
+    print("\n--- Test completed successfully! ---")
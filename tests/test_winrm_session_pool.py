@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WinRMSessionPoolのテストスクリプト
+WinRMに接続する代わりに、用意した結果を返すセッションを作成するプールを使い、
+セッションの再利用・上限を超えた場合の破棄・期限切れの破棄・切れたセッションの再接続と、
+コマンドを送信した後の失敗は再試行しないこと、完了を待つ期限を確認します。
+"""
+
+import base64
+import os
+import sys
+import time
+
+import requests
+from winrm.exceptions import WinRMOperationTimeoutError, WinRMTransportError
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.winrm_session_pool import PooledSession, WinRMSessionPool
+
+class FakeProtocol:
+    """winrm.Protocolの代わりに、シェルを開く段階・コマンドを送る段階で用意した例外を発生させ、送信したコマンドを記録するプロトコル"""
+    def __init__(self):
+        self.open_error = None
+        self.run_error = None
+        self.commands = []
+        # Trueの場合、コマンドが終わらず出力の受け取りが毎回タイムアウトする
+        self.hang = False
+        self.cleaned_up = 0
+
+    def open_shell(self):
+        if self.open_error is not None:
+            raise self.open_error
+        return 'shell'
+
+    def run_command(self, shell_id, command):
+        self.commands.append(command)
+        if self.run_error is not None:
+            raise self.run_error
+        return 'command'
+
+    def get_command_output_raw(self, shell_id, command_id):
+        if self.hang:
+            time.sleep(0.05)
+            raise WinRMOperationTimeoutError()
+        return b'ok', b'', 0, True
+
+    def cleanup_command(self, shell_id, command_id):
+        self.cleaned_up += 1
+
+    def close_shell(self, shell_id):
+        pass
+
+class FakeSession:
+    """winrm.Sessionの代わりに、FakeProtocolを保持するセッション"""
+    def __init__(self):
+        self.protocol = FakeProtocol()
+
+class FakePooledSession(PooledSession):
+    """閉じられたかどうかを記録するPooledSession"""
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSessionPool(WinRMSessionPool):
+    """WinRMに接続せずにセッションを作成し、作成したセッションを記録するプール"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = []
+
+    def _create_session(self, host, user, password):
+        pooled = FakePooledSession((host, user), password, FakeSession())
+        self.created.append(pooled)
+        return pooled
+
+def age(pooled, seconds):
+    """セッションの最終使用時刻を指定した秒数だけ過去にする"""
+    pooled.last_used_at -= seconds
+
+def test_reuse_and_lru():
+    """同じホスト・ユーザーのセッションを再利用し、上限を超えると最も長く使われていないホストから破棄することを確認する"""
+    pool = FakeSessionPool(max_size=2)
+    first = pool.acquire('pc-1', 'user', 'pass')
+    pool.release(first)
+    assert pool.acquire('pc-1', 'user', 'pass') is first
+
+    # パスワードが変わった場合は作り直す
+    pool.release(first)
+    renewed = pool.acquire('pc-1', 'user', 'new-pass')
+    assert renewed is not first and first.closed
+
+    # pc-1 → pc-2 の順に返却し、pc-1を使い直してから pc-3 を返却すると pc-2 が破棄される
+    second = pool.acquire('pc-2', 'user', 'pass')
+    third = pool.acquire('pc-3', 'user', 'pass')
+    pool.release(renewed)
+    pool.release(second)
+    pool.release(pool.acquire('pc-1', 'user', 'new-pass'))
+    pool.release(third)
+    assert second.closed and not renewed.closed and not third.closed
+    assert pool.stats() == {'hosts': 2, 'idle_sessions': 2}
+    print("✅ セッションの再利用と上限を超えた場合の破棄を確認しました")
+
+def test_max_uses_and_idle_expiry():
+    """使用回数の上限やアイドル時間の上限を超えたセッションは作り直すことを確認する"""
+    pool = FakeSessionPool(max_uses=2, idle_timeout=300)
+    assert pool.run_ps('pc-1', 'user', 'pass', 'Get-Date').std_out == b'ok'
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+    # スクリプトはUTF-16LEのbase64に変換して送る
+    encoded = pool.created[0].session.protocol.commands[0].split()[-1]
+    assert base64.b64decode(encoded).decode('utf_16_le') == 'Get-Date'
+    assert len(pool.created) == 1 and pool.created[0].closed
+    assert pool.stats()['idle_sessions'] == 0
+
+    # アイドル時間の上限を超えたセッションは借り出す際に破棄する
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+    age(pool.created[1], 301)
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+    assert len(pool.created) == 3 and pool.created[1].closed
+
+    # evict_idleはすべてのホストの期限切れのセッションを破棄する
+    pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+    age(pool.created[3], 301)
+    assert pool.evict_idle() == 1
+    assert pool.created[3].closed and not pool.created[2].closed
+    assert pool.stats() == {'hosts': 1, 'idle_sessions': 1}
+    print("✅ 使用回数とアイドル時間の上限を確認しました")
+
+def test_evict_on_acquire():
+    """借り出しの際に、一定間隔で他のホストの期限切れのセッションも破棄することを確認する"""
+    pool = FakeSessionPool(idle_timeout=300, evict_interval=60)
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+    age(pool.created[0], 301)
+
+    # 前回の破棄から間隔が経っていなければ、他のホストのセッションはそのまま
+    pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+    assert not pool.created[0].closed
+
+    pool._last_evicted_at -= 60
+    pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+    assert pool.created[0].closed
+    assert pool.stats() == {'hosts': 1, 'idle_sessions': 1}
+    print("✅ 借り出し時の期限切れセッションの破棄を確認しました")
+
+def test_retry_on_stale_session():
+    """再利用したセッションの接続がシェルを開く段階で切れていた場合は新しいセッションで1回だけ再試行することを確認する"""
+    pool = FakeSessionPool()
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+    stale = pool.created[0]
+    stale.session.protocol.open_error = requests.exceptions.ConnectionError("connection reset")
+
+    assert pool.run_ps('pc-1', 'user', 'pass', 'Get-Date').std_out == b'ok'
+    assert stale.closed and len(pool.created) == 2
+    assert len(stale.session.protocol.commands) == 1 and len(pool.created[1].session.protocol.commands) == 1
+
+    # 新しく作成したセッション（使用回数0）で失敗した場合は再試行しない
+    pool.created[1].session.protocol.open_error = requests.exceptions.ConnectionError("connection reset")
+    pool.created[1].use_count = 0
+    try:
+        pool.run_ps('pc-1', 'user', 'pass', 'Get-Date')
+        assert False, "ConnectionErrorが送出されていません"
+    except requests.exceptions.ConnectionError:
+        pass
+    assert len(pool.created) == 2
+
+    # タイムアウトはホスト側の問題のため、再利用したセッションでも再試行しない
+    pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+    pool.created[2].session.protocol.open_error = requests.exceptions.ConnectTimeout("connect timeout")
+    try:
+        pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+        assert False, "ConnectTimeoutが送出されていません"
+    except requests.exceptions.ConnectTimeout:
+        pass
+    assert len(pool.created) == 3 and pool.created[2].closed
+    print("✅ 切れたセッションの再接続を確認しました")
+
+def test_no_retry_after_command_sent():
+    """コマンドを送信した後の失敗や接続以外のエラーは、再利用したセッションでも再試行しないことを確認する"""
+    pool = FakeSessionPool()
+    pool.run_ps('pc-1', 'user', 'pass', 'Start-ScheduledTask -TaskName Backup')
+    reused = pool.created[0]
+    reused.session.protocol.run_error = requests.exceptions.ConnectionError("connection reset")
+    try:
+        pool.run_ps('pc-1', 'user', 'pass', 'Start-ScheduledTask -TaskName Backup')
+        assert False, "ConnectionErrorが送出されていません"
+    except requests.exceptions.ConnectionError:
+        pass
+    # タスクの実行が二重に送られていない
+    assert len(pool.created) == 1 and reused.closed
+    assert len(reused.session.protocol.commands) == 2
+
+    # シェルを開く段階でも、HTTP 500などの接続以外のエラーは再試行しない
+    pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+    pool.created[1].session.protocol.open_error = WinRMTransportError('http', 500, "Bad HTTP response")
+    try:
+        pool.run_ps('pc-2', 'user', 'pass', 'Get-Date')
+        assert False, "WinRMTransportErrorが送出されていません"
+    except WinRMTransportError:
+        pass
+    assert len(pool.created) == 2 and pool.created[1].closed
+    print("✅ コマンド送信後の失敗を再試行しないことを確認しました")
+
+def test_deadline():
+    """期限を過ぎても終わらないコマンドはホスト側で停止してTimeoutErrorを送出し、期限を過ぎた呼び出しは接続しないことを確認する"""
+    pool = FakeSessionPool()
+    pool.run_ps('pc-1', 'user', 'pass', 'Get-Date', deadline=time.monotonic() + 10)
+    hung = pool.created[0]
+    hung.session.protocol.hang = True
+
+    started = time.monotonic()
+    try:
+        pool.run_ps('pc-1', 'user', 'pass', 'Get-Date', deadline=started + 0.3)
+        assert False, "TimeoutErrorが送出されていません"
+    except TimeoutError:
+        pass
+    assert 0.3 <= time.monotonic() - started < 1.0
+    # 停止したコマンドの後始末をして、セッションは破棄する（再試行しない）
+    assert hung.session.protocol.cleaned_up == 2 and hung.closed
+    assert len(pool.created) == 1
+
+    try:
+        pool.run_ps('pc-1', 'user', 'pass', 'Get-Date', deadline=time.monotonic())
+        assert False, "TimeoutErrorが送出されていません"
+    except TimeoutError:
+        pass
+    assert len(pool.created) == 1
+    print("✅ 完了を待つ期限を確認しました")
+
+if __name__ == "__main__":
+    print("WinRMSessionPoolのテストを開始します...")
+    test_reuse_and_lru()
+    test_max_uses_and_idle_expiry()
+    test_evict_on_acquire()
+    test_retry_on_stale_session()
+    test_no_retry_after_command_sent()
+    test_deadline()
+    print("\n--- Test completed successfully! ---")
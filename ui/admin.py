@@ -5,6 +5,8 @@
 import streamlit as st
 import pandas as pd
 
+from core.error_manager import invalidate_error_manager
+
 def render_admin_settings():
     st.header("管理者設定")
     password = st.text_input("管理者パスワードを入力してください", type="password")
@@ -72,20 +74,12 @@ def render_admin_settings():
                     error_manager.add_error_code(new_error_code, new_error_message)
                     if is_timeout_error:
                         # タイムアウトエラーコードに追加
-                        if new_error_code.startswith('0x'):
-                            try:
-                                decimal_code = int(new_error_code, 16)
-                                error_manager.timeout_error_codes.append(decimal_code)
-                            except ValueError:
-                                st.error("無効な16進数コードです")
-                        else:
-                            try:
-                                decimal_code = int(new_error_code)
-                                error_manager.timeout_error_codes.append(decimal_code)
-                            except ValueError:
-                                st.error("無効なエラーコードです")
+                        if not error_manager.add_timeout_error_code(new_error_code):
+                            st.error("無効なエラーコードです")
                     
                     error_manager.save_error_codes()
+                    # 共有のErrorManagerを保存後のファイルの内容に合わせる
+                    invalidate_error_manager(error_manager.error_codes_path)
                     st.success("エラーコードを追加しました")
                     st.rerun()
                 else:
@@ -93,5 +87,5 @@ def render_admin_settings():
         
         # 設定の再読み込み
         if st.button("設定を再読み込み"):
-            error_manager.reload_error_codes()
+            invalidate_error_manager(error_manager.error_codes_path)
             st.success("エラーコード設定を再読み込みしました") 
\ No newline at end of file
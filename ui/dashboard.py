@@ -5,6 +5,7 @@
 import streamlit as st
 import pandas as pd
 import datetime
+import hashlib
 import os
 import json
 import logging
@@ -21,33 +22,35 @@ def render_dashboard():
         st.warning("管理対象PCが設定されていません。「管理者設定」画面からPCを追加・設定してください。")
         return
     
-    # タブの作成（ALL + 各PC）
-    tab_names = ["ALL"] + [pc['name'] for pc in all_pcs]
-    tabs = st.tabs(tab_names)
+    # 表示するPCの選択（ALL + 各PC）
+    # st.tabsはすべてのタブの中身を毎回実行するため、選択されたビューだけを描画する
+    view_names = ["ALL"] + [pc['name'] for pc in all_pcs]
+    if st.session_state.get('dashboard_view') not in view_names:
+        st.session_state['dashboard_view'] = "ALL"
+    view_name = st.radio("表示するPC", view_names, horizontal=True, key='dashboard_view', label_visibility="collapsed")
     
-    # 各タブの内容を処理
-    for tab_idx, (tab, pc_name) in enumerate(zip(tabs, tab_names)):
-        with tab:
-            if pc_name == "ALL":
-                # ALLタブ：全PCのタスクを表示
-                render_pc_tasks(all_pcs, f"全PC ({len(all_pcs)}台)")
-            else:
-                # 個別PCタブ：該当PCのタスクのみを表示
-                selected_pc = next((pc for pc in all_pcs if pc['name'] == pc_name), None)
-                if selected_pc:
-                    render_pc_tasks([selected_pc], f"{pc_name}")
+    # タスク一覧はどのビューでも全PC分のスナップショットを使い、個別PCのビューはそこから絞り込む
+    if view_name == "ALL":
+        render_pc_tasks(all_pcs, f"全PC ({len(all_pcs)}台)")
+    else:
+        render_pc_tasks(all_pcs, f"{view_name}", pc_name=view_name)
 
-def render_pc_tasks(pcs_to_scan, title):
-    """指定されたPCのタスクを表示する関数"""
+def render_pc_tasks(pcs_to_scan, title, pc_name=None):
+    """
+    指定されたPCのタスクを表示する関数
+    :param pcs_to_scan: スナップショットを読み込むPCのリスト。
+    :param title: 表示用のタイトル（ウィジェットのキーにも使う）。
+    :param pc_name: 指定した場合は、読み込んだタスクのうちこのPCのものだけを表示する。
+    """
     st.subheader(f"タスク一覧 ({title}")
     
-    # PC情報の読み込みインジケータ（アコーディオンの外に配置）
-    pc_progress_bar = st.progress(0, text="PC情報を取得中...")
-    
-    # PC情報をアコーディオン形式で表示（タスク一覧ヘッダーの直下）
-    with st.expander("📊 PC情報", expanded=False):
+    # PC情報は重いため、表示を選んだときだけ取得する（タスク一覧ヘッダーの直下）
+    if st.toggle("📊 PC情報を表示", key=f"show_pc_info_{title}"):
         from ui.pc_info import render_pc_info_with_progress
-        render_pc_info_with_progress(pc_progress_bar)
+        pc_progress_bar = st.progress(0, text="PC情報を取得中...")
+        target_pcs = [pc for pc in pcs_to_scan if pc_name is None or pc['name'] == pc_name]
+        with st.container(border=True):
+            render_pc_info_with_progress(pc_progress_bar, target_pcs)
     
     # 新規作成ボタン
     if st.button("＋ 新規タスクを作成", type="primary", use_container_width=True, key=f"create_{title}"):
@@ -60,51 +63,69 @@ def render_pc_tasks(pcs_to_scan, title):
     
     # 認証情報の読み込み
     from utils.auth import load_credentials, get_pc_credentials
+    credentials = load_credentials()
     
     logging.info(f"=== タスク取得処理開始: {title} ===")
     logging.info(f"対象PC数: {len(pcs_to_scan)}")
     
-    for i, pc in enumerate(pcs_to_scan):
+    # スナップショットから読み込み、未取得のPCだけを並列で問い合わせる
+    from core.fleet_scanner import FleetScanner
+    from core.task_manager import TaskManager
+    from core.task_snapshot_store import get_task_snapshot_store
+    scanner = FleetScanner(st.session_state.config_manager, st.session_state.db_manager)
+    snapshot_store = get_task_snapshot_store(st.session_state.config_manager)
+    
+    col_info, col_refresh = st.columns([6, 1])
+    with col_refresh:
+        if st.button("🔄 最新に更新", key=f"refresh_{title}", use_container_width=True):
+            # 接続できなかったPCも、電源が入った可能性があるため接続を試み直す
+            from core.reachability import get_reachability_checker
+            reachability = get_reachability_checker(st.session_state.config_manager)
+            for pc in pcs_to_scan:
+                if pc_name is None or pc['name'] == pc_name:
+                    snapshot_store.invalidate(pc['name'])
+                    reachability.reset(pc['ip'])
+    
+    oldest_fetched_at = None
+    for i, scan_result in enumerate(snapshot_store.load(pcs_to_scan, credentials, scanner)):
+        pc = scan_result['pc']
         progress_bar.progress((i + 1) / len(pcs_to_scan), text=f"{pc['name']}...")
-        logging.info(f"=== PC処理開始: {pc['name']} ({pc['ip']}) ===")
+        if oldest_fetched_at is None or scan_result['fetched_at'] < oldest_fetched_at:
+            oldest_fetched_at = scan_result['fetched_at']
         
-        # PCごとの認証情報を取得
-        credentials = load_credentials()
-        username, password = get_pc_credentials(credentials, pc['name'])
-        if not username or not password:
-            logging.warning(f"{pc['name']}の認証情報が見つかりません。スキップします。")
-            st.warning(f"{pc['name']}の認証情報が見つかりません。スキップします。")
+        if pc_name is not None and pc['name'] != pc_name:
             continue
         
-        # PCごとにTaskManagerを初期化
-        from core.task_manager import TaskManager
-        pc_task_manager = TaskManager(
-            st.session_state.config_manager, 
-            st.session_state.db_manager, 
-            username, 
-            password
-        )
+        if scan_result['error']:
+            st.warning(f"{pc['name']}: {scan_result['error']}")
+            if not scan_result['result']:
+                continue
         
-        # 手動作成タスクのみを取得（修正済み）
-        logging.info(f"=== {pc['name']}からタスク取得開始 ===")
-        tasks = pc_task_manager.get_tasks_from_pc(pc['ip'])
-        logging.info(f"=== {pc['name']}から取得されたタスク数: {len(tasks)} ===")
+        tasks = scan_result['result'] or []
+        source = "キャッシュ" if scan_result['cached'] else f"{scan_result['elapsed']:.1f}秒"
+        logging.info(f"=== {pc['name']}のタスク数: {len(tasks)} ({source}) ===")
         
         for task in tasks:
             task['PC名'] = pc['name']
             task['PC_IP'] = pc['ip']
             all_tasks.append(task)
-        
-        logging.info(f"=== PC処理完了: {pc['name']}, 累計タスク数: {len(all_tasks)} ===")
     
     progress_bar.empty()
     logging.info(f"=== タスク取得処理完了: {title}, 総タスク数: {len(all_tasks)} ===")
+    if oldest_fetched_at is not None:
+        with col_info:
+            fetched_at_text = datetime.datetime.fromtimestamp(oldest_fetched_at).strftime('%H:%M:%S')
+            st.caption(f"取得時刻: {fetched_at_text} 時点の情報を表示しています")
 
     if not all_tasks:
         st.info("対象のタスクは見つかりませんでした。")
         return
 
     df = pd.DataFrame(all_tasks)
+
+    # 状態・実行結果・日時・トリガーの表示用の列を列単位でまとめて作成する
+    from utils.task_helpers import add_task_display_columns
+    df = add_task_display_columns(df, st.session_state.get('error_manager'))
     
     # デバッグ情報を表示（開発時のみ）
     if st.checkbox("デバッグ情報を表示", key=f"debug_{title}"):
@@ -144,13 +165,15 @@ def render_pc_tasks(pcs_to_scan, title):
     st.subheader("タスク詳細一覧")
     
     # 並び替え機能をヘッダーの上に配置
-    col1, col2, col3 = st.columns([2, 1, 0.3])
+    col1, col_schedule, col2, col3 = st.columns([1.2, 0.8, 1, 0.3])
     with col1:
-        st.write("")  # 空のスペース
+        view_mode = st.radio("表示形式", ["テーブル", "ボタン付き一覧"], horizontal=True, key=f"view_mode_{title}", label_visibility="collapsed")
+    with col_schedule:
+        schedule_filter = st.selectbox("スケジュール", ["すべてのスケジュール", "繰り返しあり", "繰り返しなし"], key=f"schedule_{title}", label_visibility="collapsed")
     with col2:
         if f'sort_order_{title}' not in st.session_state:
             st.session_state[f'sort_order_{title}'] = "次回実行日時順"
-        sort_order = st.selectbox("並べ替え", ["次回実行日時順", "作成日時順", "タスク名順"], key=f"sort_{title}", label_visibility="collapsed")
+        sort_order = st.selectbox("並べ替え", ["次回実行日時順", "作成日時順", "開始時刻順", "タスク名順"], key=f"sort_{title}", label_visibility="collapsed")
         st.session_state[f'sort_order_{title}'] = sort_order
     with col3:
         if f'sort_direction_{title}' not in st.session_state:
@@ -158,6 +181,15 @@ def render_pc_tasks(pcs_to_scan, title):
         sort_direction = st.selectbox("順序", ["昇順", "降順"], key=f"direction_{title}", label_visibility="collapsed")
         st.session_state[f'sort_direction_{title}'] = sort_direction
     
+    # スケジュールによる絞り込み（取得時に作成したトリガーの要約を使う）
+    if schedule_filter == "繰り返しあり":
+        df = df[df['繰り返し']]
+    elif schedule_filter == "繰り返しなし":
+        df = df[~df['繰り返し']]
+    if df.empty:
+        st.info("フィルタ条件に一致するタスクは見つかりませんでした。")
+        return
+    
     # 並び替え処理
     ascending = st.session_state[f'sort_direction_{title}'] == "昇順"
     
@@ -165,106 +197,18 @@ def render_pc_tasks(pcs_to_scan, title):
         df = df.sort_values('NextRunTime', ascending=ascending, na_position='last')
     elif st.session_state[f'sort_order_{title}'] == "作成日時順":
         df = df.sort_values('LastRunTime', ascending=ascending, na_position='last')
+    elif st.session_state[f'sort_order_{title}'] == "開始時刻順":
+        df = df.sort_values('開始時刻順', ascending=ascending, na_position='last')
     elif st.session_state[f'sort_order_{title}'] == "タスク名順":
         df = df.sort_values('TaskName', ascending=ascending)
     
-    # ページネーション（シンプル・右寄せ）
-    items_per_page = 100  # 1ページあたりの表示件数
-    if f'current_page_{title}' not in st.session_state:
-        st.session_state[f'current_page_{title}'] = 0
-    total_pages = (len(df) - 1) // items_per_page + 1
-    start_idx = st.session_state[f'current_page_{title}'] * items_per_page
-    end_idx = min(start_idx + items_per_page, len(df))
-
-    # 右寄せレイアウト
-    col_space, col_pager = st.columns([6, 1])
-    with col_pager:
-        pager_col1, pager_col2, pager_col3 = st.columns([1, 2, 1])
-        with pager_col1:
-            if st.button("＜", disabled=st.session_state[f'current_page_{title}'] == 0, key=f"prev_{title}"):
-                st.session_state[f'current_page_{title}'] = max(0, st.session_state[f'current_page_{title}'] - 1)
-                st.rerun()
-        with pager_col2:
-            st.markdown(f"<div style='text-align:center; padding-top: 6px; font-weight:bold;'>{st.session_state[f'current_page_{title}'] + 1} / {total_pages}</div>", unsafe_allow_html=True)
-        with pager_col3:
-            if st.button("＞", disabled=st.session_state[f'current_page_{title}'] >= total_pages - 1, key=f"next_{title}"):
-                st.session_state[f'current_page_{title}'] = min(total_pages - 1, st.session_state[f'current_page_{title}'] + 1)
-                st.rerun()
-
-    # 現在のページのタスクを表示
-    current_page_df = df.iloc[start_idx:end_idx]
-    
-    # テーブルヘッダー
-    col1, col2, col3, col4, col5, col6, col7, col8 = st.columns((1, 1, 2, 1, 1, 1, 0.5, 0.5))
-    col1.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>ステータス</strong></div>", unsafe_allow_html=True)
-    col2.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>タスク名</strong></div>", unsafe_allow_html=True)
-    col3.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>実行結果</strong></div>", unsafe_allow_html=True)
-    col4.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>次回実行</strong></div>", unsafe_allow_html=True)
-    col5.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>最終実行</strong></div>", unsafe_allow_html=True)
-    col6.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>⏱ 開始時刻</strong></div>", unsafe_allow_html=True)
-    col7.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>実行</strong></div>", unsafe_allow_html=True)
-    col8.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>詳細</strong></div>", unsafe_allow_html=True)
-    
-    # 並び替え処理
-    if st.session_state[f'sort_order_{title}'] == "次回実行日時順":
-        df = df.sort_values('NextRunTime', na_position='last')
-    elif st.session_state[f'sort_order_{title}'] == "作成日時順":
-        df = df.sort_values('LastRunTime', na_position='last')
-    elif st.session_state[f'sort_order_{title}'] == "タスク名順":
-        df = df.sort_values('TaskName')
-    
-    # ヘッダーとボディの間にマージンを追加
-    st.markdown("<div style='margin: 20px 0;'></div>", unsafe_allow_html=True)
-    
-    # テーブルボディ（各行）
-    for idx, task in current_page_df.iterrows():
-        # 状態に応じたクラスとアイコン
-        from utils.task_helpers import get_task_state_info, get_task_result_info, format_datetime, format_trigger_info
-        
-        state_info = get_task_state_info(task['State'])
-        
-        # 実行結果の判定と表示
-        result_info = get_task_result_info(task)
-        
-        # 日時フォーマット
-        next_run = format_datetime(task.get('NextRunTime'))
-        last_run = format_datetime(task.get('LastRunTime'))
-        
-        # 各行の列を作成
-        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns((1, 1, 2, 1, 1, 1, 0.5, 0.5))
-        
-        # ステータス表示（一番左）
-        current_state = task['State']
-        is_enabled = current_state in [3, 4]  # Ready(3) または Running(4)
-        
-        with col1:
-            # ステータス表示（中央寄せ、縦も中央寄せ）
-            if is_enabled:
-                st.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px; color: #28a745; font-weight: bold;'>{state_info['icon']} {state_info['status']}</div>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px; color: #dc3545; font-weight: bold;'>{state_info['icon']} {state_info['status']}</div>", unsafe_allow_html=True)
-        
-        # データを表示（中央寄せ、縦も中央寄せ）
-        col2.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'><strong>{task['TaskName']}</strong></div>", unsafe_allow_html=True)
-        col3.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{result_info['icon']} {result_info['status']}</div>", unsafe_allow_html=True)
-        col4.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{next_run}</div>", unsafe_allow_html=True)
-        col5.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{last_run}</div>", unsafe_allow_html=True)
-        
-        # 開始時刻の表示（中央寄せ、縦も中央寄せ）
-        trigger_info = format_trigger_info(task.get('Trigger', ''))
-        col6.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{trigger_info}</div>", unsafe_allow_html=True)
-        
-        # 手動実行ボタン（詳細の左）
-        with col7:
-            if st.button(f"▶️ ", key=f"run_{title}_{idx}", help="タスクを手動実行", use_container_width=True):
-                # 手動実行機能（将来実装）
-                st.info("🚧 タスク実行機能は今後実装予定です。")
-        
-        # 詳細ボタン
-        with col8:
-            if st.button(f"📋", key=f"detail_{title}_{idx}", help="詳細を表示", use_container_width=True):
-                from ui.dialogs import task_detail_dialog
-                task_detail_dialog(task.to_dict(), task['PC名'], task['PC_IP'])
+    # 表示形式に応じてタスクを表示し、一括操作・削除の対象となるタスクを受け取る
+    # （テーブルでは選択した行、ボタン付き一覧では表示中のページ）
+    if view_mode == "テーブル":
+        current_page_df = render_task_table(df, title, snapshot_store)
+    else:
+        current_page_df = render_task_rows(df, title, snapshot_store)
+    pc_ips = {pc['name']: pc['ip'] for pc in pcs_to_scan}
     
     # 一括操作セクション
     st.write("---")
@@ -280,9 +224,11 @@ def render_pc_tasks(pcs_to_scan, title):
             key=f"bulk_action_{title}"
         )
         
-        if bulk_action != "操作なし":
-            # 現在のページのタスクから選択可能なタスクを取得
-            available_tasks = [(task[1]['TaskName'], task[1]['PC名']) for task in current_page_df.iterrows()]
+        if bulk_action != "操作なし" and current_page_df.empty:
+            st.caption("テーブルで行を選択すると、そのタスクを対象にできます。")
+        elif bulk_action != "操作なし":
+            # 選択中の行（ボタン付き一覧では現在のページ）のタスクから選択可能なタスクを取得
+            available_tasks = list(zip(current_page_df['TaskName'], current_page_df['PC名']))
             selected_tasks = st.multiselect(
                 "対象タスクを選択",
                 options=available_tasks,
@@ -304,8 +250,7 @@ def render_pc_tasks(pcs_to_scan, title):
                             continue
                         
                         # PCのIPアドレスを取得
-                        pc_ip = next((task[1]['PC_IP'] for task in current_page_df.iterrows() 
-                                    if task[1]['PC名'] == pc_name and task[1]['TaskName'] == task_name), None)
+                        pc_ip = pc_ips.get(pc_name)
                         if not pc_ip:
                             st.error(f"❌ {pc_name}のIPアドレスが見つかりません。")
                             continue
@@ -335,6 +280,8 @@ def render_pc_tasks(pcs_to_scan, title):
                         st.error(f"❌ {error_count}件のタスクでエラーが発生しました")
                     
                     if success_count > 0:
+                        for _, pc_name in selected_tasks:
+                            snapshot_store.invalidate(pc_name)
                         st.rerun()
                 else:
                     st.warning("⚠️ 対象タスクを選択してください")
@@ -355,13 +302,16 @@ def render_pc_tasks(pcs_to_scan, title):
                 st.session_state["confirm_delete_task"] = True
                 st.rerun()
     
-    # 削除フォーム
+    # 削除フォーム（対象は一括操作と同じく、選択中の行または現在のページのタスク）
+    if current_page_df.empty:
+        st.caption("削除するタスクをテーブルで選択してください。")
+        return
     with st.form(f"delete_form_{title}"):
         col1, col2, col3 = st.columns(3)
         with col1:
-            pc_name = st.selectbox("PC名", options=[task[1]['PC名'] for task in current_page_df.iterrows()], key=f"delete_pc_{title}")
+            pc_name = st.selectbox("PC名", options=current_page_df['PC名'].unique().tolist(), key=f"delete_pc_{title}")
         with col2:
-            task_name = st.selectbox("タスク名", options=[task[1]['TaskName'] for task in current_page_df.iterrows() if task[1]['PC名'] == pc_name], key=f"delete_task_{title}")
+            task_name = st.selectbox("タスク名", options=current_page_df.loc[current_page_df['PC名'] == pc_name, 'TaskName'].tolist(), key=f"delete_task_{title}")
         with col3:
             if st.form_submit_button("🗑️ 削除", use_container_width=True, type="secondary"):
                 # 削除確認
@@ -380,17 +330,176 @@ def render_pc_tasks(pcs_to_scan, title):
                             password
                         )
                         # PCのIPアドレスを取得
-                        pc_ip = next((task[1]['PC_IP'] for task in current_page_df.iterrows() if task[1]['PC名'] == pc_name and task[1]['TaskName'] == task_name), None)
+                        pc_ip = pc_ips.get(pc_name)
                         if pc_ip:
                             success, msg = pc_task_manager.delete_task(pc_ip, task_name, user_identifier=os.getlogin())
                         else:
                             st.error(f"❌ {pc_name}のIPアドレスが見つかりません。")
                             return
                         if success:
+                            snapshot_store.invalidate(pc_name)
                             st.success(f"✅ タスク '{task_name}' を削除しました。")
                             st.session_state["confirm_delete_task"] = False
                             st.rerun()
                         else:
                             st.error(f"❌ タスク削除に失敗しました: {msg}")
                 else:
-                    st.warning("⚠️ 削除確認を有効にしてから削除してください。") 
\ No newline at end of file
+                    st.warning("⚠️ 削除確認を有効にしてから削除してください。")
+
+
+def render_task_rows(df, title, snapshot_store):
+    """
+    タスクを1行ずつ列とボタンで表示する（ページごとに100件）。手動実行はテーブル表示と同じ処理で行う。
+    :return: 現在のページに表示したタスクのDataFrame。
+    """
+    # ページネーション（シンプル・右寄せ）
+    items_per_page = 100  # 1ページあたりの表示件数
+    if f'current_page_{title}' not in st.session_state:
+        st.session_state[f'current_page_{title}'] = 0
+    total_pages = (len(df) - 1) // items_per_page + 1
+    # 絞り込みで件数が減った場合は最終ページに合わせる
+    st.session_state[f'current_page_{title}'] = min(st.session_state[f'current_page_{title}'], total_pages - 1)
+    start_idx = st.session_state[f'current_page_{title}'] * items_per_page
+    end_idx = min(start_idx + items_per_page, len(df))
+
+    # 右寄せレイアウト
+    col_space, col_pager = st.columns([6, 1])
+    with col_pager:
+        pager_col1, pager_col2, pager_col3 = st.columns([1, 2, 1])
+        with pager_col1:
+            if st.button("＜", disabled=st.session_state[f'current_page_{title}'] == 0, key=f"prev_{title}"):
+                st.session_state[f'current_page_{title}'] = max(0, st.session_state[f'current_page_{title}'] - 1)
+                st.rerun()
+        with pager_col2:
+            st.markdown(f"<div style='text-align:center; padding-top: 6px; font-weight:bold;'>{st.session_state[f'current_page_{title}'] + 1} / {total_pages}</div>", unsafe_allow_html=True)
+        with pager_col3:
+            if st.button("＞", disabled=st.session_state[f'current_page_{title}'] >= total_pages - 1, key=f"next_{title}"):
+                st.session_state[f'current_page_{title}'] = min(total_pages - 1, st.session_state[f'current_page_{title}'] + 1)
+                st.rerun()
+
+    # 現在のページのタスクを表示
+    current_page_df = df.iloc[start_idx:end_idx]
+    
+    # テーブルヘッダー
+    col1, col2, col3, col4, col5, col6, col7, col8 = st.columns((1, 1, 2, 1, 1, 1, 0.5, 0.5))
+    col1.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>ステータス</strong></div>", unsafe_allow_html=True)
+    col2.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>タスク名</strong></div>", unsafe_allow_html=True)
+    col3.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>実行結果</strong></div>", unsafe_allow_html=True)
+    col4.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>次回実行</strong></div>", unsafe_allow_html=True)
+    col5.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>最終実行</strong></div>", unsafe_allow_html=True)
+    col6.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>⏱ 開始時刻</strong></div>", unsafe_allow_html=True)
+    col7.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>実行</strong></div>", unsafe_allow_html=True)
+    col8.markdown("<div style='text-align: center; background: #3498db; color: white; padding: 12px 8px; border-radius: 4px; font-weight: bold;'><strong>詳細</strong></div>", unsafe_allow_html=True)
+    
+    # ヘッダーとボディの間にマージンを追加
+    st.markdown("<div style='margin: 20px 0;'></div>", unsafe_allow_html=True)
+    
+    # テーブルボディ（各行）
+    for idx, task in current_page_df.iterrows():
+        # 各行の列を作成
+        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns((1, 1, 2, 1, 1, 1, 0.5, 0.5))
+        
+        # ステータス表示（一番左）
+        is_enabled = task['有効']  # Ready(3) または Running(4)
+        
+        with col1:
+            # ステータス表示（中央寄せ、縦も中央寄せ）
+            if is_enabled:
+                st.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px; color: #28a745; font-weight: bold;'>{task['状態アイコン']} {task['状態']}</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px; color: #dc3545; font-weight: bold;'>{task['状態アイコン']} {task['状態']}</div>", unsafe_allow_html=True)
+        
+        # データを表示（中央寄せ、縦も中央寄せ）
+        col2.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'><strong>{task['TaskName']}</strong></div>", unsafe_allow_html=True)
+        col3.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{task['実行結果アイコン']} {task['実行結果']}</div>", unsafe_allow_html=True)
+        col4.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{task['次回実行']}</div>", unsafe_allow_html=True)
+        col5.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{task['最終実行']}</div>", unsafe_allow_html=True)
+        
+        # 開始時刻の表示（中央寄せ、縦も中央寄せ）
+        col6.markdown(f"<div style='text-align: center; display: flex; align-items: center; justify-content: center; min-height: 50px;'>{task['開始時刻']}</div>", unsafe_allow_html=True)
+        
+        # 手動実行ボタン（詳細の左）
+        with col7:
+            if st.button(f"▶️ ", key=f"run_{title}_{idx}", help="タスクを手動実行", use_container_width=True):
+                run_selected_task(task, snapshot_store)
+        
+        # 詳細ボタン
+        with col8:
+            if st.button(f"📋", key=f"detail_{title}_{idx}", help="詳細を表示", use_container_width=True):
+                from ui.dialogs import task_detail_dialog
+                task_detail_dialog(task.to_dict(), task['PC名'], task['PC_IP'])
+    
+    return current_page_df
+
+def render_task_table(df, title, snapshot_store):
+    """
+    タスクを1つのテーブル（st.dataframe）で表示し、選択した行に対して詳細表示・手動実行を行う。
+    行数に関係なく描画する要素は1つで、スクロールはブラウザ側で行われる。
+    :return: 選択した行のタスクのDataFrame（選択がない場合は空のDataFrame）。
+    """
+    # 行の選択は位置で保持されるため、並べ替え・絞り込み・再取得で行の並びが変わったら
+    # キーを変えて別のテーブルとして描画し、前の選択が別のタスクを指さないようにする
+    row_order = hashlib.sha1(pd.util.hash_pandas_object(df[['PC名', 'TaskName']], index=False).values.tobytes()).hexdigest()
+    table_key = f"task_table_{title}_{row_order[:12]}"
+    
+    table_df = pd.DataFrame({
+        'PC名': df['PC名'],
+        'ステータス': df['状態アイコン'] + ' ' + df['状態'],
+        'タスク名': df['TaskName'],
+        '実行結果': df['実行結果アイコン'] + ' ' + df['実行結果'],
+        '次回実行': df['次回実行'],
+        '最終実行': df['最終実行'],
+        '開始時刻': df['開始時刻'],
+    })
+    event = st.dataframe(
+        table_df,
+        hide_index=True,
+        use_container_width=True,
+        height=min(38 + 35 * len(table_df), 600),
+        column_config={
+            'タスク名': st.column_config.TextColumn('タスク名', width="medium"),
+            '実行結果': st.column_config.TextColumn('実行結果', width="large"),
+            '開始時刻': st.column_config.TextColumn('⏱ 開始時刻'),
+        },
+        on_select="rerun",
+        selection_mode="single-row",
+        key=table_key,
+    )
+    
+    # 選択した行のタスクに対する操作
+    selected_rows = [row for row in event.selection.rows if row < len(df)]
+    if not selected_rows:
+        st.caption("行を選択すると、詳細表示・手動実行・一括操作・削除ができます。")
+        return df.iloc[0:0]
+    
+    selected_df = df.iloc[selected_rows[:1]]
+    task = selected_df.iloc[0]
+    col_label, col_run, col_detail = st.columns([4, 1, 1])
+    with col_label:
+        st.markdown(f"**選択中:** {task['PC名']} - {task['TaskName']}")
+    with col_run:
+        if st.button("▶️ 手動実行", key=f"table_run_{title}", use_container_width=True):
+            run_selected_task(task, snapshot_store)
+    with col_detail:
+        if st.button("📋 詳細", key=f"table_detail_{title}", use_container_width=True):
+            from ui.dialogs import task_detail_dialog
+            task_detail_dialog(task.to_dict(), task['PC名'], task['PC_IP'])
+    return selected_df
+
+def run_selected_task(task, snapshot_store):
+    """選択したタスクを即時実行する（テーブル表示・ボタン付き一覧で共通）。"""
+    from core.task_manager import TaskManager
+    from utils.auth import load_credentials, get_pc_credentials
+    
+    username, password = get_pc_credentials(load_credentials(), task['PC名'])
+    if not username or not password:
+        st.error(f"❌ {task['PC名']}の認証情報が見つかりません。")
+        return
+    pc_task_manager = TaskManager(st.session_state.config_manager, st.session_state.db_manager, username, password)
+    success, msg = pc_task_manager.run_task_now(task['PC_IP'], task['TaskName'], user_identifier=os.getlogin())
+    if success:
+        # 状態が「実行中」に変わるため、次の表示で取得し直す
+        snapshot_store.invalidate(task['PC名'])
+        st.success(f"✅ タスク '{task['TaskName']}' を実行しました。")
+    else:
+        st.error(f"❌ タスクの実行に失敗しました: {msg}")
@@ -9,6 +9,8 @@ import os
 import json
 import logging
 
+from core.task_snapshot_store import get_task_snapshot_store
+
 @st.dialog("タスク詳細")
 def task_detail_dialog(task, pc_name, pc_ip):
     # ヘッダー部分
@@ -27,6 +29,7 @@ def task_detail_dialog(task, pc_name, pc_ip):
     
     # 状態情報の表示
     from utils.task_helpers import get_task_state_info, format_datetime, format_trigger_info
+    from core.task_trigger import TriggerSummary
     state_info = get_task_state_info(task['State'])
     col1, col2, col3 = st.columns(3)
     
@@ -87,12 +90,14 @@ def task_detail_dialog(task, pc_name, pc_ip):
                     result_text = f"エラー (コード: {task['LastTaskResult']}) - {error_message}"
                     result_color = "red"
                 st.write(f"**最終結果:** {result_text}")
-            if 'Trigger' in task and task['Trigger']:
-                trigger_formatted = format_trigger_info(task['Trigger'])
-                st.write(f"**トリガー:** {trigger_formatted}")
+            summary = task.get('TriggerSummary')
+            if summary is None or not hasattr(summary, 'triggers'):
+                summary = TriggerSummary.from_value(task.get('Triggers', task.get('Trigger')))
+            if summary.triggers:
+                st.write(f"**トリガー:** {format_trigger_info(summary)}")
                 # 詳細なトリガー情報を展開可能なセクションに表示
                 with st.expander("詳細トリガー情報"):
-                    st.code(task['Trigger'], language="text")
+                    st.json([trigger.to_dict() for trigger in summary.triggers])
     
     # アクションセクション
     st.write("---")
@@ -137,6 +142,7 @@ def task_detail_dialog(task, pc_name, pc_ip):
                 
                 success, msg = pc_task_manager.update_task(pc_ip, task['TaskName'], update_details, user_identifier=os.getlogin())
                 if success: 
+                    get_task_snapshot_store(st.session_state.config_manager).invalidate(pc_name)
                     st.success(f"✅ ステータスを{'無効' if is_currently_enabled else '有効'}に変更しました")
                     st.rerun()
                 else: 
@@ -178,6 +184,7 @@ def task_detail_dialog(task, pc_name, pc_ip):
                     
                     success, msg = pc_task_manager.update_task(pc_ip, task['TaskName'], update_details, user_identifier=os.getlogin())
                     if success: 
+                        get_task_snapshot_store(st.session_state.config_manager).invalidate(pc_name)
                         st.success(f"✅ 説明を更新しました")
                         st.rerun()
                     else: 
@@ -202,6 +209,7 @@ def task_detail_dialog(task, pc_name, pc_ip):
                         )
                         success, msg = pc_task_manager.delete_task(pc_ip, task['TaskName'], user_identifier=os.getlogin())
                         if success: 
+                            get_task_snapshot_store(st.session_state.config_manager).invalidate(pc_name)
                             st.success(f"✅ タスクを削除しました")
                             st.rerun()
                         else: 
@@ -387,6 +395,7 @@ def create_task_dialog():
                             
                         success, msg = pc_task_manager.create_task(pc_list[selected_pc_name], task_details, user_identifier=os.getlogin())
                         if success: 
+                            get_task_snapshot_store(st.session_state.config_manager).invalidate(selected_pc_name)
                             st.success(f"✅ {msg}")
                             st.rerun()
                         else: 
@@ -9,6 +9,11 @@ import os
 import json
 import logging
 
+# 1ページに表示するログの件数
+LOG_PAGE_SIZE = 50
+# 本文検索で表示する最大件数（関連度の高い順）
+LOG_TEXT_SEARCH_LIMIT = 100
+
 def render_logs():
     st.header("実行結果ログ")
     
@@ -27,7 +32,7 @@ def render_logs():
         
         with col2:
             # タスク名の入力
-            task_name = st.text_input("タスク名", placeholder="タスク名で絞り込み", key="log_task_filter")
+            task_name = st.text_input("タスク名", placeholder="タスク名の一部で絞り込み", key="log_task_filter")
         
         with col3:
             # 結果コードでの絞り込み
@@ -41,12 +46,29 @@ def render_logs():
             # エラーコードでの絞り込み
             error_code = st.text_input("エラーコード", placeholder="例: 0x00041306", key="log_error_filter")
         
+        # 結果メッセージとAI分析の本文検索
+        text_query = st.text_input(
+            "本文検索",
+            placeholder="例: access denied nas-server（結果メッセージ・AI分析から検索）",
+            key="log_text_filter",
+            help="空白で区切った語をすべて含むログを、関連度の高い順に表示します"
+        )
+        
         # 期間指定
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             start_date = st.date_input("期間 (開始)", value=None, key="log_start_date")
         with col2:
             end_date = st.date_input("期間 (終了)", value=None, key="log_end_date")
+        with col3:
+            # 保存期間を過ぎてアーカイブされたログは、月を選んで検索する
+            archive_months = [month for month, _ in get_log_retention().list_archives()]
+            search_target = st.selectbox(
+                "検索対象",
+                options=["現在のログ"] + archive_months,
+                format_func=lambda option: option if option == "現在のログ" else f"📦 アーカイブ {option}",
+                key="log_search_target"
+            )
         
         # 検索ボタン
         col1, col2, col3 = st.columns([1, 1, 2])
@@ -73,83 +95,102 @@ def render_logs():
                 if error_code:
                     search_params['error_code'] = error_code
                 
-                st.session_state.log_search_results = st.session_state.db_manager.search_execution_logs(**search_params)
-                st.session_state.log_search_params = search_params
-                st.rerun()
+                try:
+                    start_log_search(search_params, None if search_target == "現在のログ" else search_target, text_query.strip() or None)
+                    st.rerun()
+                except ValueError as e:
+                    st.error(f"検索条件が正しくありません: {e}")
         
         with col2:
             if st.button("🔄 リセット", use_container_width=True):
-                st.session_state.log_search_results = None
                 st.session_state.log_search_params = None
+                st.session_state.log_search_archive = None
+                st.session_state.log_text_query = None
+                st.session_state.log_search_summary = None
+                st.session_state.log_export_csv = None
                 st.rerun()
     
-    # 検索結果の表示
-    if 'log_search_results' in st.session_state and st.session_state.log_search_results:
-        logs = st.session_state.log_search_results
-        df = pd.DataFrame(logs)
+    # 検索結果の表示（表示中のページだけをDBから取得する）
+    summary = st.session_state.get('log_search_summary')
+    if st.session_state.get('log_text_query') and st.session_state.get('log_search_params') is not None:
+        render_log_text_results()
+    elif summary and summary['total'] > 0:
+        db_manager = get_log_db_manager()
+        search_params = st.session_state.log_search_params
         
         # 統計情報の表示
         st.subheader("📊 検索結果統計")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_count = len(df)
+            total_count = summary['total']
             st.metric("総ログ数", total_count)
         
         with col2:
-            success_count = len(df[df['result_code'] == 0]) if 'result_code' in df.columns else 0
+            success_count = summary['success']
             st.metric("成功", success_count, delta=f"{success_count - (total_count - success_count)}")
         
         with col3:
-            error_count = total_count - success_count
+            error_count = summary['error']
             st.metric("エラー", error_count, delta=f"-{error_count}" if error_count > 0 else None)
         
         with col4:
-            pc_count = df['pc_name'].nunique() if 'pc_name' in df.columns else 0
+            pc_count = summary['pc_count']
             st.metric("対象PC数", pc_count)
         
         st.write("---")
         
-        # エクスポート機能
+        # エクスポート機能（全件の読み込みはボタンが押されたときだけ行う）
         col1, col2 = st.columns([1, 3])
         with col1:
-            # CSVデータを生成
-            csv_data = df.to_csv(index=False, encoding='utf-8-sig')
-            st.download_button(
-                label="📥 CSVエクスポート",
-                data=csv_data,
-                file_name=f"execution_logs_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            if st.session_state.get('log_export_csv') is None:
+                if st.button("📥 CSVを作成", use_container_width=True):
+                    export_df = pd.DataFrame(db_manager.search_execution_logs(**search_params))
+                    st.session_state.log_export_csv = export_df.to_csv(index=False, encoding='utf-8-sig')
+                    st.rerun()
+            else:
+                st.download_button(
+                    label="📥 CSVエクスポート",
+                    data=st.session_state.log_export_csv,
+                    file_name=f"execution_logs_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
         
         with col2:
-            st.write(f"**検索条件:** {st.session_state.get('log_search_params', {})}")
+            archive_month = st.session_state.get('log_search_archive')
+            target = f"アーカイブ {archive_month}" if archive_month else "現在のログ"
+            st.write(f"**検索対象:** {target}　**検索条件:** {search_params}")
         
-        # ページネーション
-        items_per_page = 50
-        if 'log_current_page' not in st.session_state:
-            st.session_state.log_current_page = 0
+        # ページネーション（各ページの先頭カーソルを保持し、前のページへも戻れるようにする）
+        items_per_page = LOG_PAGE_SIZE
+        cursors = st.session_state.log_page_cursors
+        current_page = st.session_state.log_current_page
+        page_logs, next_cursor = db_manager.search_execution_logs_page(
+            page_size=items_per_page, cursor=cursors[current_page], **search_params
+        )
         
-        total_pages = (len(df) - 1) // items_per_page + 1
-        start_idx = st.session_state.log_current_page * items_per_page
-        end_idx = min(start_idx + items_per_page, len(df))
+        total_pages = (total_count - 1) // items_per_page + 1
+        start_idx = current_page * items_per_page
+        end_idx = start_idx + len(page_logs)
         
         # ページネーションコントロール
         col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
-            if st.button("← 前のページ", disabled=st.session_state.log_current_page == 0, key="log_prev_page"):
-                st.session_state.log_current_page = max(0, st.session_state.log_current_page - 1)
+            if st.button("← 前のページ", disabled=current_page == 0, key="log_prev_page"):
+                st.session_state.log_current_page = max(0, current_page - 1)
                 st.rerun()
         with col2:
-            st.write(f"ページ {st.session_state.log_current_page + 1} / {total_pages} ({start_idx + 1}-{end_idx} / {len(df)}件)")
+            st.write(f"ページ {current_page + 1} / {total_pages} ({start_idx + 1}-{end_idx} / {total_count}件)")
         with col3:
-            if st.button("次のページ →", disabled=st.session_state.log_current_page >= total_pages - 1, key="log_next_page"):
-                st.session_state.log_current_page = min(total_pages - 1, st.session_state.log_current_page + 1)
+            if st.button("次のページ →", disabled=next_cursor is None, key="log_next_page"):
+                del cursors[current_page + 1:]
+                cursors.append(next_cursor)
+                st.session_state.log_current_page = current_page + 1
                 st.rerun()
         
         # 現在のページのログを表示
-        current_page_df = df.iloc[start_idx:end_idx]
+        current_page_df = pd.DataFrame(page_logs)
         
         # ログテーブルの表示
         st.subheader("📋 実行ログ詳細")
@@ -254,11 +295,70 @@ def render_logs():
                         st.write("**🤖 AI分析結果:**")
                         st.info(ai_analysis)
     
-    elif 'log_search_results' in st.session_state:
+    elif summary is not None:
         st.info("検索条件に一致するログが見つかりませんでした。")
     else:
         st.info("検索条件を設定して「検索」ボタンを押してください。")
 
+def get_log_retention():
+    """アーカイブの一覧と読み込みに使うLogRetentionを返す"""
+    from core.log_retention import LogRetention
+    return LogRetention(st.session_state.config_manager, st.session_state.db_manager)
+
+def get_log_db_manager():
+    """検索対象（現在のログまたは選択した月のアーカイブ）のDBManagerを返す"""
+    archive_month = st.session_state.get('log_search_archive')
+    if not archive_month:
+        return st.session_state.db_manager
+    archive_db_managers = st.session_state.setdefault('log_archive_db_managers', {})
+    if archive_month not in archive_db_managers:
+        archive_db_managers[archive_month] = get_log_retention().open_archive(archive_month)
+    return archive_db_managers[archive_month]
+
+def start_log_search(search_params, archive_month=None, text_query=None):
+    """検索条件を保存し、件数の集計とページ位置を初期化する"""
+    st.session_state.log_search_params = search_params
+    st.session_state.log_search_archive = archive_month
+    st.session_state.log_text_query = text_query
+    st.session_state.log_search_summary = get_log_db_manager().summarize_execution_logs(**search_params)
+    # 各ページの先頭を示すカーソル（1ページ目はNone）
+    st.session_state.log_page_cursors = [None]
+    st.session_state.log_current_page = 0
+    st.session_state.log_export_csv = None
+
+def render_log_text_results():
+    """本文検索の結果を関連度の高い順に表示する"""
+    import html
+    
+    text_query = st.session_state.log_text_query
+    # 一致箇所を制御文字で囲んで受け取り、HTMLエスケープ後に<mark>へ置き換える
+    logs = get_log_db_manager().search_execution_logs_text(
+        text_query, limit=LOG_TEXT_SEARCH_LIMIT, highlight=('\x02', '\x03'), **st.session_state.log_search_params
+    )
+    if not logs:
+        st.info(f"「{text_query}」を含むログが見つかりませんでした。")
+        return
+    
+    from utils.task_helpers import format_datetime
+    st.subheader(f"🔎 本文検索の結果（「{text_query}」関連度順・{len(logs)}件）")
+    if len(logs) >= LOG_TEXT_SEARCH_LIMIT:
+        st.caption(f"関連度の高い{LOG_TEXT_SEARCH_LIMIT}件を表示しています。語を追加すると絞り込めます。")
+    
+    for log in logs:
+        snippet = html.escape(log.get('snippet') or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+        result = "✅ 成功" if log.get('result_code') == 0 else f"❌ エラー ({log.get('result_code')})"
+        col1, col2, col3 = st.columns((1.2, 3, 0.3))
+        col1.markdown(
+            f"<div style='padding: 4px;'>{format_datetime(log.get('recorded_at'))}<br>"
+            f"<strong>{html.escape(str(log.get('pc_name', 'Unknown')))}</strong> / {html.escape(str(log.get('task_name', 'Unknown')))}<br>{result}</div>",
+            unsafe_allow_html=True
+        )
+        col2.markdown(f"<div style='padding: 4px; white-space: pre-wrap;'>{snippet}</div>", unsafe_allow_html=True)
+        with col3:
+            if st.button("📋", key=f"log_text_detail_{log['log_id']}", help="詳細を表示", use_container_width=True):
+                show_log_detail_dialog(log)
+        st.divider()
+
 def get_log_error_info(result_code):
     """ログのエラーコードから詳細情報を取得する"""
     try:
@@ -37,7 +37,12 @@ def render_pc_info():
         st.write("---")
     
     # PC情報の取得
-    st.subheader("PC一覧")
+    col_title, col_refresh = st.columns([6, 1])
+    with col_title:
+        st.subheader("PC一覧")
+    with col_refresh:
+        # キャッシュの期限内でも稼働状況を取得し直す
+        force_refresh = st.button("🔄 最新に更新", key="refresh_pc_info", use_container_width=True)
     
     # 進捗バー（アコーディオンの外に配置）
     progress_bar = st.progress(0, text="PC情報を取得中...")
@@ -69,7 +74,7 @@ def render_pc_info():
             password
         )
         
-        pc_info = get_pc_info(pc_task_manager, pc['ip'], pc['name'])
+        pc_info = get_pc_info(pc_task_manager, pc['ip'], pc['name'], force=force_refresh)
         pc_info['group'] = pc.get('group', '未分類')
         pc_info_list.append(pc_info)
     
@@ -83,8 +88,8 @@ def render_pc_info():
             
             with col1:
                 st.metric("ステータス", pc_info['status'])
-                if pc_info['status'] == 'Online':
-                    st.metric("最終確認", pc_info.get('last_seen', 'Unknown'))
+                if pc_info.get('last_seen'):
+                    st.metric("最終確認", pc_info['last_seen'])
                 st.metric("タスク数", pc_info['tasks_count'])
                 if pc_info.get('group'):
                     st.metric("グループ", pc_info['group'])
@@ -127,9 +132,61 @@ def render_pc_info():
             # エラー情報の表示
             if pc_info['status'] == 'Error' and 'error' in pc_info:
                 st.error(f"エラー: {pc_info['error']}")
+    
+    # リソース使用率の推移（収集デーモンが記録した時系列データ）
+    st.write("---")
+    render_metric_history(pcs)
+
+def format_metric_label(metric):
+    """指標名（例: 'disk_used_pct:C:'）を表示名に変換する"""
+    from core.pc_info_cache import METRIC_LABELS
+    name, _, device = metric.partition(':')
+    label = METRIC_LABELS.get(name, name)
+    return f"{label} {device}" if device else label
+
+def render_metric_history(pcs):
+    """PCリソースの推移をグラフで表示する。期間に応じた粒度の集計済みデータのみを読み込む。"""
+    import plotly.express as px
+    
+    st.subheader("リソース使用率の推移")
+    db_manager = st.session_state.db_manager
+    metrics = db_manager.get_pc_metric_names()
+    if not metrics:
+        st.info("リソースの履歴はまだありません。収集デーモン（collector.py）を起動すると定期的に記録されます。")
+        return
+    
+    periods = {"6時間": datetime.timedelta(hours=6), "24時間": datetime.timedelta(days=1), "7日": datetime.timedelta(days=7), "30日": datetime.timedelta(days=30)}
+    col1, col2, col3 = st.columns([2, 1, 2])
+    with col1:
+        metric = st.selectbox("指標", metrics, format_func=format_metric_label, key="metric_history_metric")
+    with col2:
+        period = st.selectbox("期間", list(periods.keys()), index=1, key="metric_history_period")
+    with col3:
+        pc_names = st.multiselect("PC", [pc['name'] for pc in pcs], key="metric_history_pcs", placeholder="すべてのPC")
+    
+    end = datetime.datetime.now()
+    start = end - periods[period]
+    granularity = db_manager.choose_metric_granularity(start, end)
+    series = db_manager.get_pc_metric_series(metric, start, end, pc_names=pc_names or None, granularity=granularity)
+    if not series:
+        st.info("選択した期間のデータはありません。")
+        return
+    
+    df = pd.DataFrame(series)
+    bucket_formats = {'minute': '%Y-%m-%dT%H:%M', 'hour': '%Y-%m-%dT%H', 'day': '%Y-%m-%d'}
+    df['bucket'] = pd.to_datetime(df['bucket'], format=bucket_formats[granularity])
+    fig = px.line(
+        df, x='bucket', y='avg', color='pc_name', markers=granularity == 'day',
+        labels={'bucket': '日時', 'avg': format_metric_label(metric), 'pc_name': 'PC名'},
+        hover_data={'min': True, 'max': True},
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
-def render_pc_info_with_progress(progress_bar):
-    """外部から渡されたプログレスバーを使用してPC情報を表示する関数"""
+def render_pc_info_with_progress(progress_bar, pcs=None):
+    """
+    外部から渡されたプログレスバーを使用してPC情報を表示する関数
+    :param pcs: 表示するPCのリスト。省略した場合は設定ファイルの全PCを表示する。
+    """
     # 認証情報の読み込み
     from utils.auth import load_credentials, get_pc_credentials
     credentials = load_credentials()
@@ -139,7 +196,8 @@ def render_pc_info_with_progress(progress_bar):
     
     # 設定からPC一覧とPCグループを取得
     config_manager = st.session_state.config_manager
-    pcs = config_manager.get_config().get('pcs', [])
+    if pcs is None:
+        pcs = config_manager.get_config().get('pcs', [])
     pc_groups = config_manager.get_config().get('pc_groups', [])
     
     if not pcs:
@@ -155,7 +213,12 @@ def render_pc_info_with_progress(progress_bar):
         st.write("---")
     
     # PC情報の取得
-    st.subheader("PC一覧")
+    col_title, col_refresh = st.columns([6, 1])
+    with col_title:
+        st.subheader("PC一覧")
+    with col_refresh:
+        # キャッシュの期限内でも稼働状況を取得し直す
+        force_refresh = st.button("🔄 最新に更新", key=f"refresh_pc_info_{'_'.join(pc['name'] for pc in pcs)}", use_container_width=True)
     
     pc_info_list = []
     for i, pc in enumerate(pcs):
@@ -184,7 +247,7 @@ def render_pc_info_with_progress(progress_bar):
             password
         )
         
-        pc_info = get_pc_info(pc_task_manager, pc['ip'], pc['name'])
+        pc_info = get_pc_info(pc_task_manager, pc['ip'], pc['name'], force=force_refresh)
         pc_info['group'] = pc.get('group', '未分類')
         pc_info_list.append(pc_info)
     
@@ -198,8 +261,8 @@ def render_pc_info_with_progress(progress_bar):
             
             with col1:
                 st.metric("ステータス", pc_info['status'])
-                if pc_info['status'] == 'Online':
-                    st.metric("最終確認", pc_info.get('last_seen', 'Unknown'))
+                if pc_info.get('last_seen'):
+                    st.metric("最終確認", pc_info['last_seen'])
                 st.metric("タスク数", pc_info['tasks_count'])
                 if pc_info.get('group'):
                     st.metric("グループ", pc_info['group'])
@@ -243,69 +306,29 @@ def render_pc_info_with_progress(progress_bar):
             if pc_info['status'] == 'Error' and 'error' in pc_info:
                 st.error(f"エラー: {pc_info['error']}")
 
-def get_pc_info(task_manager, pc_ip, pc_name):
-    """PCの詳細情報を取得する"""
-    info = {
-        'name': pc_name,
-        'ip': pc_ip,
-        'status': 'Unknown',
-        'system_info': {},
-        'disk_info': {},
-        'memory_info': {},
-        'tasks_count': 0
-    }
-    
+def get_pc_info(task_manager, pc_ip, pc_name, force=False):
+    """
+    PCの詳細情報を取得する。
+    logs.dbのキャッシュを使い、期限切れの部分（通常は稼働状況のみ）だけを1回のリモート呼び出しで取得する。
+    :param force: Trueの場合、稼働状況をキャッシュの期限に関係なく取得し直す。
+        直前に接続できなかったPCも、接続を試み直す。
+    """
+    from core.pc_info_cache import PcInfoCache
+    if force:
+        from core.reachability import get_reachability_checker
+        get_reachability_checker(st.session_state.config_manager).reset(pc_ip)
+    cache = PcInfoCache(st.session_state.config_manager, st.session_state.db_manager)
     try:
-        # 1. 基本接続確認
-        success, result = task_manager._execute_ps_command(pc_ip, "Get-Date -Format 'yyyy/MM/dd HH:mm:ss'")
-        if success:
-            info['status'] = 'Online'
-            # 日付文字列をクリーンアップ
-            cleaned_date = result.strip().replace('\r', '').replace('\n', '')
-            info['last_seen'] = cleaned_date
-        else:
-            info['status'] = 'Offline'
-            return info
-        
-        # 2. システム情報取得
-        success, result = task_manager._execute_ps_command(pc_ip, "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; Get-ComputerInfo | Select-Object WindowsProductName, WindowsVersion, TotalPhysicalMemory | ConvertTo-Json -Compress")
-        if success:
-            try:
-                # 改行文字を除去してからJSON解析
-                cleaned_result = result.strip().replace('\r', '').replace('\n', '')
-                system_data = json.loads(cleaned_result)
-                info['system_info'] = system_data
-            except:
-                info['system_info'] = {'error': 'JSON parse failed'}
-        
-        # 3. ディスク情報取得
-        success, result = task_manager._execute_ps_command(pc_ip, "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; Get-WmiObject -Class Win32_LogicalDisk | Select-Object DeviceID, Size, FreeSpace | ConvertTo-Json -Compress")
-        if success:
-            try:
-                # 改行文字を除去してからJSON解析
-                cleaned_result = result.strip().replace('\r', '').replace('\n', '')
-                disk_data = json.loads(cleaned_result)
-                info['disk_info'] = disk_data if isinstance(disk_data, list) else [disk_data]
-            except:
-                info['disk_info'] = []
-        
-        # 4. メモリ情報取得
-        success, result = task_manager._execute_ps_command(pc_ip, "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; Get-WmiObject -Class Win32_OperatingSystem | Select-Object TotalVisibleMemorySize, FreePhysicalMemory | ConvertTo-Json -Compress")
-        if success:
-            try:
-                # 改行文字を除去してからJSON解析
-                cleaned_result = result.strip().replace('\r', '').replace('\n', '')
-                memory_data = json.loads(cleaned_result)
-                info['memory_info'] = memory_data
-            except:
-                info['memory_info'] = {'error': 'JSON parse failed'}
-        
-        # 5. タスク数取得
-        tasks = task_manager.get_tasks_from_pc(pc_ip)
-        info['tasks_count'] = len(tasks) if tasks else 0
-        
+        return cache.get_info(task_manager, pc_name, pc_ip, force=force)
     except Exception as e:
-        info['status'] = 'Error'
-        info['error'] = str(e)
-    
-    return info 
\ No newline at end of file
+        logging.error(f"PC情報の取得に失敗しました: {pc_name}: {e}")
+        return {
+            'name': pc_name,
+            'ip': pc_ip,
+            'status': 'Error',
+            'system_info': {},
+            'disk_info': {},
+            'memory_info': {},
+            'tasks_count': 0,
+            'error': str(e)
+        }
@@ -9,22 +9,21 @@ import plotly.express as px
 def render_reports():
     st.header("サマリーレポート")
     db_manager = st.session_state.db_manager
-    logs = db_manager.search_execution_logs()
-    if not logs:
+    # ログ全件ではなく日別の集計テーブルから読み込む（件数は日数に比例する）
+    daily = db_manager.get_rollup_summary('day')
+    if not daily:
         st.warning("分析対象のログデータがありません。")
         return
-    df = pd.DataFrame(logs)
-    df['result_code'] = pd.to_numeric(df['result_code'], errors='coerce')
-    df['recorded_at'] = pd.to_datetime(df['recorded_at'], errors='coerce')
+    df = pd.DataFrame(daily)
+    df['date'] = pd.to_datetime(df['period'], errors='coerce').dt.date
     st.subheader("タスク実行状況")
     col1, col2 = st.columns(2)
     with col1:
-        status_counts = df['result_code'].apply(lambda x: '成功' if x == 0 else '失敗').value_counts()
+        status_counts = pd.Series({'成功': df['success'].sum(), '失敗': df['error'].sum()})
+        status_counts = status_counts[status_counts > 0]
         fig_pie = px.pie(status_counts, values=status_counts.values, names=status_counts.index, title='タスク成功率', color=status_counts.index, color_discrete_map={'成功':'#2ca02c', '失敗':'#d62728'})
         st.plotly_chart(fig_pie, use_container_width=True)
     with col2:
-        df_errors = df[df['result_code'] != 0].copy()
-        df_errors['date'] = df_errors['recorded_at'].dt.date
-        error_counts_by_day = df_errors.groupby('date').size().reset_index(name='counts')
+        error_counts_by_day = df[df['error'] > 0][['date', 'error']].rename(columns={'error': 'counts'})
         fig_bar = px.bar(error_counts_by_day, x='date', y='counts', title='日別エラー発生件数', labels={'date': '日付', 'counts': 'エラー数'})
-        st.plotly_chart(fig_bar, use_container_width=True) 
\ No newline at end of file
+        st.plotly_chart(fig_bar, use_container_width=True)
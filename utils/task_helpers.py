@@ -2,9 +2,12 @@
 # タスク関連のヘルパー関数
 # ==============================================================================
 
+import numpy as np
 import pandas as pd
 import datetime
 
+from core.task_trigger import TriggerSummary
+
 def get_task_result_info(task):
     """タスクの実行結果に応じた情報を返す"""
     last_task_result = task.get('LastTaskResult')
@@ -34,8 +37,8 @@ def get_task_result_info(task):
     
     # エラーの場合（0以外）
     try:
-        from core.error_manager import ErrorManager
-        error_manager = ErrorManager('data/error_codes.json')
+        from core.error_manager import get_error_manager
+        error_manager = get_error_manager('data/error_codes.json')
         error_message = error_manager.get_error_message(last_task_result_int)
         
         # 実行中の場合は特別な処理
@@ -56,50 +59,47 @@ def get_task_result_info(task):
             'icon': '❌'
         }
 
+# PowerShell Get-ScheduledTaskのState値の正しい対応表
+# 0: TASK_STATE_UNKNOWN - 状態が不明
+# 1: TASK_STATE_DISABLED - タスクは無効
+# 2: TASK_STATE_QUEUED - タスクは実行キューに入っている
+# 3: TASK_STATE_READY - タスクは実行準備完了
+# 4: TASK_STATE_RUNNING - タスクは実行中
+TASK_STATE_INFO = {
+    0: {
+        'status': '不明',
+        'icon': '❓',
+        'style': 'background-color: #9e9e9e; color: white;'
+    },
+    1: {
+        'status': '無効',
+        'icon': '🔴',
+        'style': 'background-color: #f44336; color: white;'
+    },
+    2: {
+        'status': '待機中',
+        'icon': '🟡',
+        'style': 'background-color: #ff9800; color: white;'
+    },
+    3: {
+        'status': '準備完了',
+        'icon': '🟢',
+        'style': 'background-color: #4caf50; color: white;'
+    },
+    4: {
+        'status': '実行中',
+        'icon': '🟡',
+        'style': 'background-color: #ff9800; color: white;'
+    },
+}
+
 def get_task_state_info(state):
     """タスクの状態に応じた情報を返す"""
-    # PowerShell Get-ScheduledTaskのState値の正しい対応表
-    # 0: TASK_STATE_UNKNOWN - 状態が不明
-    # 1: TASK_STATE_DISABLED - タスクは無効
-    # 2: TASK_STATE_QUEUED - タスクは実行キューに入っている
-    # 3: TASK_STATE_READY - タスクは実行準備完了
-    # 4: TASK_STATE_RUNNING - タスクは実行中
-    if state == 0:
-        return {
-            'status': '不明',
-            'icon': '❓',
-            'style': 'background-color: #9e9e9e; color: white;'
-        }
-    elif state == 1:
-        return {
-            'status': '無効',
-            'icon': '🔴',
-            'style': 'background-color: #f44336; color: white;'
-        }
-    elif state == 2:
-        return {
-            'status': '待機中',
-            'icon': '🟡',
-            'style': 'background-color: #ff9800; color: white;'
-        }
-    elif state == 3:
-        return {
-            'status': '準備完了',
-            'icon': '🟢',
-            'style': 'background-color: #4caf50; color: white;'
-        }
-    elif state == 4:
-        return {
-            'status': '実行中',
-            'icon': '🟡',
-            'style': 'background-color: #ff9800; color: white;'
-        }
-    else:
-        return {
-            'status': '不明',
-            'icon': '❓',
-            'style': 'background-color: #9e9e9e; color: white;'
-        }
+    try:
+        return TASK_STATE_INFO.get(state, TASK_STATE_INFO[0])
+    except TypeError:
+        # ハッシュできない値は不明として扱う
+        return TASK_STATE_INFO[0]
 
 def format_datetime(dt_value):
     """日時をフォーマットする"""
@@ -112,65 +112,112 @@ def format_datetime(dt_value):
     except:
         return str(dt_value)
 
-def format_trigger_info(trigger_str):
-    """トリガー情報をフォーマットする"""
-    if not trigger_str or trigger_str == 'null':
-        return "未設定"
-    
+def format_trigger_info(trigger):
+    """
+    トリガー情報をフォーマットする。
+    :param trigger: TriggerSummary、Triggers配列（辞書のリスト）、または以前の形式のトリガー文字列。
+    """
+    if isinstance(trigger, TriggerSummary):
+        return trigger.text
     try:
-        # トリガー文字列から主要な情報を抽出
-        lines = trigger_str.split('\n')
-        
-        # 設定時間と繰り返し間隔を抽出
-        start_time = None
-        days_interval = None
-        hours_interval = None
-        minutes_interval = None
-        
-        for line in lines:
-            line = line.strip()
-            if 'StartBoundary' in line and ':' in line:
-                # StartBoundary: 2024-03-09T06:00:00 形式を処理
-                start_time = line.split(':', 1)[1].strip()
-            elif 'DaysInterval' in line and ':' in line:
-                days_interval = line.split(':', 1)[1].strip()
-            elif 'HoursInterval' in line and ':' in line:
-                hours_interval = line.split(':', 1)[1].strip()
-            elif 'MinutesInterval' in line and ':' in line:
-                minutes_interval = line.split(':', 1)[1].strip()
-        
-        # 設定時刻のフォーマット
-        time_str = "未設定"
-        if start_time:
-            try:
-                # ISO形式の日時を読みやすい形式に変換
-                if 'T' in start_time:
-                    # 2024-03-09T06:00:00 形式を処理
-                    date_part, time_part = start_time.split('T')
-                    time_only = time_part.split(':')[:2]  # 時:分のみ取得
-                    time_str = f"{time_only[0]}:{time_only[1]}"
-                else:
-                    time_str = start_time
-            except:
-                time_str = start_time
-        
-        # 頻度のフォーマット（繰り返し表示を削除）
-        frequency_str = "未設定"
-        interval_parts = []
-        if days_interval and days_interval != '0':
-            interval_parts.append(f"{days_interval}日")
-        if hours_interval and hours_interval != '0':
-            interval_parts.append(f"{hours_interval}時間")
-        if minutes_interval and minutes_interval != '0':
-            interval_parts.append(f"{minutes_interval}分")
-        
-        if interval_parts:
-            frequency_str = " | ".join(interval_parts)
-        
-        # 頻度が「未設定」の場合は時刻のみを返す
-        if frequency_str == "未設定":
-            return time_str
-        else:
-            return f"{time_str} | {frequency_str}"
-    except:
-        return "トリガーあり" 
\ No newline at end of file
+        return TriggerSummary.from_value(trigger).text
+    except Exception:
+        return "トリガーあり"
+
+# ==============================================================================
+# DataFrame全体をまとめて変換するヘルパー関数
+# 行ごとに上記の関数を呼び出す代わりに、列単位の演算で表示用の列を作成する。
+# ==============================================================================
+
+def classify_task_states(states):
+    """
+    State列から状態の表示名・アイコン・有効かどうかを列単位で求める。
+    :param states: State値のSeries。
+    :return: '状態', '状態アイコン', '有効' の列を持つDataFrame。
+    """
+    # get_task_state_infoと同じく数値のStateだけを対応表で引き、文字列は不明として扱う
+    codes = pd.to_numeric(states.where(~states.map(lambda value: isinstance(value, str))), errors='coerce')
+    return pd.DataFrame({
+        '状態': codes.map({state: info['status'] for state, info in TASK_STATE_INFO.items()}).fillna(TASK_STATE_INFO[0]['status']),
+        '状態アイコン': codes.map({state: info['icon'] for state, info in TASK_STATE_INFO.items()}).fillna(TASK_STATE_INFO[0]['icon']),
+        # Ready(3) または Running(4)
+        '有効': codes.isin([3, 4]),
+    }, index=states.index)
+
+def classify_task_results(results, error_manager=None):
+    """
+    LastTaskResult列から実行結果の表示名とアイコンを列単位で求める。get_task_result_infoと同じ判定を行う。
+    :param results: LastTaskResult値のSeries。
+    :param error_manager: エラーメッセージの参照に使うErrorManager。省略時は共有インスタンスを使う。
+    :return: '実行結果', '実行結果アイコン' の列を持つDataFrame。
+    """
+    if error_manager is None:
+        from core.error_manager import get_error_manager
+        error_manager = get_error_manager('data/error_codes.json')
+
+    codes = pd.to_numeric(results, errors='coerce').astype('Int64')
+    not_run = codes.isna()
+    success = codes.eq(0).fillna(False)
+    # エラーコード表を引き、登録されていないコードは get_error_message と同じ表記にする
+    messages = codes.map(error_manager.error_codes).astype(object)
+    messages = messages.where(messages.notna(), 'エラー(' + codes.astype(str) + ')')
+    running = messages.str.contains('実行中', regex=False) | messages.str.lower().str.contains('running', regex=False)
+
+    status = np.select([not_run, success, running], ['未実行', '成功', '実行中'], default=messages.astype(str))
+    icon = np.select([not_run, success, running], ['⏸️', '✅', '🔄'], default='❌')
+    return pd.DataFrame({'実行結果': status, '実行結果アイコン': icon}, index=results.index)
+
+def format_datetime_column(values):
+    """日時の列をformat_datetimeと同じ形式の文字列にまとめて変換する"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime("%Y/%m/%d %H:%M").fillna("未設定")
+    # 文字列や型の混在した列は、同じ値ごとに1回だけ変換する
+    unique_values = pd.unique(values)
+    formatted = {value: format_datetime(value) for value in unique_values if not pd.isna(value)}
+    return values.map(formatted).fillna("未設定")
+
+def summarize_trigger_column(triggers):
+    """
+    トリガー情報の列をTriggerSummaryの列に変換する。
+    取得時に作成済みのTriggerSummaryはそのまま使い、同じ文字列のトリガーは1回だけ解析する。
+    """
+    cache = {}
+
+    def summarize(value):
+        if isinstance(value, TriggerSummary):
+            return value
+        if isinstance(value, str):
+            if value not in cache:
+                cache[value] = TriggerSummary.from_value(value)
+            return cache[value]
+        return TriggerSummary.from_value(value)
+
+    return triggers.map(summarize)
+
+def add_task_display_columns(df, error_manager=None):
+    """
+    タスク一覧のDataFrameに表示用の列（状態・実行結果・日時・開始時刻）をまとめて追加する。
+    :param df: get_tasks_from_pcの結果から作成したDataFrame。
+    :param error_manager: エラーメッセージの参照に使うErrorManager。省略時は共有インスタンスを使う。
+    :return: 表示用の列を追加したDataFrame（元のDataFrameは変更しない）。
+    """
+    df = df.copy()
+    empty = pd.Series(np.nan, index=df.index, dtype=object)
+    states = classify_task_states(df['State'] if 'State' in df.columns else empty)
+    results = classify_task_results(df['LastTaskResult'] if 'LastTaskResult' in df.columns else empty, error_manager)
+    df[states.columns] = states
+    df[results.columns] = results
+    df['次回実行'] = format_datetime_column(df['NextRunTime'] if 'NextRunTime' in df.columns else empty)
+    df['最終実行'] = format_datetime_column(df['LastRunTime'] if 'LastRunTime' in df.columns else empty)
+    # トリガーは取得時に作成したTriggerSummaryを優先し、ない場合はトリガー情報を解析する
+    for column in ('TriggerSummary', 'Triggers', 'Trigger'):
+        if column in df.columns:
+            summaries = summarize_trigger_column(df[column])
+            break
+    else:
+        summaries = summarize_trigger_column(empty)
+    df['開始時刻'] = summaries.map(lambda summary: summary.text)
+    # 並べ替え・絞り込み用に、開始時刻（0時からの分数）と繰り返しの有無も列にしておく
+    df['開始時刻順'] = summaries.map(lambda summary: summary.start_minutes).astype(float)
+    df['繰り返し'] = summaries.map(lambda summary: summary.repeats).astype(bool)
+    return df